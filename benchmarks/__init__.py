@@ -0,0 +1,41 @@
+"""
+Performance benchmarks of pyrs.schema
+
+The benchmarks are not part of the distributed package. Run them from the
+root of the repository:
+
+.. code:: bash
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline results.json
+
+    python -m benchmarks --memory --output memory.json
+
+Every benchmark is registered by the :func:`benchmark` (throughput) or the
+:func:`memory_benchmark` decorator. The decorated function is the setup: it
+is called once and gives back the callable which is going to be measured.
+The resources of the callable (e.g. thread pools) are released by its
+`close` attribute, when it has one, after the measurement.
+"""
+import collections
+
+
+BENCHMARKS = collections.OrderedDict()
+MEMORY_BENCHMARKS = collections.OrderedDict()
+
+
+def _register(registry, name):
+    def wrap(setup):
+        if name in registry:
+            raise ValueError('Benchmark %r is already registered' % name)
+        registry[name] = setup
+        return setup
+    return wrap
+
+
+def benchmark(name):
+    return _register(BENCHMARKS, name)
+
+
+def memory_benchmark(name):
+    return _register(MEMORY_BENCHMARKS, name)
@@ -0,0 +1,35 @@
+"""
+Comparison of the available JSON codec backends.
+"""
+from pyrs.schema import codec
+from pyrs.schema import schemaio
+
+from . import benchmark
+from . import schemas
+
+
+PAYLOADS = [
+    ('wide_object', schemas.WideObject, schemas.wide_payload),
+    ('large_array', schemas.ItemList, schemas.large_array_payload),
+    ('datetime', schemas.DateTimeObject, schemas.datetime_payload),
+]
+
+
+def _register(codec_name, name, schema, payload):
+
+    @benchmark('codec.%s.read.%s' % (codec_name, name))
+    def read():
+        data = schemaio.JSONWriter(schema).write(payload())
+        reader = schemaio.JSONReader(schema, codec=codec_name)
+        return lambda: reader.read(data)
+
+    @benchmark('codec.%s.write.%s' % (codec_name, name))
+    def write():
+        writer = schemaio.JSONWriter(schema, codec=codec_name)
+        data = payload()
+        return lambda: writer.write(data)
+
+
+for _codec_name in codec.available_codecs():
+    for _name, _schema, _payload in PAYLOADS:
+        _register(_codec_name, _name, _schema, _payload)
@@ -0,0 +1,126 @@
+"""
+Memory footprint of schema declaration, validator construction and
+conversion of large documents, measured by :mod:`tracemalloc`.
+
+The setup of a memory benchmark gives back a callable, the value returned by
+the callable is kept alive until the measurement is done, so the retained
+size is the size of that value (and anything it keeps referenced).
+See :func:`benchmarks.runner.measure_memory`.
+"""
+import json
+
+from pyrs.schema import base
+from pyrs.schema import schemaio
+
+from . import memory_benchmark
+from . import schemas
+
+
+DECLARATIONS = [
+    ('wide_object', schemas._make_wide_object),
+    ('deep_nesting', schemas._make_deep_object),
+    ('datetime', schemas._make_datetime_object),
+]
+
+
+def _register_declaration(name, factory):
+
+    @memory_benchmark('declaration.%s' % name)
+    def declaration():
+        return factory
+
+
+def _register_validator(name, schema):
+
+    @memory_benchmark('validator.%s' % name)
+    def validator():
+        jsonschema = schema().get_jsonschema()
+        # Built, not taken from the shared validators
+        base._validators.clear()
+        return lambda: base._make_validator(jsonschema)
+
+
+for _name, _factory in DECLARATIONS:
+    _register_declaration(_name, _factory)
+
+for _name, _schema in [
+        ('wide_object', schemas.WideObject),
+        ('deep_nesting', schemas.DeepObject),
+        ('large_array', schemas.ItemList),
+        ('shared_address', schemas.SharedAddress)]:
+    _register_validator(_name, _schema)
+
+
+@memory_benchmark('read.large_array')
+def read_large_array():
+    data = schemaio.JSONWriter(schemas.ItemList).write(
+        schemas.large_array_payload()
+    )
+    reader = schemaio.JSONReader(schemas.ItemList)
+    return lambda: reader.read(data)
+
+
+@memory_benchmark('write.large_array')
+def write_large_array():
+    writer = schemaio.JSONWriter(schemas.ItemList)
+    payload = schemas.large_array_payload()
+    return lambda: writer.write(payload)
+
+
+@memory_benchmark('iter_write.large_array')
+def iter_write_large_array():
+    # Compare with write.large_array, the output is never built
+    writer = schemaio.JSONWriter(schemas.ItemList)
+    payload = schemas.large_array_payload()
+    return lambda: sum(len(chunk) for chunk in writer.iter_write(payload))
+
+
+@memory_benchmark('iter_write.generator')
+def iter_write_generator():
+    # The rows are generated (e.g. a database cursor), only the current one
+    # is held, compare with iter_write.large_array
+    writer = schemaio.JSONWriter(schemas.ItemList)
+
+    def run():
+        chunks = writer.iter_write(schemas.iter_large_array())
+        return sum(len(chunk) for chunk in chunks)
+    return run
+
+
+def _register_records(name, schema):
+
+    @memory_benchmark('read.records.%s' % name)
+    def read_records():
+        # The records are read one by one and kept, e.g. in a cache
+        writer = schemaio.JSONWriter(schemas.Item)
+        data = [writer.write(row) for row in schemas.iter_large_array()]
+        reader = schemaio.JSONReader(schema)
+        return lambda: [reader.read(row) for row in data]
+
+
+_register_records('dict', schemas.Item)
+_register_records('model', schemas.ItemModel)
+
+
+def _register_batches(name, intern):
+
+    @memory_benchmark('read.batches.%s' % name)
+    def read_batches():
+        # The batches are kept, e.g. in a cache
+        data = [
+            json.dumps(schemas.record_batch_payload(batch))
+            for batch in range(schemas.RECORD_BATCHES)
+        ]
+        reader = schemaio.JSONReader(schemas.RecordBatch, intern=intern)
+        return lambda: [reader.read(batch) for batch in data]
+
+
+_register_batches('plain', False)
+_register_batches('interned', True)
+
+
+@memory_benchmark('read.wide_object')
+def read_wide_object():
+    data = json.dumps(schemas.wide_payload())
+    reader = schemaio.JSONReader(schemas.WideObject)
+    return lambda: reader.read(data)
@@ -0,0 +1,38 @@
+"""
+Conversion and validation of deep documents of recursive schemas.
+
+The documents are built as Python values, the JSON decoders themselves
+refuse documents of this depth.
+"""
+from pyrs.schema import graph
+from pyrs.schema import schemaio
+
+from . import benchmark
+from . import schemas
+
+
+@benchmark('recursive.to_raw.deep')
+def to_raw():
+    schema = schemas.Comment()
+    value = schemas.recursive_payload()
+    return lambda: schema.to_raw(value)
+
+
+@benchmark('recursive.to_python.deep')
+def to_python():
+    schema = schemas.Comment()
+    raw = schema.to_raw(schemas.recursive_payload())
+    return lambda: schema.to_python(raw)
+
+
+@benchmark('recursive.validate.deep')
+def validate():
+    validator = schemaio.JSONSchemaValidator(schemas.Comment)
+    raw = schemas.Comment().to_raw(schemas.recursive_payload())
+    return lambda: validator.validate(raw)
+
+
+@benchmark('recursive.graph_construction')
+def graph_construction():
+    schema = schemas.Comment()
+    return lambda: graph.Graph(schema)
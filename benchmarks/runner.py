@@ -0,0 +1,208 @@
+"""
+Runs the registered benchmarks and reports the results as JSON.
+
+Every benchmark is measured call by call, the report contains the number of
+operations per second and the latency percentiles in microseconds. With
+`--memory` the memory benchmarks are run instead, the report contains the
+peak and the retained allocation in bytes. With `--baseline` the results are
+compared against a previously saved report and the exit status is non-zero
+when any benchmark regressed more than the threshold.
+"""
+import argparse
+import fnmatch
+import gc
+import importlib
+import json
+import sys
+import timeit
+import tracemalloc
+
+from pyrs.schema import schemaio
+from pyrs.schema import types
+
+from . import BENCHMARKS
+from . import MEMORY_BENCHMARKS
+
+
+MODULES = [
+    'benchmarks.throughput',
+    'benchmarks.backends',
+    'benchmarks.recursive',
+    'benchmarks.startup',
+    'benchmarks.threads',
+]
+
+MEMORY_MODULES = [
+    'benchmarks.memory',
+]
+
+PERCENTILES = (50, 90, 99)
+
+
+def load_benchmarks(memory=False):
+    for module in (MEMORY_MODULES if memory else MODULES):
+        importlib.import_module(module)
+    return MEMORY_BENCHMARKS if memory else BENCHMARKS
+
+
+def percentile(samples, pct):
+    """Gives back the percentile of the sorted samples (nearest rank)"""
+    if not samples:
+        return 0.0
+    rank = int(round(pct / 100.0 * (len(samples) - 1)))
+    return samples[rank]
+
+
+def measure(func, min_time=0.5, min_runs=5, max_runs=100000, warmup=1,
+            timer=timeit.default_timer):
+    for _ in range(warmup):
+        func()
+    samples = []
+    total = 0.0
+    while len(samples) < max_runs and (
+            total < min_time or len(samples) < min_runs):
+        started = timer()
+        func()
+        elapsed = timer() - started
+        samples.append(elapsed)
+        total += elapsed
+    samples.sort()
+    result = {
+        'runs': len(samples),
+        'ops_per_sec': len(samples) / total if total else 0.0,
+        'mean_us': total / len(samples) * 1e6,
+        'min_us': samples[0] * 1e6,
+    }
+    for pct in PERCENTILES:
+        result['p%d_us' % pct] = percentile(samples, pct) * 1e6
+    return result
+
+
+def measure_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = func()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {
+        'peak_bytes': peak - before,
+        'retained_bytes': current - before,
+    }
+
+
+def warm_up():
+    """
+    Loads the lazily imported dependencies, so their import isn't charged
+    to the first measured benchmark.
+    """
+    schemaio.JSONReader(types.Date()).read('"2015-08-12"')
+
+
+def run(patterns=None, min_time=0.5, memory=False):
+    warm_up()
+    results = {}
+    for name, setup in load_benchmarks(memory).items():
+        if patterns and not any(fnmatch.fnmatch(name, p) for p in patterns):
+            continue
+        func = setup()
+        try:
+            if memory:
+                results[name] = measure_memory(func)
+            else:
+                results[name] = measure(func, min_time=min_time)
+        finally:
+            close = getattr(func, 'close', None)
+            if close is not None:
+                close()
+    return results
+
+
+def compare(results, baseline, threshold=0.1, memory=False):
+    """
+    Compare the results with the baseline. The change is the relative
+    difference of `ops_per_sec` (negative means slower) or, for memory
+    benchmarks, of `retained_bytes` and `peak_bytes` (positive means more
+    memory used).
+    """
+    if memory:
+        metrics = [('retained_bytes', 1), ('peak_bytes', 1)]
+    else:
+        metrics = [('ops_per_sec', -1)]
+    comparison = {}
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        entry = {'regression': False}
+        for metric, direction in metrics:
+            before = baseline[name][metric]
+            after = result[metric]
+            change = (after - before) / float(before) if before else 0.0
+            entry['baseline_' + metric] = before
+            entry[metric] = after
+            entry['change_' + metric] = change
+            if change * direction > threshold:
+                entry['regression'] = True
+        comparison[name] = entry
+    return comparison
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description=__doc__.strip()
+    )
+    parser.add_argument(
+        '-k', dest='patterns', action='append',
+        help='run only the benchmarks matching the glob pattern'
+    )
+    parser.add_argument(
+        '--min-time', type=float, default=0.5,
+        help='minimum measured time per benchmark in seconds'
+    )
+    parser.add_argument('--output', help='save the results into the file')
+    parser.add_argument(
+        '--baseline', help='compare the results with the saved file'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='relative slowdown reported as regression (default: 0.1)'
+    )
+    parser.add_argument(
+        '--memory', action='store_true',
+        help='run the memory benchmarks instead of the throughput ones'
+    )
+    parser.add_argument(
+        '--list', action='store_true', help='list the benchmarks and exit'
+    )
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    if args.list:
+        for name in load_benchmarks(args.memory):
+            print(name)
+        return 0
+    results = run(args.patterns, min_time=args.min_time, memory=args.memory)
+    report = {'results': results}
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        baseline = baseline.get('results', baseline)
+        report['comparison'] = compare(
+            results, baseline, args.threshold, memory=args.memory
+        )
+        if any(c['regression'] for c in report['comparison'].values()):
+            status = 1
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    json.dump(report, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+    return status
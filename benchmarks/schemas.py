@@ -0,0 +1,382 @@
+"""
+Representative schemas and payloads used by the benchmarks.
+"""
+import datetime
+import decimal
+
+from pyrs.schema import types
+
+
+WIDE_FIELDS = 100
+DEEP_LEVELS = 20
+LARGE_ARRAY_ITEMS = 5000
+DATETIME_FIELDS = 20
+SHARED_ITEMS = 500
+RECURSIVE_DEPTH = 10000
+UNIQUE_TAGS = 20000
+SMALL_ENUM = 10
+LARGE_ENUM = 5000
+ENUM_LINES = 1000
+CURRENCY_LINES = 2000
+CATALOG_SECTIONS = 20
+RECORD_BATCHES = 20
+RECORD_BATCH_ITEMS = 500
+
+
+def _make_wide_object():
+    attrs = {}
+    for i in range(WIDE_FIELDS):
+        if i % 3 == 0:
+            attrs['field_%03d' % i] = types.Integer(minimum=0)
+        elif i % 3 == 1:
+            attrs['field_%03d' % i] = types.String(max_len=64)
+        else:
+            attrs['field_%03d' % i] = types.Boolean()
+    return type('WideObject', (types.Object,), attrs)
+
+
+WideObject = _make_wide_object()
+
+
+def make_catalog():
+    """
+    Gives back a new object class with many wide objects in it, new
+    classes every time, so the extensions don't leak between benchmarks.
+    """
+    attrs = dict(
+        ('section_%02d' % i, _make_wide_object()())
+        for i in range(CATALOG_SECTIONS)
+    )
+    return type('Catalog', (types.Object,), attrs)
+
+
+def wide_payload():
+    payload = {}
+    for i in range(WIDE_FIELDS):
+        if i % 3 == 0:
+            payload['field_%03d' % i] = i
+        elif i % 3 == 1:
+            payload['field_%03d' % i] = 'value %d' % i
+        else:
+            payload['field_%03d' % i] = bool(i % 2)
+    return payload
+
+
+def _make_deep_object():
+    cls = type('Level%d' % DEEP_LEVELS, (types.Object,), {
+        'value': types.Integer(),
+    })
+    for level in reversed(range(DEEP_LEVELS)):
+        cls = type('Level%d' % level, (types.Object,), {
+            'value': types.Integer(),
+            'child': cls(),
+        })
+    return cls
+
+
+DeepObject = _make_deep_object()
+
+
+def deep_payload():
+    payload = {'value': DEEP_LEVELS}
+    for level in reversed(range(DEEP_LEVELS)):
+        payload = {'value': level, 'child': payload}
+    return payload
+
+
+class Item(types.Object):
+    id = types.Integer(required=True)
+    name = types.String(required=True)
+    price = types.Number(minimum=0)
+    tags = types.Array(items=types.String())
+
+
+class ItemModel(Item):
+    """`Item` converted into slotted instances"""
+
+    class Attrs:
+        model = True
+
+
+class ItemList(types.Array):
+    _attrs = {'items': Item()}
+
+
+def iter_large_array():
+    for i in range(LARGE_ARRAY_ITEMS):
+        yield {
+            'id': i,
+            'name': 'item %d' % i,
+            'price': i * 1.5,
+            'tags': ['a', 'b'],
+        }
+
+
+def large_array_payload():
+    return list(iter_large_array())
+
+
+class Record(types.Object):
+    id = types.Integer(required=True)
+    name = types.String(required=True)
+    status = types.Enum(enum=['active', 'suspended', 'closed'])
+    country = types.Enum(enum=['GB', 'DE', 'FR', 'HU', 'US'])
+
+
+class RecordBatch(types.Array):
+    _attrs = {'items': Record()}
+
+
+def record_batch_payload(batch):
+    statuses = ['active', 'suspended', 'closed']
+    countries = ['GB', 'DE', 'FR', 'HU', 'US']
+    start = batch * RECORD_BATCH_ITEMS
+    return [
+        {
+            'id': i,
+            'name': 'record %d' % i,
+            'status': statuses[i % 3],
+            'country': countries[i % 5],
+        }
+        for i in range(start, start + RECORD_BATCH_ITEMS)
+    ]
+
+
+class Tag(types.Object):
+    name = types.String(required=True)
+    value = types.String()
+
+
+class TagList(types.Array):
+    _attrs = {'items': Tag(), 'unique_items': True}
+
+
+def unique_tags_payload():
+    return [
+        {'name': 'tag%d' % (i % 100), 'value': 'value %d' % i}
+        for i in range(UNIQUE_TAGS)
+    ]
+
+
+def _make_enum_lines(size):
+    codes = ['P%05d' % i for i in range(size)]
+    line = type('EnumLine', (types.Object, ), {
+        'code': types.Enum(enum=codes, required=True),
+        'quantity': types.Integer(minimum=1),
+    })
+    return type('EnumLines', (types.Array, ), {'_attrs': {'items': line()}})
+
+
+SmallEnumLines = _make_enum_lines(SMALL_ENUM)
+LargeEnumLines = _make_enum_lines(LARGE_ENUM)
+
+
+def _enum_payload(size):
+    return [
+        {'code': 'P%05d' % (i * 7919 % size), 'quantity': 1}
+        for i in range(ENUM_LINES)
+    ]
+
+
+def small_enum_payload():
+    return _enum_payload(SMALL_ENUM)
+
+
+def large_enum_payload():
+    return _enum_payload(LARGE_ENUM)
+
+
+def _make_invoice(decimal):
+    line = type('InvoiceLine', (types.Object, ), {
+        'sku': types.String(required=True),
+        'price': types.Number(decimal=decimal, multiple=0.01, minimum=0),
+        'tax': types.Number(decimal=decimal, multiple=0.01, minimum=0),
+        'total': types.Number(decimal=decimal, multiple=0.01, minimum=0),
+    })
+    return type('Invoice', (types.Array, ), {'_attrs': {'items': line()}})
+
+
+DecimalInvoice = _make_invoice(True)
+FloatInvoice = _make_invoice(False)
+
+
+def _currency_payload(number):
+    lines = []
+    for i in range(CURRENCY_LINES):
+        price = decimal.Decimal(i % 10000) / 100
+        tax = (price * decimal.Decimal('0.27')).quantize(
+            decimal.Decimal('0.01')
+        )
+        lines.append({
+            'sku': 'SKU%05d' % i,
+            'price': number(price),
+            'tax': number(tax),
+            'total': number(price + tax),
+        })
+    return lines
+
+
+def decimal_currency_payload():
+    return _currency_payload(decimal.Decimal)
+
+
+def float_currency_payload():
+    return _currency_payload(float)
+
+
+def _make_datetime_object():
+    attrs = {}
+    for i in range(DATETIME_FIELDS):
+        if i % 4 == 0:
+            attrs['date_%02d' % i] = types.Date()
+        elif i % 4 == 1:
+            attrs['datetime_%02d' % i] = types.DateTime()
+        elif i % 4 == 2:
+            attrs['time_%02d' % i] = types.Time()
+        else:
+            attrs['duration_%02d' % i] = types.Duration()
+    return type('DateTimeObject', (types.Object,), attrs)
+
+
+DateTimeObject = _make_datetime_object()
+
+
+def datetime_payload():
+    moment = datetime.datetime(2015, 8, 12, 19, 44, 15)
+    payload = {}
+    for i in range(DATETIME_FIELDS):
+        if i % 4 == 0:
+            payload['date_%02d' % i] = moment.date()
+        elif i % 4 == 1:
+            payload['datetime_%02d' % i] = moment
+        elif i % 4 == 2:
+            payload['time_%02d' % i] = moment.time()
+        else:
+            payload['duration_%02d' % i] = datetime.timedelta(seconds=i)
+    return payload
+
+
+class Money(types.Object):
+    amount = types.Number(minimum=0)
+    currency = types.String(pattern=r'^[A-Z]{3}$')
+
+
+class Party(types.Object):
+    name = types.String(max_len=64)
+    country = types.String(pattern=r'^[A-Z]{2}$')
+
+
+def _make_order(fields):
+    return type('Order', (types.Object,), dict(
+        ('%s_%d' % (name, i), field())
+        for i in range(4) for name, field in fields
+    ))
+
+
+def _make_shared_definitions():
+    order = _make_order([
+        ('price', lambda: types.Ref(ref='money')),
+        ('party', lambda: types.Ref(ref='party')),
+    ])
+    return type('SharedDefinitions', (types.Array,), {
+        '_attrs': {'items': order()},
+        'Definitions': type('Definitions', (), {
+            'money': Money(), 'party': Party(),
+        }),
+    })
+
+
+def _make_inline_definitions():
+    order = _make_order([('price', Money), ('party', Party)])
+    return type('InlineDefinitions', (types.Array,), {
+        '_attrs': {'items': order()},
+    })
+
+
+SharedDefinitions = _make_shared_definitions()
+InlineDefinitions = _make_inline_definitions()
+
+
+def shared_definitions_payload():
+    order = {}
+    for i in range(4):
+        order['price_%d' % i] = {'amount': 1.5 * i, 'currency': 'GBP'}
+        order['party_%d' % i] = {'name': 'party %d' % i, 'country': 'GB'}
+    return [dict(order) for _ in range(SHARED_ITEMS)]
+
+
+SHARED_ADDRESSES = 40
+DYNAMIC_KEYS = 60
+LANGUAGES = [
+    a + b for a in 'abcdefghijklmnopqrstuvwxyz' for b in 'aeiou'
+][:DYNAMIC_KEYS]
+
+
+class Translation(types.Object):
+    keyword = types.String()
+
+    class Attrs:
+        patterns = {
+            '^value_[a-z]{2}$': types.String(max_len=256),
+            '^note_[a-z]{2}$': types.String(),
+            '^count_[a-z]{2}$': types.Integer(minimum=0),
+        }
+
+
+def dynamic_keys_payload():
+    payload = {'keyword': 'greeting'}
+    for language in LANGUAGES:
+        payload['value_%s' % language] = 'hello in %s' % language
+    return payload
+
+
+class Address(types.Object):
+    street = types.String(max_len=100)
+    city = types.String(max_len=100, required=True)
+    zip = types.String(pattern=r'^[0-9]{5}$')
+
+
+def _make_shared_address():
+    return type('SharedAddress', (types.Object,), dict(
+        ('address_%02d' % i, Address()) for i in range(SHARED_ADDRESSES)
+    ))
+
+
+SharedAddress = _make_shared_address()
+
+
+class Comment(types.Object):
+    text = types.String()
+    created = types.DateTime()
+    replies = types.Array(items=types.Ref(ref='#'))
+
+
+def recursive_payload(depth=RECURSIVE_DEPTH):
+    """A comment with `depth` levels of replies (Python values)"""
+    moment = datetime.datetime(2015, 8, 12, 19, 44, 15)
+    root = comment = {'text': 'root', 'created': moment, 'replies': []}
+    for level in range(depth):
+        reply = {'text': 'level %d' % level, 'created': moment, 'replies': []}
+        comment['replies'].append(reply)
+        comment = reply
+    return root
+
+
+class Form(types.Object):
+    username = types.String(required=True, min_len=3, max_len=32)
+    email = types.String(required=True, max_len=128)
+    age = types.Integer(minimum=0, maximum=150)
+    newsletter = types.Boolean()
+    birthday = types.Date()
+    interests = types.Array(items=types.String())
+
+
+def form_payload():
+    return {
+        'username': 'palankai',
+        'email': 'someone@example.com',
+        'age': '33',
+        'newsletter': 'true',
+        'birthday': '1982-04-11',
+        'interests': '["python", "json"]',
+    }
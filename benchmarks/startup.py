@@ -0,0 +1,32 @@
+"""
+Startup time of a Python process importing pyrs.schema.
+"""
+import subprocess
+import sys
+
+from . import benchmark
+
+
+def _python(code):
+    command = [sys.executable, '-c', code]
+    return lambda: subprocess.check_call(command)
+
+
+@benchmark('startup.python')
+def python():
+    return _python('pass')
+
+
+@benchmark('startup.import')
+def import_schema():
+    return _python('import pyrs.schema')
+
+
+@benchmark('startup.import_and_validate')
+def import_and_validate():
+    return _python(
+        'from pyrs import schema\n'
+        'class A(schema.Object):\n'
+        '    at = schema.Date()\n'
+        'schema.JSONReader(A).read(\'{"at": "2015-08-12"}\')\n'
+    )
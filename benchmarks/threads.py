@@ -0,0 +1,71 @@
+"""
+Throughput of shared readers and writers used from many threads.
+
+Every call reads (or writes) the same number of documents, split between
+`n` threads of a pool, against one reader (writer) instance. The calls of
+the different thread counts do the same work, so the scaling is the ratio
+of their `ops_per_sec` to the single threaded one. With the GIL the
+threads don't scale (the ratio stays around 1), on free-threaded builds
+they should.
+"""
+import concurrent.futures
+
+from pyrs.schema import schemaio
+
+from . import benchmark
+from . import schemas
+
+
+THREADS = (1, 2, 4, 8)
+DOCUMENTS = 2000
+
+
+def _chunks(items, count):
+    return [items[i::count] for i in range(count)]
+
+
+def _run_in_threads(func, items, threads):
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+    chunks = _chunks(items, threads)
+
+    def work(chunk):
+        for item in chunk:
+            func(item)
+
+    def run():
+        for future in [executor.submit(work, c) for c in chunks]:
+            future.result()
+    # The threads of the pool are joined after the measurement
+    run.close = executor.shutdown
+    return run
+
+
+def _payloads():
+    return [
+        {
+            'id': i,
+            'name': 'item %d' % i,
+            'price': i * 1.5,
+            'tags': ['a', 'b'],
+        }
+        for i in range(DOCUMENTS)
+    ]
+
+
+def _register(threads):
+
+    @benchmark('threads.read.%d' % threads)
+    def read():
+        writer = schemaio.JSONWriter(schemas.Item)
+        data = [writer.write(payload) for payload in _payloads()]
+        reader = schemaio.JSONReader(schemas.Item)
+        return _run_in_threads(reader.read, data, threads)
+
+    @benchmark('threads.write.%d' % threads)
+    def write():
+        writer = schemaio.JSONWriter(schemas.Item)
+        return _run_in_threads(writer.write, _payloads(), threads)
+
+
+for _threads in THREADS:
+    _register(_threads)
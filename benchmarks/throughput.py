@@ -0,0 +1,175 @@
+"""
+Throughput of the read, write and validate paths.
+"""
+import json
+
+from pyrs.schema import base
+from pyrs.schema import schemaio
+from pyrs.schema import types
+
+from . import benchmark
+from . import schemas
+
+
+CASES = [
+    ('wide_object', schemas.WideObject, schemas.wide_payload),
+    ('deep_nesting', schemas.DeepObject, schemas.deep_payload),
+    ('large_array', schemas.ItemList, schemas.large_array_payload),
+    ('unique_tags', schemas.TagList, schemas.unique_tags_payload),
+    ('small_enum', schemas.SmallEnumLines, schemas.small_enum_payload),
+    ('large_enum', schemas.LargeEnumLines, schemas.large_enum_payload),
+    ('currency_decimal', schemas.DecimalInvoice,
+     schemas.decimal_currency_payload),
+    ('currency_float', schemas.FloatInvoice, schemas.float_currency_payload),
+    ('datetime', schemas.DateTimeObject, schemas.datetime_payload),
+    ('dynamic_keys', schemas.Translation, schemas.dynamic_keys_payload),
+    ('shared_definitions', schemas.SharedDefinitions,
+     schemas.shared_definitions_payload),
+    ('inline_definitions', schemas.InlineDefinitions,
+     schemas.shared_definitions_payload),
+]
+
+
+def _register(name, schema, payload):
+
+    @benchmark('read.%s' % name)
+    def read():
+        writer = schemaio.JSONWriter(schema)
+        data = writer.write(payload())
+        reader = schemaio.JSONReader(schema)
+        return lambda: reader.read(data)
+
+    @benchmark('write.%s' % name)
+    def write():
+        writer = schemaio.JSONWriter(schema)
+        data = payload()
+        return lambda: writer.write(data)
+
+    @benchmark('validate.%s' % name)
+    def validate():
+        validator = schemaio.JSONSchemaValidator(schema)
+        data = json.loads(schemaio.JSONWriter(schema).write(payload()))
+        return lambda: validator.validate(data)
+
+    @benchmark('validator_construction.%s' % name)
+    def validator_construction():
+        instance = schema()
+
+        def run():
+            # Built, not taken from the shared validators
+            base._validators.clear()
+            return schemaio.JSONSchemaValidator(instance)
+        return run
+
+    @benchmark('validator_construction.shared.%s' % name)
+    def validator_construction_shared():
+        instance = schema()
+        return lambda: schemaio.JSONSchemaValidator(instance)
+
+    @benchmark('fingerprint.%s' % name)
+    def fingerprint():
+        instance = schema()
+        return lambda: instance.fingerprint()
+
+    @benchmark('fingerprint.uncached.%s' % name)
+    def fingerprint_uncached():
+        instance = schema()
+
+        def run():
+            base.Schema.changed()
+            return instance.fingerprint()
+        return run
+
+    @benchmark('get_jsonschema.%s' % name)
+    def get_jsonschema():
+        instance = schema()
+        return lambda: instance.get_jsonschema()
+
+
+for _name, _schema, _payload in CASES:
+    _register(_name, _schema, _payload)
+
+
+@benchmark('jsonschema_writer.deduplicate.shared_address')
+def deduplicate():
+    writer = schemaio.JSONSchemaWriter(deduplicate=True)
+    instance = schemas.SharedAddress()
+    return lambda: writer.extract(instance)
+
+
+@benchmark('revalidate.large_array')
+def revalidate():
+    # An edit of one item, compare with validate.large_array
+    validator = schemaio.JSONSchemaValidator(schemas.ItemList)
+    data = schemas.large_array_payload()
+    validator.validate(data)
+    patch = [{'op': 'replace', 'path': '/100/price', 'value': 2.5}]
+    data[100]['price'] = 2.5
+    return lambda: validator.revalidate(data, patch=patch)
+
+
+@benchmark('iter_write.large_array')
+def iter_write():
+    writer = schemaio.JSONWriter(schemas.ItemList)
+    data = schemas.large_array_payload()
+    return lambda: sum(len(chunk) for chunk in writer.iter_write(data))
+
+
+def _register_records(name, schema):
+
+    @benchmark('read.records.%s' % name)
+    def read_records():
+        writer = schemaio.JSONWriter(schemas.Item)
+        data = [writer.write(row) for row in schemas.iter_large_array()]
+        reader = schemaio.JSONReader(schema)
+        return lambda: [reader.read(row) for row in data]
+
+
+_register_records('dict', schemas.Item)
+_register_records('model', schemas.ItemModel)
+
+
+@benchmark('read.partial.wide_object')
+def read_partial():
+    # A PATCH of two fields of the wide object
+    reader = schemaio.JSONReader(schemas.WideObject, partial=True)
+    data = json.dumps({'field_000': 1, 'field_001': 'value'})
+    return lambda: reader.read(data)
+
+
+@benchmark('read.form')
+def read_form():
+    reader = schemaio.JSONFormReader(schemas.Form)
+    data = schemas.form_payload()
+    return lambda: reader.read(data)
+
+
+def _extend_catalog(rebuild):
+    instance = schemas.make_catalog()()
+    validator = schemaio.JSONSchemaValidator(instance)
+    sections = list(instance.fields.values())
+    counter = [0]
+
+    def run():
+        index = counter[0]
+        counter[0] += 1
+        sections[index % len(sections)].extend(
+            {'extra_%d' % index: types.String()}
+        )
+        if rebuild:
+            # Everything is emitted, checked and built again
+            base.Schema.changed()
+            base._validators.clear()
+            base._checked.clear()
+        validator.validate({})
+    return run
+
+
+@benchmark('extend.incremental.catalog')
+def extend_incremental():
+    return _extend_catalog(rebuild=False)
+
+
+@benchmark('extend.rebuild.catalog')
+def extend_rebuild():
+    return _extend_catalog(rebuild=True)
@@ -1,11 +1,40 @@
 import collections
+import copy
 import datetime
+import hashlib
+import threading
 
-import jsonschema
 import six
 
 from . import lib
 from . import formats
+from . import keywords
+from . import optimize
+
+
+jsonschema = lib.LazyModule('jsonschema')
+
+# The context key of the fingerprint computation, the list collecting the
+# fingerprinted children, see `Schema._subschema`
+FINGERPRINT = 'fingerprint'
+
+# The context key of the contexts which cannot be serialised (e.g. keys of
+# mixed types), nothing is cached for them
+UNCACHED = object()
+
+# The cached (derived) attributes of the schemas, they aren't copied
+CACHE_ATTRIBUTES = frozenset([
+    '_fingerprints', '_graphs', '_contains_ref', '_graph_state', '_model'
+])
+
+# The keywords whose list value is unordered regarding JSON Schema
+UNORDERED_KEYWORDS = frozenset([
+    'required', 'enum', 'type', 'allOf', 'anyOf', 'oneOf'
+])
+
+# Guards the class level counters, the schemas could be created and
+# changed by many threads
+_lock = threading.Lock()
 
 
 class Schema(object):
@@ -13,10 +42,15 @@ class Schema(object):
     _attrs = None
     _fields = None
     _parent = None
+    _generation = 0
+    _epoch = 0
+    _version = 0
+    _fingerprints = None
 
     def __init__(self, _jsonschema=None, **attrs):
-        self._creation_index = Schema._creation_index
-        Schema._creation_index += 1
+        with _lock:
+            self._creation_index = Schema._creation_index
+            Schema._creation_index += 1
         if _jsonschema and getattr(self, '_jsonschema', None):
             raise AttributeError("The declared schema shouldn't be redefined")
         if _jsonschema:
@@ -69,6 +103,109 @@ class Schema(object):
     def get_jsonschema(self, context=None):
         return self._jsonschema
 
+    def _subschema(self, schema, context=None):
+        """
+        Gives back the JSON schema of a child schema. When the fingerprint
+        is computed only the fingerprint of the child is given back.
+        """
+        children = context.get(FINGERPRINT) if context else None
+        if children is not None:
+            context = context.copy()
+            del context[FINGERPRINT]
+            fingerprint = schema.fingerprint(context=context)
+            children.append((schema, context, fingerprint))
+            return {'$fingerprint': fingerprint}
+        return schema.get_jsonschema(context=context)
+
+    def fingerprint(self, context=None):
+        """
+        Gives back the canonical hash of the emitted JSON schema (see
+        `get_fingerprint`). The order of the properties and the order of the
+        unordered keywords (e.g. `required`, `enum`) don't matter. The
+        fingerprint is built from the cached fingerprints of the children.
+        After a change only the changed schemas are emitted again, the
+        cached fingerprint of a schema is kept as long as the schema itself
+        and the fingerprints of its children are the same.
+        """
+        key = _context_key(context)
+        fingerprints = self._fingerprints
+        if fingerprints is None:
+            fingerprints = self._fingerprints = {}
+        entry = fingerprints.get(key)
+        generation = Schema._generation
+        if entry is not None:
+            if entry[0] == generation:
+                return entry[1]
+            if self._is_unchanged(entry):
+                fingerprints[key] = (generation, ) + entry[1:]
+                return entry[1]
+        children = []
+        context = dict(context or {})
+        context[FINGERPRINT] = children
+        value = get_fingerprint(self.get_jsonschema(context=context))
+        if key is not UNCACHED:
+            fingerprints[key] = (
+                generation, value, Schema._epoch, self._version, children
+            )
+        return value
+
+    def _is_unchanged(self, entry):
+        _, _, epoch, version, children = entry
+        if epoch != Schema._epoch or version != self._version:
+            return False
+        return all(
+            child.fingerprint(context=context) == fingerprint
+            for child, context, fingerprint in children
+        )
+
+    @property
+    def version(self):
+        """The number of the changes of the schema itself"""
+        return self._version
+
+    @classmethod
+    def changed(cls):
+        """
+        Has to be called when a schema is changed after its creation, it
+        invalidates all of the cached fingerprints.
+        """
+        with _lock:
+            Schema._generation += 1
+            Schema._epoch += 1
+
+    def _changed(self):
+        """
+        Has to be called when the schema is changed by itself (e.g.
+        `Object.extend`), only the fingerprints depending on it are
+        invalidated.
+        """
+        with _lock:
+            self._version += 1
+            Schema._generation += 1
+
+    def snapshot(self):
+        """
+        Gives back a deep copy of the schema, the later changes of the
+        schema (or its subschemas) don't affect the copy. The readers and
+        writers of the copy remain on the current version.
+        """
+        return copy.deepcopy(self)
+
+    def __deepcopy__(self, memo):
+        cls = type(self)
+        clone = cls.__new__(cls)
+        memo[id(self)] = clone
+        for name, value in self.__dict__.items():
+            if name in CACHE_ATTRIBUTES:
+                continue
+            clone.__dict__[name] = copy.deepcopy(value, memo)
+        # The fields and the definitions of the class are copied as well,
+        # their schemas could be changed later
+        for name in ('_fields', '_definitions'):
+            if name not in self.__dict__ and getattr(cls, name, None):
+                clone.__dict__[name] = copy.deepcopy(getattr(cls, name), memo)
+        return clone
+
     def get_tags(self):
         return self.get_attr('tags', set())
 
@@ -176,7 +313,7 @@ class Base(Schema):
             definitions = collections.OrderedDict()
             for name, prop in self._definitions.items():
                 definitions[prop.get_attr("name", name)] = \
-                    prop.get_jsonschema(context=context)
+                    self._subschema(prop, context)
             schema["definitions"] = definitions
         return schema
 
@@ -184,6 +321,50 @@ class Base(Schema):
         return self.get_attr('name', default)
 
 
+def _context_key(context):
+    if not context:
+        return None
+    context = dict(
+        (k, v) for k, v in context.items()
+        if k not in (FINGERPRINT, 'profiler')
+    )
+    try:
+        return optimize.canonical(context, sets=True)
+    except (TypeError, ValueError):
+        return UNCACHED
+
+
+def get_fingerprint(schema):
+    """
+    Gives back the fingerprint of the JSON schema, the hash of the schema
+    where the subschemas are replaced by their fingerprint.
+    """
+    if isinstance(schema, dict) and list(schema) == ['$fingerprint']:
+        return schema['$fingerprint']
+    node = {}
+    for keyword, value in schema.items():
+        if keyword in optimize.SCHEMA_MAP_KEYWORDS and \
+                isinstance(value, dict):
+            value = dict((k, _fingerprinted(v)) for k, v in value.items())
+        elif keyword in optimize.SCHEMA_LIST_KEYWORDS and \
+                isinstance(value, list):
+            value = [_fingerprinted(v) for v in value]
+        elif keyword in optimize.SCHEMA_KEYWORDS:
+            value = _fingerprinted(value)
+        if keyword in UNORDERED_KEYWORDS and isinstance(value, list):
+            value = sorted(value, key=optimize.canonical)
+        node[keyword] = value
+    return hashlib.sha256(
+        optimize.canonical(node).encode('utf-8')
+    ).hexdigest()
+
+
+def _fingerprinted(schema):
+    if isinstance(schema, dict):
+        return {'$fingerprint': get_fingerprint(schema)}
+    return schema
+
+
 def _types_msg(instance, types, hint=''):
     reprs = []
     for type in types:
@@ -222,7 +403,7 @@ def _validate_type_draft4(validator, types, instance, schema):
                 isinstance(instance, (datetime.timedelta, int, float)):
             return
 
-        json_format_name = schema.get_attr('format')
+        json_format_name = schema.get('format')
         datetime_type_name = json_format_name.replace('-', '')
         hint = ' (for format %r strings, use a datetime.%s)' % (
             json_format_name, datetime_type_name
@@ -230,20 +411,192 @@ def _validate_type_draft4(validator, types, instance, schema):
         yield jsonschema.ValidationError(
             _types_msg(instance, types, hint)
         )
+        return
 
     if not any(validator.is_type(instance, type) for type in types):
         yield jsonschema.ValidationError(_types_msg(instance, types))
 
 
-def _make_validator(schema):
-    format_checker = jsonschema.FormatChecker(formats.draft4_format_checkers)
-    validator_funcs = jsonschema.Draft4Validator.VALIDATORS
-    validator_funcs[u'type'] = _validate_type_draft4
-    meta_schema = jsonschema.Draft4Validator.META_SCHEMA
-    validator_cls = jsonschema.validators.create(
-        meta_schema=meta_schema,
-        validators=validator_funcs,
-        version="draft4",
+def _profiled_properties(profiler):
+    properties = jsonschema.Draft4Validator.VALIDATORS[u'properties']
+
+    def _validate_properties(validator, props, instance, schema):
+        if not validator.is_type(instance, 'object'):
+            return
+        for prop, subschema in six.iteritems(props):
+            if prop not in instance:
+                continue
+            started = profiler.enter(prop)
+            try:
+                errors = list(properties(
+                    validator, {prop: subschema}, instance, schema
+                ))
+            finally:
+                profiler.leave('validate', started)
+            for error in errors:
+                yield error
+    return _validate_properties
+
+
+# The number of the validators kept by `_make_validator`
+VALIDATOR_CACHE_SIZE = 256
+
+_validator_class = None
+_validator_lock = threading.Lock()
+_validators = keywords.Cache(size=VALIDATOR_CACHE_SIZE)
+_checked = keywords.Cache()
+
+
+def _create_validator_class(profiler=None):
+    """
+    Creates the validator class with its own keyword table, the table of
+    `jsonschema` is copied, the class isn't registered in `jsonschema`.
+    """
+    validator_funcs = {u'type': _validate_type_draft4}
+    validator_funcs.update(keywords.VALIDATORS)
+    if profiler is not None:
+        validator_funcs[u'properties'] = _profiled_properties(profiler)
+    return jsonschema.validators.extend(
+        jsonschema.Draft4Validator, validators=validator_funcs
+    )
+
+
+def _get_validator_class():
+    """Gives back the validator class, it's created once"""
+    global _validator_class
+    if _validator_class is None:
+        with _validator_lock:
+            if _validator_class is None:
+                _validator_class = _create_validator_class()
+    return _validator_class
+
+
+def check_schema(validator_cls, schema):
+    """
+    Checks the JSON schema against the meta schema node by node: every
+    node is checked with its subschemas replaced by `{}`, the nodes already
+    checked are skipped. After a change of a large schema only the changed
+    nodes are checked again.
+    """
+    if not isinstance(schema, dict):
+        validator_cls.check_schema(schema)
+        return
+    stack = [schema]
+    while stack:
+        node, subschemas = optimize.split_subschemas(stack.pop())
+        stack.extend(subschemas)
+        key = optimize.canonical(node)
+        if key not in _checked:
+            validator_cls.check_schema(node)
+            _checked[key] = True
+
+
+def _make_validator(schema, profiler=None):
+    """
+    Gives back the validator of the JSON schema. The validators are
+    immutable, so the ones of the identical schemas are shared (including
+    between threads), only the profiled ones are built every time.
+    """
+    format_checker = formats.get_format_checker()
+    if profiler is not None:
+        return _build_validator(
+            _create_validator_class(profiler), schema, format_checker
+        )
+    key = optimize.canonical(schema)
+    cached = _validators.get(key)
+    # The validators of a replaced format checker are rebuilt
+    if cached is not None and cached.format_checker is format_checker:
+        return cached
+    validator = _build_validator(
+        _get_validator_class(), schema, format_checker
     )
-    validator_cls.check_schema(schema)
+    _validators[key] = validator
+    return validator
+
+
+def _build_validator(validator_cls, schema, format_checker):
+    check_schema(validator_cls, schema)
+    # The identical subschemas are shared by the validator
+    schema = link_refs(optimize.share_subschemas(schema), inplace=True)
     return validator_cls(schema, format_checker=format_checker)
+
+
+# The keywords whose value is data rather than (sub)schema
+DATA_KEYWORDS = frozenset(['enum', 'default', 'examples', 'const'])
+
+
+def link_refs(schema, inplace=False):
+    """
+    Gives back a copy (or the very same with `inplace`) of the JSON schema
+    where the local references are replaced by the referred subschema
+    itself, so the validator descends into them directly instead of
+    resolving the reference on every use.
+
+    The local pointers are resolved against the root like `jsonschema`
+    does, so the nested `definitions` are reached only by their full
+    pointer. The references which cannot be resolved are kept. The
+    recursive references produce cyclic data structure, so the result
+    shouldn't be serialised.
+    """
+    if not inplace:
+        schema = copy.deepcopy(schema)
+    if isinstance(schema, dict):
+        _link_refs(schema, schema)
+    return schema
+
+
+def _link_refs(node, root):
+    for key, value in list(node.items()):
+        if key in DATA_KEYWORDS:
+            continue
+        if isinstance(value, dict):
+            _link_ref_value(node, key, value, root)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                if isinstance(item, dict):
+                    _link_ref_value(value, index, item, root)
+
+
+def _link_ref_value(container, key, value, root):
+    target = _resolve_ref(value, root)
+    if target is not None:
+        container[key] = target
+    elif not isinstance(value.get('$ref'), six.string_types):
+        _link_refs(value, root)
+
+
+def _resolve_ref(schema, root):
+    seen = []
+    while isinstance(schema.get('$ref'), six.string_types):
+        if any(schema is s for s in seen):
+            return None
+        seen.append(schema)
+        schema = _lookup_ref(schema['$ref'], root)
+        if schema is None:
+            return None
+    return schema if seen else None
+
+
+def _lookup_ref(ref, root):
+    if not ref.startswith('#'):
+        return None
+    parts = [
+        part.replace('~1', '/').replace('~0', '~')
+        for part in ref[1:].split('/')[1:]
+    ]
+    node = root
+    for part in parts:
+        if isinstance(node, list):
+            try:
+                node = node[int(part)]
+            except (ValueError, IndexError):
+                return None
+        elif isinstance(node, dict) and part in node:
+            node = node[part]
+        else:
+            return None
+    return _as_schema(node)
+
+
+def _as_schema(value):
+    return value if isinstance(value, dict) else None
@@ -0,0 +1,199 @@
+"""
+JSON codec backends of the readers and writers.
+
+A codec is a small object with `loads`, `dumps` and `dumps_bytes` methods.
+The standard library :mod:`json` is always available, faster backends are
+used when they are installed. The `auto` codec is the fastest available one.
+
+.. code:: python
+
+    reader = JSONReader(MySchema, codec='auto')
+    writer = JSONWriter(MySchema, codec='orjson')
+
+Any object implementing the :class:`Codec` interface could be given instead
+of a name, and new backends could be registered by :func:`register_codec`.
+"""
+import codecs
+import collections
+import decimal
+import json
+import threading
+
+
+class Codec(object):
+    """
+    Abstract codec.
+
+    `loads` accepts text and UTF-8 encoded bytes (`bytes`, `bytearray` or
+    `memoryview`), `load` reads a binary file object. `dumps` gives back
+    text, `dumps_bytes` gives back UTF-8 encoded bytes and `dump` writes the
+    encoded bytes into a binary file object. The `default` of the dump
+    methods is called with the objects the codec cannot serialise (including
+    the `datetime` types), it should give back a serialisable value or raise
+    `TypeError`.
+
+    `loads_decimal` and `load_decimal` parse the non-integer numbers as
+    `decimal.Decimal`, by the standard library unless the codec overrides
+    them.
+
+    The `item_separator` is the separator of the array items in the output,
+    the arrays written item by item are joined by it.
+    """
+    name = None
+    item_separator = b', '
+
+    def loads(self, data):
+        raise NotImplementedError('The loads method of Codec is abstract')
+
+    def load(self, fp):
+        return self.loads(fp.read())
+
+    def loads_decimal(self, data):
+        return _json_loads(data, parse_float=decimal.Decimal)
+
+    def load_decimal(self, fp):
+        return self.loads_decimal(fp.read())
+
+    def dumps(self, obj, default=None):
+        raise NotImplementedError('The dumps method of Codec is abstract')
+
+    def dumps_bytes(self, obj, default=None):
+        return self.dumps(obj, default=default).encode('utf-8')
+
+    def dump(self, obj, fp, default=None):
+        fp.write(self.dumps_bytes(obj, default=default))
+
+
+class JSONCodec(Codec):
+    """Codec of the standard library :mod:`json`"""
+    name = 'json'
+    buffer_size = 64 * 1024
+
+    def loads(self, data):
+        return _json_loads(data)
+
+    def dumps(self, obj, default=None):
+        return json.dumps(obj, default=default)
+
+    def dump(self, obj, fp, default=None):
+        """Write the encoded chunks in buffers of `buffer_size`,
+        the whole encoded text is never built."""
+        encoder = json.JSONEncoder(default=default)
+        chunks = []
+        size = 0
+        for chunk in encoder.iterencode(obj):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.buffer_size:
+                fp.write(''.join(chunks).encode('utf-8'))
+                chunks = []
+                size = 0
+        if chunks:
+            fp.write(''.join(chunks).encode('utf-8'))
+
+
+class OrjsonCodec(Codec):
+    """
+    Codec of `orjson`. The output is compact (no whitespace) and non-ASCII
+    characters are not escaped.
+    Documents out of the range of `orjson` (eg. integers above 64 bit) are
+    written by the standard library. The parsing differs from the standard
+    library: the integers above 64 bit are parsed as floats, and the
+    invalid input (eg. lone surrogates) is rejected with other messages.
+    """
+    name = 'orjson'
+    item_separator = b','
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = (
+            orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        )
+
+    def loads(self, data):
+        # `orjson.JSONDecodeError` is a `ValueError` like the one of `json`
+        return self._orjson.loads(data)
+
+    def dumps(self, obj, default=None):
+        return self.dumps_bytes(obj, default=default).decode('utf-8')
+
+    def dumps_bytes(self, obj, default=None):
+        try:
+            return self._orjson.dumps(
+                obj, default=default, option=self._options
+            )
+        except self._orjson.JSONEncodeError:
+            return json.dumps(obj, default=default).encode('utf-8')
+
+
+def _json_loads(data, **kwargs):
+    try:
+        if isinstance(data, memoryview):
+            # decoded straight from the buffer, without a copy as bytes
+            data = codecs.decode(data, 'utf-8')
+        return json.loads(data, **kwargs)
+    except UnicodeDecodeError as ex:
+        # `ex.args[0]` is only the name of the encoding
+        raise ValueError('Invalid UTF-8 at byte %d: %s' % (ex.start, ex))
+
+
+# The order is the order of preference of the `auto` codec
+CODECS = collections.OrderedDict([
+    ('orjson', OrjsonCodec),
+    ('json', JSONCodec),
+])
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def register_codec(name, factory, preferred=False):
+    """
+    Register a codec factory (usually the class) under the name.
+    The factory should raise `ImportError` when the backend is unavailable.
+    The preferred codec is the first choice of the `auto` codec.
+    """
+    with _lock:
+        CODECS[name] = factory
+        if preferred:
+            items = [(name, factory)] + [
+                (k, v) for k, v in CODECS.items() if k != name
+            ]
+            CODECS.clear()
+            CODECS.update(items)
+        _instances.pop(name, None)
+        _instances.pop('auto', None)
+
+
+def available_codecs():
+    """Gives back the names of the installed codecs in order of preference"""
+    names = []
+    for name in list(CODECS):
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_codec(codec=None):
+    """
+    Gives back the codec instance. The `codec` could be a :class:`Codec`,
+    the name of a registered codec or `auto` (`None` is the same as `auto`).
+    """
+    if isinstance(codec, Codec):
+        return codec
+    name = codec or 'auto'
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    if name == 'auto':
+        instance = get_codec(available_codecs()[0])
+    elif name in CODECS:
+        instance = CODECS[name]()
+    else:
+        raise ValueError('Unknown JSON codec: %r' % name)
+    with _lock:
+        return _instances.setdefault(name, instance)
@@ -0,0 +1,64 @@
+"""
+Runtime support of the modules generated by :mod:`pyrs.schema.compiler`.
+
+A compiled schema carries the JSON schema emitted at compile time and the
+generated converter functions, so neither the declaration of the source
+schema classes nor `get_jsonschema` runs when it is used.
+"""
+import decimal
+import importlib
+
+from . import base
+from . import exceptions
+
+
+Decimal = decimal.Decimal
+ValidationErrors = exceptions.ValidationErrors
+
+
+class CompiledSchema(base.Schema):
+    """
+    Schema generated by the compiler. The subclasses define `_jsonschema`
+    and optionally the `_compiled_to_python` and `_compiled_to_raw`
+    functions with the signature `(value, context=None)`.
+    """
+    _jsonschema = None
+    _compiled_to_python = None
+    _compiled_to_raw = None
+
+    def to_python(self, value, path='', context=None):
+        if self._compiled_to_python is None:
+            return value
+        return self._compiled_to_python(value, context=context)
+
+    def to_raw(self, value, context=None):
+        if self._compiled_to_raw is None:
+            return value
+        return self._compiled_to_raw(value, context=context)
+
+
+def update_errors(errors, ex, name):
+    """Same as `types.Object._update_errors_by_exception`"""
+    for error in ex.errors:
+        if error['path']:
+            error['path'] = name + '.' + error['path']
+        else:
+            error['path'] = name
+        errors.append(error)
+
+
+def raise_errors(errors, value):
+    """Same as `types.Object._raise_exception_when_errors`"""
+    if errors:
+        raise exceptions.ValidationErrors(
+            '%s validation error(s) raised' % len(errors),
+            value=value,
+            errors=errors
+        )
+
+
+def load_class(module, qualname):
+    obj = importlib.import_module(module)
+    for name in qualname.split('.'):
+        obj = getattr(obj, name)
+    return obj
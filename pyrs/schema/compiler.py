@@ -0,0 +1,385 @@
+"""
+Ahead-of-time compilation of schema modules.
+
+The compiler imports a module of schema classes and generates a standalone
+Python module with a :class:`pyrs.schema.compiled.CompiledSchema` for every
+schema class. The generated classes carry the emitted JSON schema as a
+literal and specialised `to_python` / `to_raw` functions where the object
+traversal is unrolled and the fields without conversion are simply copied.
+Importing the generated module doesn't import the source module, so the
+declaration of the schema classes and `get_jsonschema` are skipped entirely.
+
+.. code:: bash
+
+    python -m pyrs.schema.compiler myapp.schemas -o myapp/compiled.py
+    python -m pyrs.schema.compiler myapp.schemas -o myapp/compiled.py --check
+
+The `--check` exits with non-zero status when the generated module is stale,
+i.e. the source schemas (or the compiler) changed since the generation.
+
+The compiled schemas are emitted with the default context. Custom schema
+types (the ones which override the conversion) and the objects with
+references are loaded from their module when the compiled module is
+imported.
+"""
+import argparse
+import ast
+import collections
+import decimal
+import hashlib
+import importlib
+import inspect
+import pprint
+import re
+import sys
+
+from . import base
+from . import graph
+from . import types
+
+
+HASH_PREFIX = '# source-hash: '
+
+
+class CompileError(Exception):
+    pass
+
+
+def _plain(value):
+    if isinstance(value, dict):
+        return dict((k, _plain(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _literal(value):
+    text = pprint.pformat(_plain(value), width=72, **_PFORMAT_OPTIONS)
+    try:
+        if ast.literal_eval(text) != _plain(value):
+            raise ValueError(text)
+    except (ValueError, SyntaxError):
+        raise CompileError('Cannot be represented as literal: %r' % value)
+    return text
+
+
+def _source(value):
+    """
+    The source of the value, `_literal` unless it has `Decimal` in it, the
+    `Decimal` values are built by the `compiled` module.
+    """
+    if isinstance(value, decimal.Decimal):
+        return '_compiled.Decimal(%r)' % str(value)
+    if not _has_decimal(value):
+        return _literal(value)
+    if isinstance(value, dict):
+        return '{%s}' % ', '.join(
+            '%s: %s' % (_literal(k), _source(v)) for k, v in value.items()
+        )
+    return '[%s]' % ', '.join(_source(v) for v in value)
+
+
+def _has_decimal(value):
+    if isinstance(value, decimal.Decimal):
+        return True
+    if isinstance(value, dict):
+        return any(_has_decimal(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_decimal(v) for v in value)
+    return False
+
+
+try:
+    pprint.pformat({}, sort_dicts=False)
+    _PFORMAT_OPTIONS = {'sort_dicts': False}
+except TypeError:  # pragma: no cover
+    _PFORMAT_OPTIONS = {}
+
+
+def _is_identity(schema, method):
+    return getattr(type(schema), method) is getattr(base.Schema, method)
+
+
+def _is_object(schema):
+    return (
+        isinstance(schema, types.Object) and
+        type(schema).to_python is types.Object.to_python and
+        type(schema).to_raw is types.Object.to_raw and
+        # The objects with model are converted by themselves
+        not schema.get_attr('model') and
+        # The objects with references are converted by their graph
+        not graph.contains_ref(schema)
+    )
+
+
+def get_schema_classes(module):
+    """Gives back the public schema classes defined in the module"""
+    classes = []
+    for name, value in vars(module).items():
+        if name.startswith('_') or not inspect.isclass(value):
+            continue
+        if not issubclass(value, base.Schema):
+            continue
+        if value.__module__ != module.__name__:
+            continue
+        classes.append((name, value))
+    return sorted(classes, key=lambda item: item[0])
+
+
+class Compiler(object):
+
+    def __init__(self, module_name):
+        self.module_name = module_name
+        self.lines = []
+        self.leaves = collections.OrderedDict()
+        self.objects = {}
+        self.counter = 0
+
+    def _name(self, prefix):
+        self.counter += 1
+        return '_%s%d' % (prefix, self.counter)
+
+    def compile(self):
+        module = importlib.import_module(self.module_name)
+        classes = []
+        for name, cls in get_schema_classes(module):
+            schema = cls()
+            classes.append(self._class(name, schema))
+        header = [
+            'from pyrs.schema import compiled as _compiled',
+            '',
+            '',
+            'SOURCE = %r' % self.module_name,
+            '',
+        ]
+        for var, (module_name, qualname, attrs) in self.leaves.items():
+            header.append('%s = _compiled.load_class(%r, %r)(**%s)' % (
+                var, module_name, qualname, attrs
+            ))
+        body = '\n'.join(header + self.lines + classes).rstrip() + '\n'
+        digest = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        return (
+            '# Generated by pyrs.schema.compiler from %s, do not edit.\n'
+            '%s%s\n%s' % (self.module_name, HASH_PREFIX, digest, body)
+        )
+
+    def _class(self, name, schema):
+        to_python, to_raw = self._converters(schema)
+        lines = [
+            '',
+            '',
+            'class %s(_compiled.CompiledSchema):' % name,
+            '    _jsonschema = (',
+            '        %s' % self._indent(_source(schema.get_jsonschema()), 8),
+            '    )',
+        ]
+        if to_python:
+            lines.append(
+                '    _compiled_to_python = staticmethod(%s)' % to_python
+            )
+        if to_raw:
+            lines.append('    _compiled_to_raw = staticmethod(%s)' % to_raw)
+        return '\n'.join(lines)
+
+    def _indent(self, text, size):
+        return text.replace('\n', '\n' + ' ' * size)
+
+    def _converters(self, schema):
+        if _is_object(schema):
+            return self._object(schema)
+        to_python = to_raw = None
+        if not _is_identity(schema, 'to_python') or \
+                not _is_identity(schema, 'to_raw'):
+            leaf = self._leaf(schema)
+            to_python = '%s.to_python' % leaf
+            to_raw = '%s.to_raw' % leaf
+        return to_python, to_raw
+
+    def _leaf(self, schema):
+        cls = type(schema)
+        qualname = getattr(cls, '__qualname__', cls.__name__)
+        if '<locals>' in qualname:
+            raise CompileError(
+                'The type %s is not importable' % qualname
+            )
+        try:
+            attrs = _source(dict(schema._attrs or {}))
+        except CompileError:
+            raise CompileError(
+                'The attributes of %s cannot be compiled' % qualname
+            )
+        key = (cls.__module__, qualname, attrs)
+        for var, value in self.leaves.items():
+            if value == key:
+                return var
+        var = self._name('type')
+        self.leaves[var] = key
+        return var
+
+    def _object(self, schema):
+        fields = []
+        for field, prop in schema.fields.items() if schema.fields else ():
+            fields.append(
+                (field, prop.get_attr('name', field), self._field(prop))
+            )
+        # The structurally identical objects share the converters
+        key = tuple(fields)
+        if key in self.objects:
+            return self.objects[key]
+        to_python = self._name('to_python')
+        to_raw = self._name('to_raw')
+        self.objects[key] = (to_python, to_raw)
+        self.lines.extend(self._to_python_function(to_python, fields))
+        self.lines.extend(self._to_raw_function(to_raw, fields))
+        return to_python, to_raw
+
+    def _field(self, prop):
+        if _is_object(prop):
+            to_python, to_raw = self._object(prop)
+            return '%s(%%s, context=context)' % to_python, \
+                '%s(%%s, context=context)' % to_raw
+        to_python = to_raw = None
+        if not _is_identity(prop, 'to_python'):
+            to_python = '%s.to_python(%%s, context=context)' % \
+                self._leaf(prop)
+        if not _is_identity(prop, 'to_raw'):
+            to_raw = '%s.to_raw(%%s, context=context)' % self._leaf(prop)
+        return to_python, to_raw
+
+    def _to_python_function(self, func, fields):
+        lines = [
+            '',
+            '',
+            'def %s(value, context=None):' % func,
+            '    value = value.copy()',
+            '    res = {}',
+            '    errors = []',
+        ]
+        for field, name, (to_python, _) in fields:
+            lines.append('    if %r in value:' % name)
+            if to_python is None:
+                lines.append(
+                    '        res[%r] = value.pop(%r)' % (field, name)
+                )
+                continue
+            lines.extend([
+                '        try:',
+                '            res[%r] = %s' % (
+                    field, to_python % ('value.pop(%r)' % name)
+                ),
+                '        except _compiled.ValidationErrors as ex:',
+                '            _compiled.update_errors(errors, ex, %r)' % name,
+            ])
+        lines.extend([
+            '    _compiled.raise_errors(errors, value)',
+            '    res.update(value)',
+            '    return res',
+        ])
+        return lines
+
+    def _to_raw_function(self, func, fields):
+        lines = [
+            '',
+            '',
+            'def %s(value, context=None):' % func,
+            '    if value is None:',
+            '        return None',
+            '    res = {}',
+            '    value = value.copy()',
+            '    errors = []',
+        ]
+        for field, name, (_, to_raw) in fields:
+            lines.append('    if %r in value:' % field)
+            if to_raw is None:
+                lines.append(
+                    '        res[%r] = value.pop(%r)' % (name, field)
+                )
+                continue
+            lines.extend([
+                '        try:',
+                '            res[%r] = %s' % (
+                    name, to_raw % ('value.pop(%r)' % field)
+                ),
+                '        except _compiled.ValidationErrors as ex:',
+                '            _compiled.update_errors(errors, ex, %r)' % name,
+            ])
+        lines.extend([
+            '    _compiled.raise_errors(errors, value)',
+            '    res.update(value)',
+            '    return res',
+        ])
+        return lines
+
+
+def compile_module(module_name):
+    """Gives back the source of the compiled module"""
+    return Compiler(module_name).compile()
+
+
+def get_source_hash(source):
+    match = re.search(
+        '^' + re.escape(HASH_PREFIX) + '([0-9a-f]+)$', source, re.MULTILINE
+    )
+    return match.group(1) if match else None
+
+
+def is_stale(module_name, compiled_source):
+    """
+    Tells whether the compiled source is out of date regarding the source
+    module (and the current version of the compiler).
+    """
+    expected = get_source_hash(compile_module(module_name))
+    return get_source_hash(compiled_source) != expected
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m pyrs.schema.compiler',
+        description='Compile the schema classes of a module into a '
+                    'standalone Python module.'
+    )
+    parser.add_argument('module', help='dotted path of the schema module')
+    parser.add_argument(
+        '-o', '--output', help='the generated file (default: stdout)'
+    )
+    parser.add_argument(
+        '--check', action='store_true',
+        help='do not generate, exit with status 1 if the output is stale'
+    )
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    try:
+        return _run(args)
+    except CompileError as ex:
+        sys.stderr.write('Cannot compile %s: %s\n' % (args.module, ex))
+        return 2
+
+
+def _run(args):
+    if args.check:
+        if not args.output:
+            sys.stderr.write('--check requires --output\n')
+            return 2
+        try:
+            with open(args.output) as f:
+                compiled_source = f.read()
+        except IOError:
+            compiled_source = ''
+        if is_stale(args.module, compiled_source):
+            sys.stderr.write('%s is stale\n' % args.output)
+            return 1
+        return 0
+    source = compile_module(args.module)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(source)
+    else:
+        sys.stdout.write(source)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,23 @@
 import datetime
 import re
+import threading
 
-import isodate
-import jsonschema
 import six
 
+from . import lib
 
-draft4_format_checkers = list(jsonschema.draft4_format_checker.checkers.keys())
+
+isodate = lib.LazyModule('isodate')
+jsonschema = lib.LazyModule('jsonschema')
+
+# The format checkers registered by `format_checker`, name -> (func, raises)
+format_checkers = {}
+
+_format_checker = None
+_lock = threading.Lock()
+
+# The `raises` of the temporal formats, `isodate` is imported on first use
+ISO8601_ERRORS = 'iso8601'
 
 
 def parse_datetime(datetimestring):
@@ -29,14 +40,55 @@ def parse_datetime(datetimestring):
 
 
 def format_checker(name, raises=()):
+    """
+    Registers a format checker. The exceptions in `raises` raised by the
+    checker mean invalid instance, `ISO8601_ERRORS` stands for the
+    `ValueError` and the `isodate.ISO8601Error`.
+    """
     def wrap(func):
-        draft4_format_checkers.append(name)
-        func = jsonschema.FormatChecker.cls_checks(name, raises)(func)
+        global _format_checker
+        with _lock:
+            format_checkers[name] = (func, raises)
+            _format_checker = None
         return func
     return wrap
 
 
-@format_checker('date', (ValueError, isodate.ISO8601Error, ))
+def _get_draft4_format_checker():
+    validator = jsonschema.Draft4Validator
+    if hasattr(validator, 'FORMAT_CHECKER'):
+        return validator.FORMAT_CHECKER
+    return jsonschema.draft4_format_checker  # pragma: no cover
+
+
+def get_format_checker():
+    """
+    Gives back the `jsonschema.FormatChecker` with the draft4 and the
+    registered formats. It is built on the first use, so neither
+    `jsonschema` nor `isodate` is imported before validation.
+    """
+    global _format_checker
+    checker = _format_checker
+    if checker is None:
+        with _lock:
+            if _format_checker is None:
+                _format_checker = _build_format_checker()
+            checker = _format_checker
+    return checker
+
+
+def _build_format_checker():
+    checker = jsonschema.FormatChecker(
+        list(_get_draft4_format_checker().checkers)
+    )
+    for name, (func, raises) in format_checkers.items():
+        if raises == ISO8601_ERRORS:
+            raises = (ValueError, isodate.ISO8601Error)
+        checker.checks(name, raises)(func)
+    return checker
+
+
+@format_checker('date', ISO8601_ERRORS)
 def date_format_checker(instance):
     if isinstance(instance, datetime.date):
         return True
@@ -44,7 +96,7 @@ def date_format_checker(instance):
         return isodate.parse_date(instance)
 
 
-@format_checker('datetime', (ValueError, isodate.ISO8601Error, ))
+@format_checker('datetime', ISO8601_ERRORS)
 def datetime_format_checker(instance):
     if isinstance(instance, datetime.datetime):
         return True
@@ -52,7 +104,7 @@ def datetime_format_checker(instance):
         return parse_datetime(instance)
 
 
-@format_checker('time', (ValueError, isodate.ISO8601Error, ))
+@format_checker('time', ISO8601_ERRORS)
 def time_format_checker(instance):
     if isinstance(instance, datetime.datetime):
         return True
@@ -60,7 +112,7 @@ def time_format_checker(instance):
         return isodate.parse_time(instance)
 
 
-@format_checker('duration', (ValueError, isodate.ISO8601Error, ))
+@format_checker('duration', ISO8601_ERRORS)
 def duration_format_checker(instance):
     if isinstance(instance, (datetime.timedelta, int, float)):
         return True
@@ -0,0 +1,645 @@
+"""
+Compiled node graph of schemas with references.
+
+The schema is compiled into a graph of nodes where every :class:`types.Ref`
+is replaced by the node of the referred schema, so the recursive schemas
+(comments with replies, org charts) become cyclic graphs. Every schema
+instance is compiled only once, the compilation doesn't recurse into the
+nodes already compiled, so it stops on the cycles.
+
+The conversion (`to_python` / `to_raw`) and the validation of the recursive
+schemas walk the document by an explicit stack instead of Python recursion,
+so deep documents aren't limited by the recursion limit. On the graph the
+items of the arrays are converted as well.
+
+The graph validates node by node, so a changed document is revalidated by
+visiting only the changed subtrees and their ancestors (see
+`Graph.iter_changed_errors`).
+
+.. code:: python
+
+    class Comment(types.Object):
+        text = types.String()
+        created = types.DateTime()
+        replies = types.Array(items=types.Ref(ref='#'))
+
+The references are resolved like in the emitted JSON schema, against the
+root: the `ref` is the name of a definition declared by the `Definitions`
+of the root schema, or `#` for the root schema itself. So `Comment` above
+is recursive only as the root; embedded into another schema its replies
+would be the outer schema. The recursive schemas to embed are declared as
+definitions and referred by name:
+
+.. code:: python
+
+    class Comment(types.Object):
+        text = types.String()
+        replies = types.Array(items=types.Ref(ref='comment'))
+
+    class Post(types.Object):
+        title = types.String()
+        comments = types.Array(items=types.Ref(ref='comment'))
+
+        class Definitions:
+            comment = Comment()
+"""
+import six
+
+from . import base
+from . import exceptions
+from . import types
+
+
+# The name of the root schema among the definitions of the node validators
+ROOT_DEFINITION = '__root__'
+
+
+class Node(object):
+    container = False
+
+    def __init__(self, schema):
+        self.schema = schema
+
+    @property
+    def interned(self):
+        """Tells whether the node has anything to intern"""
+        return self.container
+
+
+class Leaf(Node):
+    """The schema is converted by its own `to_python` and `to_raw`"""
+
+    def __init__(self, schema):
+        super(Leaf, self).__init__(schema)
+        self.identity = (
+            _is_inherited(schema, 'to_python', base.Schema) and
+            _is_inherited(schema, 'to_raw', base.Schema)
+        )
+        # The canonical instances of the string values of the enum
+        self.values = dict(
+            (value, value) for value in schema.get_attr('enum') or ()
+            if isinstance(value, six.string_types)
+        ) or None
+
+    def get_jsonschema(self, context=None):
+        return self.schema.get_jsonschema(context=context)
+
+    @property
+    def interned(self):
+        return self.values is not None
+
+
+class Container(Node):
+    container = True
+    _validator = None
+
+    def get_validator(self, context=None, graph=None):
+        """
+        Gives back the validator of the node itself, the container children
+        are not validated by it. The references are resolved against the
+        root of the `graph`.
+        """
+        validator = self._validator
+        if validator is None:
+            schema = self.schema.get_jsonschema(context=context)
+            self._shallow(schema, context)
+            schema.pop('definitions', None)
+            if _rebase(schema) and graph is not None:
+                schema['definitions'] = graph.get_definitions()
+            validator = self._validator = base._make_validator(schema)
+        return validator
+
+    def _subschema(self, node, context):
+        if node.container:
+            return {}
+        return node.get_jsonschema(context=context)
+
+
+class ObjectNode(Container):
+    _keys = None
+
+    def __init__(self, schema):
+        super(ObjectNode, self).__init__(schema)
+        self.fields = []
+
+    def _shallow(self, schema, context):
+        properties = schema.get('properties', {})
+        for _, name, node in self.fields:
+            if name in properties:
+                properties[name] = self._subschema(node, context)
+
+    def to_python(self, value, tasks, path):
+        if not isinstance(value, dict):
+            return value
+        value = value.copy()
+        res = {}
+        for field, name, node in self.fields:
+            if name in value:
+                res[field] = value.pop(name)
+                tasks.append((node, res, field, (name, path)))
+        res.update(value)
+        return res
+
+    def to_raw(self, value, tasks, path):
+        if not isinstance(value, dict):
+            return value
+        value = value.copy()
+        res = {}
+        for field, name, node in self.fields:
+            if field in value:
+                res[name] = value.pop(field)
+                tasks.append((node, res, name, (name, path)))
+        res.update(value)
+        return res
+
+    def children(self, instance):
+        if not isinstance(instance, dict):
+            return
+        for _, name, node in self.fields:
+            if node.container and name in instance:
+                yield node, instance[name], name
+
+    def get_child(self, instance, key):
+        if not isinstance(instance, dict) or key not in instance:
+            return None
+        for _, name, node in self.fields:
+            if name == key and node.container:
+                return node, instance[name], name
+        return None
+
+    def intern(self, value, tasks):
+        if not isinstance(value, dict):
+            return value
+        keys = self._get_keys()
+        # The converted objects have the canonical keys already
+        if any(keys.get(key, key) is not key for key in value):
+            value = dict(
+                (keys.get(key, key), item) for key, item in value.items()
+            )
+        for field, name, node in self.fields:
+            if not node.interned:
+                continue
+            if field in value:
+                tasks.append((node, value, field))
+            elif name in value:
+                tasks.append((node, value, name))
+        return value
+
+    def _get_keys(self):
+        # Both the field and the name (the converted and the raw key)
+        keys = self._keys
+        if keys is None:
+            keys = {}
+            for field, name, _ in self.fields:
+                keys[field] = field
+                keys[name] = name
+            self._keys = keys
+        return keys
+
+
+class ArrayNode(Container):
+
+    def __init__(self, schema):
+        super(ArrayNode, self).__init__(schema)
+        self.items = None
+        self.additional = None
+
+    def _shallow(self, schema, context):
+        if isinstance(self.items, list):
+            schema['items'] = [
+                self._subschema(node, context) for node in self.items
+            ]
+        elif self.items is not None and self.items.container:
+            # Validated by the node of the items, `{}` would be the same
+            # as no `items` but it's descended into
+            schema.pop('items', None)
+        elif self.items is not None:
+            schema['items'] = self._subschema(self.items, context)
+        if self.additional is not None:
+            schema['additionalItems'] = \
+                self._subschema(self.additional, context)
+
+    def _item_nodes(self, value):
+        for index in range(len(value)):
+            node = self._item_node(index)
+            if node is not None:
+                yield index, node
+
+    def _item_node(self, index):
+        if not isinstance(self.items, list):
+            return self.items
+        if index < len(self.items):
+            return self.items[index]
+        return self.additional
+
+    def _convert(self, value, tasks, path):
+        if not isinstance(value, (list, tuple)):
+            return value
+        res = list(value)
+        for index, node in self._item_nodes(res):
+            tasks.append((node, res, index, (index, path)))
+        return res
+
+    to_python = to_raw = _convert
+
+    def children(self, instance):
+        if not isinstance(instance, list):
+            return
+        for index, node in self._item_nodes(instance):
+            if node.container:
+                yield node, instance[index], index
+
+    def intern(self, value, tasks):
+        if isinstance(value, list):
+            for index, node in self._item_nodes(value):
+                if node.interned:
+                    tasks.append((node, value, index))
+        return value
+
+    def get_child(self, instance, key):
+        if not isinstance(instance, list) or not key.isdigit():
+            return None
+        index = int(key)
+        if index >= len(instance):
+            return None
+        node = self._item_node(index)
+        if node is None or not node.container:
+            return None
+        return node, instance[index], index
+
+
+class Graph(object):
+    """
+    The compiled graph of the schema. `recursive` tells whether the graph
+    has a cycle, i.e. the documents can be arbitrarily deep.
+    """
+
+    def __init__(self, schema, context=None):
+        self.context = context
+        self._nodes = {}
+        self._pending = []
+        self._definitions_schema = None
+        self.root = self._compile(schema)
+        self.recursive = self._has_cycle()
+
+    def _compile(self, schema):
+        self._root_schema = schema
+        self._definitions = _get_definitions(schema)
+        root = self._get_node(schema, root=True)
+        while self._pending:
+            node = self._pending.pop()
+            if isinstance(node, ObjectNode):
+                for field, prop in (node.schema.fields or {}).items():
+                    node.fields.append((
+                        field, prop.get_attr('name', field),
+                        self._resolve(prop)
+                    ))
+            elif isinstance(node, ArrayNode):
+                items = node.schema.get_attr('items')
+                if isinstance(items, (list, tuple)):
+                    node.items = [self._resolve(s) for s in items]
+                elif isinstance(items, base.Schema):
+                    node.items = self._resolve(items)
+                additional = node.schema.get_attr('additional')
+                if isinstance(additional, base.Schema):
+                    node.additional = self._resolve(additional)
+        return root
+
+    def get_definitions(self):
+        """
+        The `definitions` of the root JSON schema for the node validators,
+        the root itself is among them and the references to it (`#`) point
+        there, as a node schema is not the root of the document.
+        """
+        if self._definitions_schema is None:
+            root = self._root_schema.get_jsonschema(context=self.context)
+            definitions = root.pop('definitions', None) or {}
+            definitions[ROOT_DEFINITION] = root
+            _rebase(definitions)
+            self._definitions_schema = definitions
+        return self._definitions_schema
+
+    def _get_node(self, schema, root=False):
+        node = self._nodes.get(id(schema))
+        if node is not None:
+            return node
+        if isinstance(schema, types.Object) and (root or _is_object(schema)):
+            node = ObjectNode(schema)
+        elif isinstance(schema, types.Array) and \
+                _is_inherited(schema, 'to_python', types.Array) and \
+                _is_inherited(schema, 'to_raw', types.Array):
+            node = ArrayNode(schema)
+        else:
+            node = Leaf(schema)
+        self._nodes[id(schema)] = node
+        if node.container:
+            self._pending.append(node)
+        return node
+
+    def _resolve(self, schema):
+        # Against the root, like the emitted `$ref`
+        seen = set()
+        while isinstance(schema, types.Ref) and id(schema) not in seen:
+            seen.add(id(schema))
+            ref = schema.get_attr('ref')
+            if ref == '#':
+                return self._nodes[id(self._root_schema)]
+            if ref.startswith('#/definitions/'):
+                ref = ref[len('#/definitions/'):]
+            if ref not in self._definitions:
+                break
+            schema = self._definitions[ref]
+        return self._get_node(schema)
+
+    def _has_cycle(self):
+        # Iterative depth-first search, grey nodes are on the current path
+        grey, black = set(), set()
+        stack = [(self.root, iter(_children(self.root)))]
+        grey.add(id(self.root))
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                grey.discard(id(node))
+                black.add(id(node))
+                continue
+            if id(child) in grey:
+                return True
+            if id(child) not in black:
+                grey.add(id(child))
+                stack.append((child, iter(_children(child))))
+        return False
+
+    def to_python(self, value, context=None):
+        return self._convert('to_python', value, context)
+
+    def to_raw(self, value, context=None):
+        if value is None:
+            return None
+        return self._convert('to_raw', value, context)
+
+    def _convert(self, method, value, context):
+        errors = []
+        result = [value]
+        # The paths are linked as (key, parent path) pairs, so they aren't
+        # copied per level on deep documents
+        stack = [(self.root, result, 0, None)]
+        tasks = []
+        while stack:
+            node, target, key, path = stack.pop()
+            if node.container:
+                target[key] = getattr(node, method)(target[key], tasks, path)
+                # Reversed, so the children are converted in order
+                stack.extend(reversed(tasks))
+                del tasks[:]
+            elif not node.identity:
+                try:
+                    target[key] = getattr(node.schema, method)(
+                        target[key], context=context
+                    )
+                except exceptions.ValidationErrors as ex:
+                    _update_errors(errors, ex, path)
+        if errors:
+            raise exceptions.ValidationErrors(
+                '%s validation error(s) raised' % len(errors),
+                value=value,
+                errors=errors
+            )
+        return result[0]
+
+    def intern(self, value):
+        """
+        Replaces the keys of the objects by the names of the fields and the
+        string values of the `enum` schemas by the values of the `enum`,
+        so the documents share them instead of having their own copies.
+        The objects whose keys are replaced are copied, the rest is changed
+        in place. Gives back the value.
+        """
+        result = [value]
+        stack = [(self.root, result, 0)]
+        tasks = []
+        while stack:
+            node, target, key = stack.pop()
+            if node.container:
+                target[key] = node.intern(target[key], tasks)
+                stack.extend(tasks)
+                del tasks[:]
+                continue
+            value = target[key]
+            if isinstance(value, six.string_types):
+                target[key] = node.values.get(value, value)
+        return result[0]
+
+    def iter_errors(self, instance):
+        """
+        Validates the instance node by node, yields the
+        `jsonschema.ValidationError` objects with the absolute path.
+        """
+        return self._iter_errors([(self.root, instance, None)])
+
+    def iter_changed_errors(self, instance, paths):
+        """
+        Validates only the changed parts of a valid instance. The subtrees
+        at the `paths` (lists of keys) are validated entirely, their
+        ancestors by their own validator (the object level constraints,
+        e.g. `required`, and the properties which are not containers), the
+        rest of the instance is not visited.
+        """
+        tree = _get_path_tree(paths)
+        stack = [(self.root, instance, None, tree)]
+        changed = []
+        while stack:
+            node, instance, path, tree = stack.pop()
+            if tree is None:
+                changed.append((node, instance, path))
+                continue
+            for error in node.get_validator(
+                    self.context, self).iter_errors(
+                    instance):
+                error.path.extendleft(reversed(_get_path(path)))
+                yield error
+            # Only the children on the changed paths are visited
+            children = []
+            for key in sorted(tree, key=_sort_key):
+                found = node.get_child(instance, key)
+                if found is not None:
+                    child, value, part = found
+                    children.append((child, value, (part, path), tree[key]))
+            stack.extend(reversed(children))
+        for error in self._iter_errors(changed[::-1]):
+            yield error
+
+    def _iter_errors(self, stack):
+        while stack:
+            node, instance, path = stack.pop()
+            for error in node.get_validator(
+                    self.context, self).iter_errors(
+                    instance):
+                error.path.extendleft(reversed(_get_path(path)))
+                yield error
+            children = [
+                (child, value, (key, path))
+                for child, value, key in node.children(instance)
+            ]
+            stack.extend(reversed(children))
+
+
+def _children(node):
+    if isinstance(node, ObjectNode):
+        return [n for _, _, n in node.fields if n.container]
+    if isinstance(node, ArrayNode):
+        nodes = node.items if isinstance(node.items, list) else [node.items]
+        nodes = nodes + [node.additional]
+        return [n for n in nodes if n is not None and n.container]
+    return []
+
+
+def _sort_key(key):
+    # The indexes in numeric order, before the names
+    return (0, int(key), '') if key.isdigit() else (1, 0, key)
+
+
+def _get_path_tree(paths):
+    """
+    Gives back the nested dict of the keys of the paths, `None` marks the
+    end of a path (the whole subtree is changed).
+    """
+    root = {}
+    for path in paths:
+        parent = key = None
+        tree = root
+        for part in path:
+            if tree is None:
+                break
+            parent, key = tree, str(part)
+            tree = tree.setdefault(key, {})
+        else:
+            if parent is None:
+                return None
+            parent[key] = None
+    return root
+
+
+def _rebase(schema):
+    """
+    Points the references to the root (`#`) of the JSON schema to its
+    definition in place, tells whether the schema has any reference.
+    """
+    found = False
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get('$ref')
+            if isinstance(ref, six.string_types):
+                found = True
+                if ref == '#':
+                    node['$ref'] = '#/definitions/' + ROOT_DEFINITION
+            stack.extend(
+                value for key, value in node.items()
+                if key not in base.DATA_KEYWORDS
+            )
+        elif isinstance(node, list):
+            stack.extend(node)
+    return found
+
+
+def _get_definitions(schema):
+    """The definitions of the schema by their emitted names"""
+    return dict(
+        (prop.get_attr('name', name), prop)
+        for name, prop in (getattr(schema, '_definitions', None) or {}).items()
+    )
+
+
+def _is_inherited(schema, method, cls):
+    return getattr(type(schema), method) is getattr(cls, method)
+
+
+def _is_object(schema):
+    # The objects with model convert themselves
+    return (
+        _is_inherited(schema, 'to_python', types.Object) and
+        _is_inherited(schema, 'to_raw', types.Object) and
+        not schema.get_attr('model')
+    )
+
+
+def _get_path(path):
+    parts = []
+    while path is not None:
+        key, path = path
+        parts.append(key)
+    parts.reverse()
+    return parts
+
+
+def _update_errors(errors, ex, path):
+    prefix = '.'.join(str(part) for part in _get_path(path))
+    for error in ex.errors:
+        if error['path'] and prefix:
+            error['path'] = prefix + '.' + error['path']
+        elif prefix:
+            error['path'] = prefix
+        errors.append(error)
+
+
+def iter_schemas(schema):
+    """
+    Yields the schema and all of its subschemas (fields, items,
+    definitions), every instance once.
+    """
+    seen = set()
+    stack = [schema]
+    while stack:
+        schema = stack.pop()
+        if id(schema) in seen or not isinstance(schema, base.Schema):
+            continue
+        seen.add(id(schema))
+        yield schema
+        stack.extend((getattr(schema, '_definitions', None) or {}).values())
+        if isinstance(schema, types.Object):
+            stack.extend((schema.fields or {}).values())
+            stack.extend((schema.get_attr('patterns') or {}).values())
+            stack.append(schema.get_attr('additional'))
+        elif isinstance(schema, types.Array):
+            items = schema.get_attr('items')
+            if isinstance(items, (list, tuple)):
+                stack.extend(items)
+            else:
+                stack.append(items)
+            stack.append(schema.get_attr('additional'))
+
+
+def get_versions(schema):
+    """
+    Gives back the hash of the versions of the schema and its subschemas,
+    it changes when any of them is changed (e.g. extended).
+    """
+    return hash(tuple(
+        (id(s), s.version) for s in iter_schemas(schema)
+    ))
+
+
+def contains_ref(schema):
+    """Tells whether the schema has any `types.Ref` in it"""
+    return any(isinstance(s, types.Ref) for s in iter_schemas(schema))
+
+
+def get_graph(schema, context=None):
+    """
+    Gives back the compiled graph of the schema. The graphs are cached on
+    the schema per context, the contexts emitting the same JSON schema
+    (e.g. differing only in the `profiler`) share the graph.
+    """
+    key = base._context_key(context)
+    graphs = getattr(schema, '_graphs', None)
+    if graphs is None:
+        graphs = schema._graphs = {}
+    graph = graphs.get(key)
+    if graph is None:
+        graph = Graph(schema, context=dict(context) if context else None)
+        if key is not base.UNCACHED:
+            graph = graphs.setdefault(key, graph)
+    return graph
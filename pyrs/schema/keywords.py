@@ -0,0 +1,411 @@
+"""
+Validator functions of the JSON schema keywords which replace the default
+implementations of `jsonschema` in the validators built by the schemas.
+
+The regular expressions of `pattern` and `patternProperties` are compiled
+once and the patterns of `patternProperties` are combined into a single
+alternation, so the keys which don't match any of them are rejected by one
+search. The patterns matching a key are remembered, the keys of the
+documents tend to repeat.
+
+The `uniqueItems` is checked in linear time, the items are turned into
+hashable keys which are equal when the items are equal regarding JSON
+(e.g. `1 == 1.0` but `True != 1`). The large `enum` lists are indexed by
+the same keys, the index is built once per list.
+
+The `properties` are visited by the keys of the instance when it has fewer
+keys than the schema has properties (e.g. partial documents).
+
+The `multipleOf` is exact, the integers are checked by the integer modulo,
+the rest by `Decimal` (the floats by their shortest representation), so
+`0.3` is a multiple of `0.1`. The `Decimal` values (see `Number(decimal=True)`)
+are compared to the float bounds and enum values the same way, so
+`Decimal('0.1')` is not less than the `minimum` of `0.1`.
+"""
+import decimal
+import fractions
+import re
+
+import six
+
+from . import lib
+
+
+jsonschema = lib.LazyModule('jsonschema')
+
+# The maximum number of the entries of a cache, the cache is cleared when
+# it is full
+CACHE_SIZE = 4096
+
+# The number of the duplicates listed in the message of a uniqueItems error
+MAX_REPORTED_DUPLICATES = 5
+
+
+class Cache(dict):
+    """Dict of limited size, it is cleared when it is full"""
+
+    def __init__(self, size=CACHE_SIZE):
+        super(Cache, self).__init__()
+        self.size = size
+
+    def __setitem__(self, key, value):
+        if len(self) >= self.size:
+            self.clear()
+        super(Cache, self).__setitem__(key, value)
+
+
+BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+
+GROUP_PREFIX = '_pyrs_pattern_'
+
+_patterns = Cache()
+_matchers = Cache()
+_enum_indexes = Cache()
+
+
+def compile_pattern(pattern):
+    """Gives back the compiled regular expression (cached)"""
+    compiled = _patterns.get(pattern)
+    if compiled is None:
+        compiled = _patterns[pattern] = re.compile(pattern)
+    return compiled
+
+
+class PatternMatcher(object):
+    """
+    Tells which patterns of a `patternProperties` match a key. The
+    patterns are combined into one alternation with a named group per
+    pattern: a key not matching the alternation doesn't match any of the
+    patterns. Otherwise the group which matched is known to match and the
+    rest are searched one by one. The patterns with backreferences can't be
+    combined, they are searched one by one.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        self.compiled = [compile_pattern(p) for p in self.patterns]
+        self.combined = None
+        if self.patterns and not any(
+                BACKREFERENCE.search(p) for p in self.patterns):
+            try:
+                self.combined = re.compile('|'.join(
+                    '(?P<%s%d>%s)' % (GROUP_PREFIX, index, pattern)
+                    for index, pattern in enumerate(self.patterns)
+                ))
+            except re.error:
+                pass
+        self.keys = Cache()
+
+    def match(self, key):
+        """Gives back the indexes of the patterns which match the key"""
+        indexes = self.keys.get(key)
+        if indexes is not None:
+            return indexes
+        first = None
+        if self.combined is not None:
+            match = self.combined.search(key)
+            if match is None:
+                self.keys[key] = ()
+                return ()
+            first = int(match.lastgroup[len(GROUP_PREFIX):])
+        indexes = tuple(
+            index for index, compiled in enumerate(self.compiled)
+            if index == first or compiled.search(key)
+        )
+        self.keys[key] = indexes
+        return indexes
+
+
+def get_matcher(patterns):
+    """Gives back the (cached) matcher of the patterns"""
+    key = tuple(patterns)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = PatternMatcher(key)
+    return matcher
+
+
+def pattern(validator, patrn, instance, schema):
+    if validator.is_type(instance, 'string') and \
+            not compile_pattern(patrn).search(instance):
+        yield jsonschema.ValidationError(
+            '%r does not match %r' % (instance, patrn)
+        )
+
+
+def pattern_properties(validator, patterns, instance, schema):
+    if not validator.is_type(instance, 'object'):
+        return
+    matcher = get_matcher(patterns)
+    for key, value in six.iteritems(instance):
+        for index in matcher.match(key):
+            regex = matcher.patterns[index]
+            for error in validator.descend(
+                    value, patterns[regex], path=key, schema_path=regex):
+                yield error
+
+
+def properties(validator, props, instance, schema):
+    if not validator.is_type(instance, 'object'):
+        return
+    if len(instance) < len(props):
+        # E.g. partial documents, only the given properties are visited
+        items = (
+            (prop, props[prop]) for prop in instance if prop in props
+        )
+    else:
+        items = (
+            (prop, subschema) for prop, subschema in six.iteritems(props)
+            if prop in instance
+        )
+    for prop, subschema in items:
+        for error in validator.descend(
+                instance[prop], subschema, path=prop, schema_path=prop):
+            yield error
+
+
+def get_item_key(item):
+    """
+    Gives back a hashable key of the item, the keys of two items are equal
+    if and only if the items are equal regarding JSON. Raises `TypeError`
+    when the item is neither hashable nor a JSON value.
+    """
+    if isinstance(item, bool):
+        return 'boolean', item
+    if isinstance(item, six.string_types):
+        return 'string', item
+    if isinstance(item, decimal.Decimal):
+        # Equal to the float (or int) which is encoded as the same number,
+        # so `Decimal('0.1')` is the float `0.1`, not its binary value
+        number = to_json_number(item)
+        if number is None:
+            return 'decimal', item
+        return 'number', number
+    if isinstance(item, six.integer_types + (float, )):
+        # The equal numbers have equal hashes regardless of their type
+        return 'number', item
+    if isinstance(item, (list, tuple)):
+        return 'array', tuple(get_item_key(i) for i in item)
+    if isinstance(item, dict):
+        return 'object', frozenset(
+            (key, get_item_key(value)) for key, value in six.iteritems(item)
+        )
+    if item is None:
+        return 'null', None
+    hash(item)
+    return 'other', item
+
+
+class DuplicateFinder(object):
+    """
+    Finds the duplicates of the items added one by one (e.g. the items of
+    a stream), the items are hashed by :func:`get_item_key`, the unhashable
+    ones are compared one by one.
+    """
+
+    def __init__(self):
+        self.seen = {}
+        self.others = []
+        self.count = 0
+
+    def add(self, item):
+        """
+        Gives back the index of the first item equal to the item, `None`
+        when the item is new.
+        """
+        index = self.count
+        self.count += 1
+        try:
+            key = get_item_key(item)
+        except TypeError:
+            for first, other in self.others:
+                if other == item:
+                    return first
+            self.others.append((index, item))
+            return None
+        first = self.seen.setdefault(key, index)
+        if first != index:
+            return first
+        return None
+
+
+def find_duplicates(items):
+    """
+    Gives back the list of `(index, first)` pairs where the item of `index`
+    equals to the one of `first` (`first < index`).
+    """
+    finder = DuplicateFinder()
+    duplicates = []
+    for index, item in enumerate(items):
+        first = finder.add(item)
+        if first is not None:
+            duplicates.append((index, first))
+    return duplicates
+
+
+def unique_items(validator, unique, instance, schema):
+    if not unique or not validator.is_type(instance, 'array'):
+        return
+    duplicates = find_duplicates(instance)
+    if duplicates:
+        error = jsonschema.ValidationError(
+            '%r has non-unique elements (%s)' % (instance, ', '.join(
+                'item %d equals to item %d' % duplicate
+                for duplicate in duplicates[:MAX_REPORTED_DUPLICATES]
+            ) + (', ...' if len(duplicates) > MAX_REPORTED_DUPLICATES
+                 else ''))
+        )
+        error.duplicates = duplicates
+        yield error
+
+
+class EnumIndex(object):
+    """
+    Tells whether a value is one of the enum values regarding JSON. The
+    values are hashed by :func:`get_item_key`, the unhashable ones are
+    compared one by one.
+    """
+
+    def __init__(self, values):
+        self.values = values
+        self.keys = set()
+        self.others = []
+        for value in values:
+            try:
+                self.keys.add(get_item_key(value))
+            except TypeError:
+                self.others.append(value)
+
+    def __contains__(self, value):
+        try:
+            key = get_item_key(value)
+        except TypeError:
+            return any(value == other for other in self.values)
+        return key in self.keys or \
+            any(value == other for other in self.others)
+
+
+def get_enum_index(values):
+    """
+    Gives back the index of the enum values, cached by the identity of the
+    list (the lists of the validators don't change).
+    """
+    cached = _enum_indexes.get(id(values))
+    # The list is kept in the index, so its id isn't reused while cached
+    if cached is not None and cached.values is values:
+        return cached
+    index = _enum_indexes[id(values)] = EnumIndex(values)
+    return index
+
+
+def enum(validator, enums, instance, schema):
+    if instance not in get_enum_index(enums):
+        yield jsonschema.ValidationError(
+            '%r is not one of %r' % (instance, enums)
+        )
+
+
+def to_decimal(value):
+    """
+    Gives back the `Decimal` of the number. The floats are converted by
+    their shortest representation, so `0.1` becomes `Decimal('0.1')`.
+    """
+    if isinstance(value, float):
+        return decimal.Decimal(repr(value))
+    return decimal.Decimal(value)
+
+
+def to_json_number(value):
+    """
+    Gives back the int or float of the `Decimal` which is encoded as the
+    very same number, `None` when there isn't such.
+    """
+    if value.is_finite():
+        if value == value.to_integral_value():
+            return int(value)
+        number = float(value)
+        if to_decimal(number) == value:
+            return number
+    return None
+
+
+def is_multiple(value, multiple):
+    """Tells whether the number is a multiple of `multiple` exactly"""
+    if isinstance(value, six.integer_types) and \
+            isinstance(multiple, six.integer_types):
+        return value % multiple == 0
+    try:
+        return to_decimal(value) % to_decimal(multiple) == 0
+    except decimal.InvalidOperation:
+        # The quotient is out of the precision of the decimal context
+        pass
+    try:
+        quotient = fractions.Fraction(to_decimal(value)) / \
+            fractions.Fraction(to_decimal(multiple))
+    except (OverflowError, ValueError):
+        # Infinite or NaN
+        return False
+    return quotient.denominator == 1
+
+
+def multiple_of(validator, multiple, instance, schema):
+    if not validator.is_type(instance, 'number'):
+        return
+    if not is_multiple(instance, multiple):
+        yield jsonschema.ValidationError(
+            '%r is not a multiple of %r' % (instance, multiple)
+        )
+
+
+def _exact(instance, bound):
+    # The float compared to a Decimal is taken by its shortest
+    # representation like the parsed numbers
+    if isinstance(instance, decimal.Decimal) and isinstance(bound, float):
+        return instance, to_decimal(bound)
+    if isinstance(bound, decimal.Decimal) and isinstance(instance, float):
+        return to_decimal(instance), bound
+    return instance, bound
+
+
+def minimum(validator, minimum, instance, schema):
+    if not validator.is_type(instance, 'number'):
+        return
+    value, bound = _exact(instance, minimum)
+    if schema.get('exclusiveMinimum', False):
+        failed = value <= bound
+        cmp = 'less than or equal to'
+    else:
+        failed = value < bound
+        cmp = 'less than'
+    if failed:
+        yield jsonschema.ValidationError(
+            '%r is %s the minimum of %r' % (instance, cmp, minimum)
+        )
+
+
+def maximum(validator, maximum, instance, schema):
+    if not validator.is_type(instance, 'number'):
+        return
+    value, bound = _exact(instance, maximum)
+    if schema.get('exclusiveMaximum', False):
+        failed = value >= bound
+        cmp = 'greater than or equal to'
+    else:
+        failed = value > bound
+        cmp = 'greater than'
+    if failed:
+        yield jsonschema.ValidationError(
+            '%r is %s the maximum of %r' % (instance, cmp, maximum)
+        )
+
+
+VALIDATORS = {
+    u'enum': enum,
+    u'maximum': maximum,
+    u'minimum': minimum,
+    u'multipleOf': multiple_of,
+    u'pattern': pattern,
+    u'patternProperties': pattern_properties,
+    u'properties': properties,
+    u'uniqueItems': unique_items,
+}
@@ -1,7 +1,36 @@
+import importlib
+
+import six
+
+
 class NA:
     pass
 
 
+class LazyModule(object):
+    """
+    Stands for a module which is imported on the first attribute access, so
+    the heavy dependencies aren't loaded by `import pyrs.schema`.
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __repr__(self):
+        return '<LazyModule %r>' % self.__dict__['_name']
+
+
 def get_public_attributes(cls):
     if not cls:
         return {}
@@ -28,3 +57,13 @@ def ensure_list(thing):
     if isinstance(thing, (set, tuple)):
         return list(thing)
     return list([thing])
+
+
+def is_iterable(thing):
+    """
+    Tells whether the thing is an iterable of items (e.g. list, generator,
+    database cursor), the strings and the mappings are not.
+    """
+    if isinstance(thing, six.string_types + (bytes, bytearray, dict)):
+        return False
+    return hasattr(thing, '__iter__')
@@ -0,0 +1,139 @@
+"""
+Model classes of the objects.
+
+An :class:`pyrs.schema.types.Object` with a `model` gives back instances of
+the model from `to_python` instead of dicts, and `to_raw` reads the
+attributes of the model instances. The model is either a user class which
+accepts the fields as keyword arguments and has them as attributes (e.g. a
+dataclass or a namedtuple), or `True` for a generated slotted class. The
+slotted instances don't have a `__dict__`, so they take much less memory
+than the dicts of the same fields. The fields which are not in the
+document are given as `None` to the models which require them.
+
+The generated models are pickled by the schema class and the fields, they
+are generated again (once) when unpickled in another process.
+
+.. code:: python
+
+    class Item(types.Object):
+        id = types.Integer()
+        name = types.String()
+
+        class Attrs:
+            model = True
+
+    item = JSONReader(Item).read('{"id": 1, "name": "Apple"}')
+    item.name  # 'Apple'
+"""
+import collections
+import threading
+
+from . import lib
+
+
+inspect = lib.LazyModule('inspect')
+
+
+class Model(object):
+    """
+    Base class of the generated models. The fields which are not given are
+    `None`.
+    """
+    __slots__ = ()
+    _fields = ()
+    # The schema class of the model given by `get_model`
+    _schema = None
+
+    def __init__(self, **values):
+        for field in self._fields:
+            setattr(self, field, values.pop(field, None))
+        if values:
+            raise TypeError('%s got unexpected fields: %s' % (
+                type(self).__name__, ', '.join(sorted(values))
+            ))
+
+    def _asdict(self):
+        return collections.OrderedDict(
+            (field, getattr(self, field)) for field in self._fields
+        )
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field)
+            for field in self._fields
+        )
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__, ', '.join(
+            '%s=%r' % (field, getattr(self, field)) for field in self._fields
+        ))
+
+    def __reduce__(self):
+        # The generated classes cannot be found by their name
+        return _restore, (
+            self._schema, type(self).__name__, self._fields,
+            dict(self._asdict())
+        )
+
+
+_models = {}
+_lock = threading.Lock()
+
+
+def make_model(name, fields):
+    """Creates a slotted model class with the fields as attributes"""
+    fields = tuple(fields)
+    return type(name, (Model, ), {'__slots__': fields, '_fields': fields})
+
+
+def get_model(schema_cls, fields):
+    """
+    Gives back the generated model of the schema class with the fields,
+    the instances of the same schema class share it.
+    """
+    return _get_model(schema_cls, schema_cls.__name__, tuple(fields))
+
+
+def _get_model(schema_cls, name, fields):
+    key = (schema_cls, name, fields)
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = make_model(name, fields)
+                model._schema = schema_cls
+                _models[key] = model
+    return model
+
+
+def _restore(schema_cls, name, fields, values):
+    # The models of `make_model` (without schema) are generated by the name
+    return _get_model(schema_cls, name, tuple(fields))(**values)
+
+
+def get_required_fields(model, fields):
+    """
+    Gives back the fields which the model requires as arguments, i.e. the
+    parameters of the model without default. When the signature is not
+    known all of the fields are given back.
+    """
+    try:
+        parameters = inspect.signature(model).parameters
+    except (AttributeError, TypeError, ValueError):
+        return tuple(fields)
+    empty = inspect.Parameter.empty
+    return tuple(
+        field for field in fields
+        if field in parameters and parameters[field].default is empty
+    )
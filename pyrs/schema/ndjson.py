@@ -0,0 +1,225 @@
+"""
+Parallel ingestion of newline delimited JSON (NDJSON) files.
+
+The file is memory-mapped and split into chunks at newline boundaries. The
+chunks are validated and converted by worker processes with the same schema,
+the workers map the file themselves and receive only the byte range of their
+chunk, so the data of the file is never copied between the processes.
+
+.. code:: python
+
+    result = ingest('events.ndjson', Event, output='valid.ndjson')
+    print(result.valid, result.invalid)
+    for error in result.errors:
+        print(error['line'], error['offset'], error['errors'])
+"""
+import mmap
+import multiprocessing
+import os
+
+from . import exceptions
+from . import schemaio
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+NEWLINE = b'\n'
+
+
+class IngestResult(object):
+    """
+    The result of the ingestion.
+
+    `lines` is the number of the lines of the file, `records` is the number
+    of the non-empty lines, `valid` and `invalid` are the number of valid and
+    invalid records. `errors` is the list of the per-line errors, every error
+    is a dict with the 1-based line number (`line`), the byte offset of the
+    line (`offset`) and the list of errors in the same format as
+    `ValidationErrors.errors` (`errors`).
+    """
+
+    def __init__(self):
+        self.lines = 0
+        self.records = 0
+        self.valid = 0
+        self.invalid = 0
+        self.errors = []
+
+    def __repr__(self):
+        return '<IngestResult records=%d valid=%d invalid=%d>' % (
+            self.records, self.valid, self.invalid
+        )
+
+
+def split_chunks(buf, chunk_size, start=0, end=None):
+    """
+    Gives back the list of `(start, end)` byte ranges of the buffer, every
+    range ends right after a newline (or at the end of the buffer).
+    """
+    if end is None:
+        end = len(buf)
+    chunks = []
+    while start < end:
+        boundary = start + chunk_size
+        if boundary >= end:
+            boundary = end
+        else:
+            newline = buf.find(NEWLINE, boundary - 1, end)
+            boundary = end if newline < 0 else newline + 1
+        chunks.append((start, boundary))
+        start = boundary
+    return chunks
+
+
+def ingest(path, schema, context=None, output=None, workers=None,
+           chunk_size=DEFAULT_CHUNK_SIZE, codec='json', max_errors=None):
+    """
+    Validate and convert every line of the NDJSON file by the schema.
+
+    :param output: path of the file the valid lines are written into
+    :param workers: number of worker processes, the number of CPUs by
+        default, `0` processes the file in the current process
+    :param chunk_size: approximate size of a chunk in bytes
+    :param codec: the JSON codec of the lines (see :class:`JSONReader`), the
+        standard library by default, `auto` for the fastest available one
+    :param max_errors: the maximum number of collected errors, the invalid
+        lines are counted anyway
+    :rtype: IngestResult
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    result = IngestResult()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            if output is not None:
+                open(output, 'wb').close()
+            return result
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        chunks = split_chunks(buf, chunk_size)
+        keep = output is not None
+        tasks = [(start, end, keep) for start, end in chunks]
+        if workers:
+            pool = multiprocessing.Pool(
+                min(workers, len(tasks)),
+                initializer=_init_worker,
+                initargs=(path, schema, context, codec)
+            )
+            try:
+                _collect(result, pool.imap(_process_chunk, tasks),
+                         buf, output, max_errors)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            worker = _Worker(buf, schema, context, codec)
+            _collect(result, (worker.process(*task) for task in tasks),
+                     buf, output, max_errors)
+    finally:
+        buf.close()
+    return result
+
+
+def _collect(result, chunk_results, buf, output, max_errors):
+    out = open(output, 'wb') if output is not None else None
+    try:
+        view = memoryview(buf)
+        try:
+            for lines, records, valid, errors, ranges in chunk_results:
+                for error in errors:
+                    if max_errors is not None and \
+                            len(result.errors) >= max_errors:
+                        break
+                    error['line'] += result.lines
+                    result.errors.append(error)
+                result.lines += lines
+                result.records += records
+                result.valid += valid
+                result.invalid += records - valid
+                if out is None:
+                    continue
+                for start, end in ranges:
+                    out.write(view[start:end])
+                    if buf[end - 1:end] != NEWLINE:
+                        out.write(NEWLINE)
+        finally:
+            view.release()
+    finally:
+        if out is not None:
+            out.close()
+
+
+class _Worker(object):
+
+    def __init__(self, buf, schema, context=None, codec='json'):
+        self.buf = buf
+        self.reader = schemaio.JSONReader(schema, context=context, codec=codec)
+
+    def process(self, start, end, keep_ranges=False):
+        buf = self.buf
+        view = memoryview(buf)
+        lines = 0
+        records = 0
+        valid = 0
+        errors = []
+        ranges = []
+        pos = start
+        try:
+            while pos < end:
+                newline = buf.find(NEWLINE, pos, end)
+                stop = end if newline < 0 else newline
+                next_pos = stop + 1
+                lines += 1
+                if stop > pos and buf[stop - 1:stop] == b'\r':
+                    stop -= 1
+                if stop == pos:
+                    pos = next_pos
+                    continue
+                records += 1
+                line = view[pos:stop]
+                try:
+                    self.reader.read(line)
+                except exceptions.SchemaError as ex:
+                    errors.append({
+                        'line': lines,
+                        'offset': pos,
+                        'errors': _get_errors(ex),
+                    })
+                else:
+                    valid += 1
+                    if keep_ranges:
+                        line_end = min(next_pos, end)
+                        if ranges and ranges[-1][1] == pos:
+                            ranges[-1] = (ranges[-1][0], line_end)
+                        else:
+                            ranges.append((pos, line_end))
+                finally:
+                    line.release()
+                pos = next_pos
+        finally:
+            view.release()
+        return lines, records, valid, errors, ranges
+
+
+def _get_errors(ex):
+    if isinstance(ex, exceptions.ValidationErrors):
+        return ex.errors
+    return [{
+        'error': ex.error,
+        'message': ex.args[0] if ex.args else '',
+        'path': '',
+    }]
+
+
+_worker = None
+
+
+def _init_worker(path, schema, context, codec):
+    global _worker
+    with open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _worker = _Worker(buf, schema, context=context, codec=codec)
+
+
+def _process_chunk(task):
+    return _worker.process(*task)
@@ -0,0 +1,223 @@
+"""
+Optimisation passes of the emitted JSON schemas.
+
+The declared schemas are inlined when they are emitted, so a shared schema
+(e.g. an `Address` object used in many places) appears as many times as it
+is used. :func:`deduplicate` hoists the structurally identical subschemas
+into the `definitions` of the root and refers to them by `$ref`, so the
+published document shrinks.
+
+.. code:: python
+
+    schema, report = deduplicate(Order().get_jsonschema())
+    print(report.original_size, report.size, report.saved)
+
+:func:`share_subschemas` keeps the document as it is but the identical
+subschemas become the same object, the validators are built from the
+shared structure, so they don't keep the copies.
+
+The subschemas with `$ref` or `definitions` in them are left in place,
+moving them could change what their references refer to.
+"""
+import collections
+import copy
+import json
+import re
+
+
+SCHEMA_KEYWORDS = frozenset([
+    'items', 'additionalItems', 'additionalProperties', 'not',
+])
+
+SCHEMA_LIST_KEYWORDS = frozenset([
+    'items', 'allOf', 'anyOf', 'oneOf',
+])
+
+SCHEMA_MAP_KEYWORDS = frozenset([
+    'properties', 'patternProperties', 'definitions', 'dependencies',
+])
+
+REF = '{"$ref":"#/definitions/%s"}'
+
+
+class DeduplicationReport(object):
+    """
+    The result of the deduplication. The sizes are the length of the
+    compact JSON serialisation. `definitions` is the list of the hoisted
+    subschemas as `(name, occurrences, size)`.
+    """
+
+    def __init__(self, original_size):
+        self.original_size = original_size
+        self.size = original_size
+        self.definitions = []
+
+    @property
+    def saved(self):
+        return self.original_size - self.size
+
+    @property
+    def ratio(self):
+        if not self.original_size:
+            return 1.0
+        return float(self.size) / self.original_size
+
+    def __repr__(self):
+        return '<DeduplicationReport %d -> %d bytes, %d definitions>' % (
+            self.original_size, self.size, len(self.definitions)
+        )
+
+
+def canonical(schema, sets=False):
+    """
+    The key order independent serialisation of the schema. With `sets`
+    the sets are serialised as sorted lists.
+    """
+    return json.dumps(
+        schema, sort_keys=True, separators=(',', ':'),
+        default=_sorted_set if sets else repr
+    )
+
+
+def _sorted_set(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def iter_subschemas(schema):
+    """Yields `(container, key, subschema)` of the direct subschemas"""
+    for keyword, value in list(schema.items()):
+        if keyword in SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            for key, subschema in list(value.items()):
+                if isinstance(subschema, dict):
+                    yield value, key, subschema
+        elif keyword in SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+            for index, subschema in enumerate(value):
+                if isinstance(subschema, dict):
+                    yield value, index, subschema
+        elif keyword in SCHEMA_KEYWORDS and isinstance(value, dict):
+            yield schema, keyword, value
+
+
+def split_subschemas(schema):
+    """
+    Gives back a copy of the schema where the direct subschemas are
+    replaced by `{}`, and the list of the subschemas.
+    """
+    node = dict(schema)
+    subschemas = []
+    for keyword, value in schema.items():
+        if keyword in SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            node[keyword] = dict(value)
+            for key, subschema in value.items():
+                if isinstance(subschema, dict):
+                    node[keyword][key] = {}
+                    subschemas.append(subschema)
+        elif keyword in SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+            node[keyword] = [
+                {} if isinstance(subschema, dict) else subschema
+                for subschema in value
+            ]
+            subschemas.extend(s for s in value if isinstance(s, dict))
+        elif keyword in SCHEMA_KEYWORDS and isinstance(value, dict):
+            node[keyword] = {}
+            subschemas.append(value)
+    return node, subschemas
+
+
+def _walk(schema):
+    """
+    Gives back the list of `(container, key, canonical form)` of the
+    movable subschemas, the children first.
+    """
+    positions = []
+    _walk_schema(schema, positions)
+    return positions
+
+
+def _walk_schema(schema, positions):
+    movable = '$ref' not in schema and 'definitions' not in schema
+    for container, key, subschema in iter_subschemas(schema):
+        if _walk_schema(subschema, positions):
+            positions.append((container, key, canonical(subschema)))
+        else:
+            movable = False
+    return movable
+
+
+def _new_name(subschema, definitions, prefix):
+    title = re.sub(r'\W', '_', subschema.get('title') or '')
+    if title and title not in definitions:
+        return title
+    index = len(definitions) + 1
+    while '%s%d' % (prefix, index) in definitions:
+        index += 1
+    return '%s%d' % (prefix, index)
+
+
+def deduplicate(schema, prefix='schema'):
+    """
+    Hoists the repeated subschemas into the `definitions` of the root as
+    long as it makes the document smaller, the largest saving first.
+    Gives back the new schema and a :class:`DeduplicationReport`.
+    """
+    schema = copy.deepcopy(schema)
+    report = DeduplicationReport(len(canonical(schema)))
+    if not isinstance(schema, dict):
+        return schema, report
+    while True:
+        definitions = schema.get('definitions')
+        places = collections.OrderedDict()
+        for container, key, form in _walk(schema):
+            places.setdefault(form, []).append((container, key))
+        best = None
+        for form, occurrences in places.items():
+            if len(occurrences) < 2:
+                continue
+            defined = [
+                key for container, key in occurrences
+                if container is definitions
+            ]
+            if defined:
+                saving = (len(occurrences) - 1) * \
+                    (len(form) - len(REF % defined[0]))
+            else:
+                # The name is not known yet, a short one is assumed
+                saving = (len(occurrences) - 1) * len(form) - \
+                    len(occurrences) * len(REF % (prefix + '0')) - \
+                    len(prefix) - 4
+            if saving > 0 and (best is None or saving > best[0]):
+                best = (saving, form, occurrences, defined)
+        if best is None:
+            break
+        _, form, occurrences, defined = best
+        if definitions is None:
+            definitions = schema['definitions'] = collections.OrderedDict()
+        if defined:
+            name = defined[0]
+        else:
+            name = _new_name(occurrences[0][0][occurrences[0][1]],
+                             definitions, prefix)
+            definitions[name] = occurrences[0][0][occurrences[0][1]]
+        for container, key in occurrences:
+            if container is definitions and key == name:
+                continue
+            container[key] = {'$ref': '#/definitions/' + name}
+        report.definitions.append((name, len(occurrences), len(form)))
+    report.size = len(canonical(schema))
+    return schema, report
+
+
+def share_subschemas(schema):
+    """
+    Gives back a copy of the schema where the identical subschemas are the
+    same object.
+    """
+    schema = copy.deepcopy(schema)
+    if not isinstance(schema, dict):
+        return schema
+    shared = {}
+    for container, key, form in _walk(schema):
+        container[key] = shared.setdefault(form, container[key])
+    return schema
@@ -0,0 +1,164 @@
+"""
+Opt-in instrumentation for the read and write paths.
+
+A :class:`Profiler` collects wall time and call counts per schema path and
+phase (``loads``, ``validate``, ``to_python``, ``to_raw``, ``dumps``). It is
+enabled by handing it to a reader or writer:
+
+.. code:: python
+
+    profiler = Profiler()
+    reader = JSONReader(MySchema, profiler=profiler)
+    for body in bodies:
+        reader.read(body)
+    print(profiler.report(limit=10))
+
+The measurements are aggregated across calls (and threads) until
+:meth:`Profiler.reset` is called. When no profiler is given the read and write
+paths skip the instrumentation entirely.
+"""
+import contextlib
+import threading
+import timeit
+
+
+class Profiler(object):
+    """
+    Aggregates the time spent per (phase, path) pair.
+
+    The path is the dotted name of the property as it appears in the
+    serialised document, the root of the document has the empty path.
+    The recorded time is inclusive, the time of the nested properties is
+    part of the time of their parent.
+    """
+
+    def __init__(self, timer=None):
+        self.timer = timer or timeit.default_timer
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+
+    def _get_stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def enter(self, name=''):
+        """Start measuring the given property, returns the start time"""
+        self._get_stack().append(name)
+        return self.timer()
+
+    def leave(self, phase, started):
+        """Finish the measurement started by the last :meth:`enter`"""
+        elapsed = self.timer() - started
+        stack = self._get_stack()
+        path = '.'.join(name for name in stack if name)
+        stack.pop()
+        self.record(phase, path, elapsed)
+
+    @contextlib.contextmanager
+    def measure(self, phase, name=''):
+        started = self.enter(name)
+        try:
+            yield
+        finally:
+            self.leave(phase, started)
+
+    def record(self, phase, path, elapsed):
+        key = (phase, path)
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None:
+                self._stats[key] = [1, elapsed]
+            else:
+                stat[0] += 1
+                stat[1] += elapsed
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def get_stats(self):
+        """Gives back the list of `(phase, path, calls, total)` tuples
+        ordered by the total time, descending."""
+        with self._lock:
+            items = [
+                (phase, path, calls, total)
+                for (phase, path), (calls, total) in self._stats.items()
+            ]
+        return sorted(items, key=lambda item: (-item[3], item[0], item[1]))
+
+    def report(self, limit=None):
+        """Gives back a human readable report sorted by the total time"""
+        stats = self.get_stats()
+        if limit is not None:
+            stats = stats[:limit]
+        lines = ['%-10s %10s %12s %12s  %s' % (
+            'phase', 'calls', 'total (ms)', 'per call (us)', 'path'
+        )]
+        for phase, path, calls, total in stats:
+            lines.append('%-10s %10d %12.3f %12.3f  %s' % (
+                phase, calls, total * 1e3, total / calls * 1e6,
+                path or '<root>'
+            ))
+        return '\n'.join(lines)
+
+    def create_stats(self):
+        """Build the `stats` attribute in the format of :mod:`cProfile`,
+        so `pstats.Stats(profiler)` can consume it."""
+        stats = self.get_stats()
+        totals = dict(
+            ((phase, path), total) for phase, path, _, total in stats
+        )
+        children = {}
+        for phase, path, _, total in stats:
+            if path:
+                parent = (phase, path.rpartition('.')[0])
+                children[parent] = children.get(parent, 0.0) + total
+        self.stats = {}
+        for phase, path, calls, total in stats:
+            func = _func(phase, path)
+            own = max(total - children.get((phase, path), 0.0), 0.0)
+            callers = {}
+            if path:
+                parent = path.rpartition('.')[0]
+                if (phase, parent) in totals:
+                    callers[_func(phase, parent)] = (calls, calls, own, total)
+            self.stats[func] = (calls, calls, own, total, callers)
+
+    def get_pstats(self):
+        """Gives back a :class:`pstats.Stats` of the collected data"""
+        import pstats
+        return pstats.Stats(self)
+
+
+def _func(phase, path):
+    return (phase, 0, path or '<root>')
+
+
+class _NullMeasure(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+NULL_MEASURE = _NullMeasure()
+
+
+def measure(profiler, phase, name=''):
+    """Gives back the measure of the profiler or a no-op context manager
+    when the profiler is `None`"""
+    if profiler is None:
+        return NULL_MEASURE
+    return profiler.measure(phase, name)
+
+
+def get_profiler(context):
+    """Gives back the profiler of the conversion context if there is any"""
+    if context:
+        return context.get('profiler')
+    return None
@@ -9,29 +9,47 @@ schema itself. It gives more flexibility and more extensibility.
     interface.
 """
 import datetime
-import inspect
+import decimal
 import json
-import six
+import re
 
-import isodate
+import six
 
 from . import base
+from . import codec as codecs
 from . import exceptions
+from . import graph
+from . import keywords
+from . import lib
+from . import optimize
+from . import profiler as profiling
 from . import types
 
 
+isodate = lib.LazyModule('isodate')
+
+
 class SchemaIO(object):
     """
     The schema IO gives chance to Schema remain independent from the
     serialisation method. Even the schema provide conversion still just
     based on primitive values.
+
+    The optional `profiler` (:class:`pyrs.schema.profiler.Profiler`)
+    records the time spent per phase and per schema path.
     """
 
-    def __init__(self, schema, context=None):
-        if inspect.isclass(schema):
+    def __init__(self, schema, context=None, profiler=None):
+        if isinstance(schema, type):
             schema = schema()
+        if profiler is not None:
+            context = dict(context or {}, profiler=profiler)
         self.schema = schema
         self.context = context
+        self.profiler = profiler
+
+    def _measure(self, phase):
+        return profiling.measure(self.profiler, phase)
 
 
 class Validator(SchemaIO):
@@ -104,45 +122,152 @@ class Reader(SchemaIO):
 
 
 class JSONSchemaWriter(SchemaWriter):
+    """
+    Writes the JSON schema of the schema. With `deduplicate` the
+    structurally identical subschemas are hoisted into the `definitions`
+    (see :mod:`pyrs.schema.optimize`), the `report` of the last extraction
+    tells the size reduction. The `etag` identifies the written document
+    without writing it.
+    """
+
+    def __init__(self, context=None, deduplicate=False):
+        super(JSONSchemaWriter, self).__init__(context=context)
+        self.deduplicate = deduplicate
+        self.report = None
 
     def write(self, schema, context=None):
         return json.dumps(self.extract(schema, context=context))
 
     def extract(self, schema, context=None):
-        if inspect.isclass(schema):
+        if isinstance(schema, type):
             schema = schema()
-        return schema.get_jsonschema(context=context)
+        jsonschema = schema.get_jsonschema(context=context)
+        if self.deduplicate:
+            jsonschema, self.report = optimize.deduplicate(jsonschema)
+        return jsonschema
+
+    def fingerprint(self, schema, context=None):
+        """The fingerprint of the schema (see `Schema.fingerprint`)"""
+        if isinstance(schema, type):
+            schema = schema()
+        return schema.fingerprint(context=context)
+
+    def etag(self, schema, context=None):
+        """
+        Gives back the ETag of the written document. It changes only when
+        the emitted JSON schema changes, so it can be used for caching the
+        published schema.
+        """
+        tag = self.fingerprint(schema, context=context)
+        if self.deduplicate:
+            tag += '-deduplicated'
+        return '"%s"' % tag
 
 
 class JSONSchemaValidator(Validator):
+    """
+    Validates against the JSON schema of the schema. The validator follows
+    the changes of the schema (e.g. `Object.extend`), it's rebuilt on the
+    next validation. Give a :meth:`pyrs.schema.base.Schema.snapshot` to
+    remain on the current version.
 
-    def __init__(self, schema, context=None):
-        super(JSONSchemaValidator, self).__init__(schema, context)
-        self._make_validator()
+    The changed documents are revalidated by :meth:`revalidate` without
+    visiting their unchanged parts.
+    """
+
+    def __init__(self, schema, context=None, profiler=None):
+        super(JSONSchemaValidator, self).__init__(
+            schema, context, profiler=profiler
+        )
+        self._build()
 
     def validate(self, data):
+        self._refresh()
         errors = []
         for ex in self.validator.iter_errors(data):
             self._update_errors_with_exception(errors, ex)
         self._raise_exception_when_errors(errors, data)
 
+    def revalidate(self, data, paths=None, patch=None):
+        """
+        Revalidates a valid document after it was changed, only the changed
+        subtrees and the object level constraints of their ancestors are
+        validated, the errors are the same as the ones of `validate`. The
+        `paths` are JSON pointers (`/lines/0/price`) or lists of keys, the
+        `patch` is the applied JSON Patch (list of operations).
+        """
+        self._refresh()
+        paths = get_changed_paths(paths, patch)
+        compiled = self._get_graph()
+        if compiled is None:
+            found = self.validator.iter_errors(data)
+        else:
+            found = compiled.iter_changed_errors(data, paths)
+        errors = []
+        for ex in found:
+            self._update_errors_with_exception(errors, ex)
+        self._raise_exception_when_errors(errors, data)
+
+    def _get_graph(self):
+        if isinstance(self.validator, graph.Graph):
+            return self.validator
+        if self._graph is None and \
+                isinstance(self.schema, (types.Object, types.Array)):
+            self._graph = graph.Graph(self.schema, context=self.context)
+        if self._graph is None or not self._graph.root.container:
+            return None
+        return self._graph
+
+    def _build(self):
+        self._generation = base.Schema._generation
+        self._fingerprint = self._get_fingerprint()
+        self._graph = None
+        # The numbers are parsed as Decimal when any field needs them, see
+        # `JSONReader`
+        self.decimal = uses_decimal(self.schema)
+        self._make_validator()
+
+    def _refresh(self):
+        """Rebuilds the validator when the schema has changed"""
+        generation = base.Schema._generation
+        if self._generation == generation:
+            return
+        if self._get_fingerprint() != self._fingerprint:
+            self._build()
+        self._generation = generation
+
+    def _get_fingerprint(self):
+        return self.schema.fingerprint(context=self.context)
+
     def _make_validator(self):
+        graph = None
+        if isinstance(self.schema, types.Object):
+            graph = self.schema._get_graph(self.context)
+        if graph is not None and graph.recursive:
+            # The graph validates node by node without recursion
+            self.validator = graph
+            return
         self.validator = base._make_validator(
-            self.schema.get_jsonschema(context=self.context)
+            self.schema.get_jsonschema(context=self.context),
+            profiler=self.profiler
         )
 
     def _update_errors_with_exception(self, errors, ex, path_prefix=None):
         path = list(ex.path)
         if path_prefix:
             path.insert(0, path_prefix)
-        errors.append({
+        error = {
             'error': 'ValidationError',
             'message': ex.message,
             'value': ex.instance,
             'invalid': ex.schema_path[-1],
             'against': ex.validator_value,
-            'path': ".".join(path),
-        })
+            'path': ".".join(str(part) for part in path),
+        }
+        # The uniqueItems errors tell the (index, first) pairs of duplicates
+        if getattr(ex, 'duplicates', None):
+            error['duplicates'] = ex.duplicates
+        errors.append(error)
 
     def _raise_exception_when_errors(self, errors, data):
         if errors:
@@ -155,54 +280,352 @@ class JSONSchemaValidator(Validator):
 
 class JSONSchemaDictValidator(JSONSchemaValidator):
 
+    def _get_fingerprint(self):
+        return dict(
+            (field, item.fingerprint(context=self.context))
+            for field, item in self.schema.items()
+        )
+
     def _make_validator(self):
         self.validators = {}
         for field, item in self.schema.items():
             self.validators[field] = base._make_validator(
-                item.get_jsonschema(context=self.context)
+                item.get_jsonschema(context=self.context),
+                profiler=self.profiler
             )
 
     def validate(self, data):
+        self._validate_fields(data, data)
+
+    def _get_graph(self):
+        # The fields are validated one by one, there is no graph of them
+        return None
+
+    def revalidate(self, data, paths=None, patch=None):
+        # The fields are validated independently, the changed ones are
+        # validated again
+        fields = set()
+        for path in get_changed_paths(paths, patch):
+            if not path:
+                return self.validate(data)
+            fields.add(path[0])
+        self._validate_fields(data, fields)
+
+    def _validate_fields(self, data, fields):
         if not isinstance(data, dict):
             raise exceptions.ParseError(
                 'Unrecognised input format: %s given, dict type expected'
                 % type(data),
                 value=data
             )
+        self._refresh()
         errors = []
         for field, value in data.items():
-            if field not in self.validators:
+            if field not in self.validators or field not in fields:
                 continue
             validator = self.validators[field]
-            for ex in validator.iter_errors(value):
+            with profiling.measure(self.profiler, 'validate', field):
+                field_errors = list(validator.iter_errors(value))
+            for ex in field_errors:
                 self._update_errors_with_exception(
                     errors, ex, path_prefix=field
                 )
         self._raise_exception_when_errors(errors, data)
 
 
-def select_json_validator(schema, context=None):
+def parse_pointer(pointer):
+    """Gives back the list of the keys of the JSON pointer"""
+    if not pointer:
+        return []
+    if not pointer.startswith('/'):
+        raise ValueError('Invalid JSON pointer: %r' % pointer)
+    return [
+        part.replace('~1', '/').replace('~0', '~')
+        for part in pointer[1:].split('/')
+    ]
+
+
+def get_patch_paths(patch):
+    """
+    Gives back the paths changed by the JSON Patch operations. The items
+    appended to an array (`/items/-`) change the array itself.
+    """
+    paths = []
+    for operation in patch:
+        op = operation.get('op')
+        if op == 'test':
+            continue
+        pointers = [operation['path']]
+        if op == 'move':
+            pointers.append(operation['from'])
+        for pointer in pointers:
+            path = parse_pointer(pointer)
+            if path and path[-1] == '-':
+                path = path[:-1]
+            paths.append(path)
+    return paths
+
+
+def get_changed_paths(paths=None, patch=None):
+    """
+    Gives back the changed paths as lists of keys, the `paths` could be
+    JSON pointers or lists of keys.
+    """
+    changed = [
+        parse_pointer(path) if isinstance(path, six.string_types)
+        else list(path)
+        for path in paths or ()
+    ]
+    if patch:
+        changed.extend(get_patch_paths(patch))
+    return changed
+
+
+class ArrayItemsValidator(Validator):
+    """
+    Validates the items of an array one by one, the items against the
+    `items` of the :class:`pyrs.schema.types.Array`, the `min_items`,
+    `max_items` and `unique_items` incrementally, so the whole array is
+    never needed (see `JSONWriter.iter_write`). The arrays with tuple
+    `items` are not supported (see :func:`can_stream`).
+    """
+
+    def __init__(self, schema, context=None, profiler=None):
+        super(ArrayItemsValidator, self).__init__(
+            schema, context, profiler=profiler
+        )
+        items = self.schema.get_attr('items')
+        self.validator = None
+        if items is not None:
+            self.validator = select_json_validator(
+                items, self.context, profiler=profiler
+            )
+
+    def validate(self, data):
+        for _ in self.iter_validate(data):
+            pass
+
+    def iter_validate(self, items):
+        """
+        Yields the items of the iterable after they are validated, raises
+        the errors of the first invalid item (or of the array itself).
+        """
+        max_items = self.schema.get_attr('max_items')
+        min_items = self.schema.get_attr('min_items')
+        finder = None
+        if self.schema.get_attr('unique_items'):
+            finder = keywords.DuplicateFinder()
+        count = 0
+        for item in items:
+            if max_items is not None and count >= max_items:
+                self._raise_array_error(
+                    'maxItems', max_items,
+                    'The array is too long, expected at most %d items'
+                    % max_items
+                )
+            if self.validator is not None:
+                try:
+                    self.validator.validate(item)
+                except exceptions.ValidationErrors as ex:
+                    _prefix_errors(ex.errors, count)
+                    raise
+            if finder is not None:
+                first = finder.add(item)
+                if first is not None:
+                    self._raise_array_error(
+                        'uniqueItems', True,
+                        'The array has non-unique elements (item %d equals '
+                        'to item %d)' % (count, first),
+                        duplicates=[(count, first)]
+                    )
+            count += 1
+            yield item
+        if min_items is not None and count < min_items:
+            self._raise_array_error(
+                'minItems', min_items,
+                'The array is too short, %d items given, expected at least '
+                '%d' % (count, min_items)
+            )
+
+    def _raise_array_error(self, keyword, against, message, **extra):
+        error = {
+            'error': 'ValidationError',
+            'message': message,
+            'value': None,
+            'invalid': keyword,
+            'against': against,
+            'path': '',
+        }
+        error.update(extra)
+        raise exceptions.ValidationErrors(
+            '1 validation error(s) raised', value=None, errors=[error]
+        )
+
+
+def can_stream(schema):
+    """
+    Tells whether the items of the array schema could be written and
+    validated one by one: a :class:`pyrs.schema.types.Array` with a single
+    `items` schema (or none) and without references.
+    """
+    if not isinstance(schema, types.Array) or \
+            type(schema).to_raw is not types.Array.to_raw:
+        return False
+    if isinstance(schema.get_attr('items'), (list, tuple)) or \
+            schema.get_attr('enum'):
+        return False
+    return not graph.contains_ref(schema)
+
+
+def _prefix_errors(errors, prefix):
+    for error in errors:
+        if error['path']:
+            error['path'] = '%s.%s' % (prefix, error['path'])
+        else:
+            error['path'] = str(prefix)
+
+
+def select_json_validator(schema, context=None, profiler=None):
     if isinstance(schema, dict):
-        return JSONSchemaDictValidator(schema, context=context)
-    return JSONSchemaValidator(schema, context=context)
+        return JSONSchemaDictValidator(
+            schema, context=context, profiler=profiler
+        )
+    return JSONSchemaValidator(schema, context=context, profiler=profiler)
 
 
 class JSONWriter(Writer):
+    """
+    Writes JSON text. The `codec` is the JSON backend (see
+    :mod:`pyrs.schema.codec`), the standard library by default so the output
+    remains the same regardless of the installed packages. Use `auto` for
+    the fastest available backend.
+
+    The arrays (see :func:`can_stream`) could be given as any iterable,
+    e.g. a generator or a database cursor, the items are converted and
+    validated one by one. With `iter_write` (or `write_to`) only the
+    current item is held in memory.
+    """
 
-    def __init__(self, schema, context=None):
-        super(JSONWriter, self).__init__(schema, context=context)
-        self.validator = select_json_validator(self.schema, context)
+    # The size of the chunks of `iter_write`
+    chunk_size = 64 * 1024
+
+    _items_validator = None
+
+    def __init__(self, schema, context=None, profiler=None, codec='json'):
+        super(JSONWriter, self).__init__(
+            schema, context=context, profiler=profiler
+        )
+        self.codec = codecs.get_codec(codec)
+        self.validator = select_json_validator(
+            self.schema, context, profiler=profiler
+        )
 
     def write(self, data):
-        data = self._to_raw(data)
-        self.validator.validate(data)
-        return self._dumps(data)
+        validator = self._get_iterable_validator(data)
+        if validator is not None:
+            return b''.join(self._iter_array(data, validator)).decode('utf-8')
+        with self._measure('to_raw'):
+            data = self._to_raw(data)
+        with self._measure('validate'):
+            self.validator.validate(data)
+        with self._measure('dumps'):
+            return self._dumps(data)
+
+    def iter_write(self, data):
+        """
+        Gives back an iterator of the UTF-8 encoded chunks of the output,
+        e.g. for a WSGI response. The items of an array (see
+        :func:`can_stream`) are converted, validated and encoded one by
+        one (the array could be any iterable), the chunks are yielded in
+        buffers of `chunk_size`, so the whole output is never built. The
+        errors of an item are raised by the iterator when the item is
+        reached, the chunks of the preceding items are already yielded by
+        then. Other documents are written as a single chunk.
+        """
+        validator = self._get_items_validator()
+        if validator is None or not lib.is_iterable(data):
+            return iter([self._write_bytes(data)])
+        return self._iter_array(data, validator)
+
+    def write_to(self, data, fp):
+        """
+        Like `write` but the UTF-8 encoded output is written into the
+        binary file object `fp` instead of building the whole text.
+        """
+        validator = self._get_iterable_validator(data)
+        if validator is not None:
+            for chunk in self._iter_array(data, validator):
+                fp.write(chunk)
+            return
+        with self._measure('to_raw'):
+            data = self._to_raw(data)
+        with self._measure('validate'):
+            self.validator.validate(data)
+        with self._measure('dumps'):
+            self.codec.dump(data, fp, default=self._dump_default)
+
+    def _write_bytes(self, data):
+        with self._measure('to_raw'):
+            data = self._to_raw(data)
+        with self._measure('validate'):
+            self.validator.validate(data)
+        with self._measure('dumps'):
+            return self.codec.dumps_bytes(data, default=self._dump_default)
+
+    def _get_items_validator(self):
+        if self._items_validator is None and can_stream(self.schema):
+            self._items_validator = ArrayItemsValidator(
+                self.schema, self.context, profiler=self.profiler
+            )
+        return self._items_validator
+
+    def _get_iterable_validator(self, data):
+        # The iterables other than lists and tuples (e.g. generators,
+        # database cursors) are written item by item
+        if isinstance(data, (list, tuple)) or not lib.is_iterable(data):
+            return None
+        return self._get_items_validator()
+
+    def _iter_array(self, data, validator):
+        separator = self.codec.item_separator
+        chunks = [b'[']
+        size = 1
+        items = validator.iter_validate(self._iter_raw_items(data))
+        for index, item in enumerate(items):
+            if index:
+                chunks.append(separator)
+            with self._measure('dumps'):
+                chunk = self.codec.dumps_bytes(
+                    item, default=self._dump_default
+                )
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.chunk_size:
+                yield b''.join(chunks)
+                chunks = []
+                size = 0
+        chunks.append(b']')
+        yield b''.join(chunks)
+
+    def _iter_raw_items(self, data):
+        schema = self.schema.get_attr('items')
+        for index, item in enumerate(data):
+            if schema is None:
+                yield item
+                continue
+            try:
+                with self._measure('to_raw'):
+                    item = schema.to_raw(item, context=self.context)
+            except exceptions.ValidationErrors as ex:
+                _prefix_errors(ex.errors, index)
+                raise
+            yield item
 
     def _to_raw(self, data):
         return self.schema.to_raw(data, context=self.context)
 
     def _dumps(self, data):
-        return json.dumps(data, default=self._dump_default)
+        return self.codec.dumps(data, default=self._dump_default)
 
     def _dump_default(self, obj):
         if isinstance(obj, datetime.datetime):
@@ -213,51 +636,223 @@ class JSONWriter(Writer):
             return isodate.time_isoformat(obj)
         elif isinstance(obj, datetime.timedelta):
             return obj.total_seconds()
+        elif isinstance(obj, decimal.Decimal):
+            return _encode_decimal(obj)
         else:
             raise TypeError(obj)
 
 
+def _encode_decimal(value):
+    """
+    Gives back the int or float which is encoded as the very same number,
+    raises `TypeError` when there isn't such. The `Number(decimal=True)`
+    fields are checked by their `to_raw` already.
+    """
+    number = keywords.to_json_number(value)
+    if number is None:
+        raise TypeError('%r cannot be encoded exactly' % value)
+    return number
+
+
+def uses_decimal(schema):
+    """Tells whether the schema has any `Number(decimal=True)` in it"""
+    if isinstance(schema, dict):
+        return any(uses_decimal(s) for s in schema.values())
+    return any(
+        isinstance(s, types.Number) and s.get_attr('decimal')
+        for s in graph.iter_schemas(schema)
+    )
+
+
+def restore_floats(value, schema):
+    """
+    Gives back the document parsed with `Decimal` numbers (see
+    :func:`uses_decimal`) where only the numbers of the
+    `Number(decimal=True)` schemas remain `Decimal`, the rest are floats
+    again. The lists and dicts are changed in place.
+    """
+    root = schema
+    definitions = {}
+    if isinstance(schema, base.Schema):
+        definitions = graph._get_definitions(schema)
+    result = [value]
+    stack = [(result, 0, schema)]
+    while stack:
+        target, key, schema = stack.pop()
+        schema = _resolve_ref(schema, root, definitions)
+        value = target[key]
+        if isinstance(value, decimal.Decimal):
+            if not isinstance(schema, types.Number) or \
+                    not schema.get_attr('decimal'):
+                target[key] = float(value)
+        elif isinstance(value, dict):
+            stack.extend(
+                (value, name, _get_property_schema(schema, name))
+                for name in value
+            )
+        elif isinstance(value, list):
+            stack.extend(
+                (value, index, _get_item_schema(schema, index))
+                for index in range(len(value))
+            )
+    return result[0]
+
+
+def _resolve_ref(schema, root, definitions):
+    # Against the root, like the emitted `$ref`
+    seen = set()
+    while isinstance(schema, types.Ref) and id(schema) not in seen:
+        seen.add(id(schema))
+        ref = schema.get_attr('ref')
+        if ref == '#':
+            return root
+        if ref.startswith('#/definitions/'):
+            ref = ref[len('#/definitions/'):]
+        schema = definitions.get(ref)
+    return schema
+
+
+def _get_property_schema(schema, name):
+    if isinstance(schema, dict):
+        # The dict schema of the readers, the fields by their names
+        return schema.get(name)
+    if not isinstance(schema, types.Object):
+        return None
+    for field, prop in (schema.fields or {}).items():
+        if prop.get_attr('name', field) == name:
+            return prop
+    for pattern, prop in (schema.get_attr('patterns') or {}).items():
+        if re.search(pattern, name):
+            return prop
+    additional = schema.get_attr('additional')
+    if isinstance(additional, base.Schema):
+        return additional
+    return None
+
+
+def _get_item_schema(schema, index):
+    if not isinstance(schema, types.Array):
+        return None
+    items = schema.get_attr('items')
+    if isinstance(items, (list, tuple)):
+        if index < len(items):
+            return items[index]
+        items = schema.get_attr('additional')
+    if isinstance(items, base.Schema):
+        return items
+    return None
+
+
+INPUT_TYPES = six.string_types + (bytes, bytearray, memoryview)
+
+
 class JSONReader(Reader):
+    """
+    Reads JSON text. The `codec` is the JSON backend (see
+    :mod:`pyrs.schema.codec`), the standard library by default so the
+    parsed values and the errors remain the same regardless of the installed
+    packages. Use `auto` for the fastest available backend.
+
+    The data could be text, UTF-8 encoded `bytes`, `bytearray`,
+    `memoryview` or a binary file object, the binary input is given to the
+    codec as it is, without decoding it into text first.
+
+    With `partial` the `required` and `min_properties` of the objects are
+    not enforced (e.g. PATCH requests), see :class:`pyrs.schema.types.Object`.
+
+    With `intern` the keys of the objects and the string values of the
+    `enum` schemas are replaced by the names of the fields and the values
+    of the `enum` (see :meth:`pyrs.schema.graph.Graph.intern`), so the
+    documents read share them, e.g. a cache of many records takes less
+    memory. The objects with `model` and the dict schemas are not
+    interned.
+    """
 
-    def __init__(self, schema, context=None):
-        super(JSONReader, self).__init__(schema, context=context)
-        self.validator = select_json_validator(self.schema, context)
+    def __init__(self, schema, context=None, profiler=None, codec='json',
+                 partial=False, intern=False):
+        if partial:
+            context = dict(context or {}, partial=True)
+        super(JSONReader, self).__init__(
+            schema, context=context, profiler=profiler
+        )
+        self.codec = codecs.get_codec(codec)
+        self.validator = select_json_validator(
+            self.schema, context, profiler=profiler
+        )
+        self.intern = intern
+
+    @property
+    def decimal(self):
+        """
+        Tells whether the numbers are parsed as Decimal (any field needs
+        them), the rest of them are restored to floats. It follows the
+        changes of the schema like the validator.
+        """
+        self.validator._refresh()
+        return self.validator.decimal
 
     def read(self, data):
         self._validate_format(data)
-        value = self._loads(data)
-        self.validator.validate(value)
-        return self._to_python(value)
+        with self._measure('loads'):
+            value = self._loads(data)
+            if self.decimal:
+                value = restore_floats(value, self.schema)
+        with self._measure('validate'):
+            self.validator.validate(value)
+        with self._measure('to_python'):
+            value = self._to_python(value)
+        if self.intern:
+            with self._measure('intern'):
+                value = self._intern(value)
+        return value
+
+    def _intern(self, value):
+        # The graph of the validator follows the changes of the schema
+        compiled = self.validator._get_graph()
+        if compiled is None:
+            return value
+        return compiled.intern(value)
 
     def _validate_format(self, data):
-        if not isinstance(data, six.string_types):
-            raise exceptions.ParseError(
-                'Unrecognised input format: %s given, string type expected'
-                % type(data),
-                value=data
-            )
+        if isinstance(data, INPUT_TYPES) or hasattr(data, 'read'):
+            return
+        raise exceptions.ParseError(
+            'Unrecognised input format: %s given, string, bytes or file '
+            'type expected' % type(data),
+            value=data
+        )
 
     def _loads(self, data):
         try:
-            return json.loads(data)
+            if self.decimal:
+                if hasattr(data, 'read'):
+                    return self.codec.load_decimal(data)
+                return self.codec.loads_decimal(data)
+            if hasattr(data, 'read'):
+                return self.codec.load(data)
+            return self.codec.loads(data)
         except ValueError as ex:
-            raise exceptions.ParseError(ex.args[0], value=data)
+            raise exceptions.ParseError(str(ex), value=data)
 
     def _to_python(self, data):
         if isinstance(self.schema, dict):
             for k in set(data.keys()) & set(self.schema.keys()):
-                data[k] = self.schema[k].to_python(
-                    data[k], context=self.context
-                )
+                with profiling.measure(self.profiler, 'to_python', k):
+                    data[k] = self.schema[k].to_python(
+                        data[k], context=self.context
+                    )
             return data
         return self.schema.to_python(data, context=self.context)
 
 
 class JSONFormReader(JSONReader):
 
-    def __init__(self, schema, context=None):
-        super(JSONFormReader, self).__init__(schema, context=context)
-        self.validator = select_json_validator(self.schema, context)
+    def __init__(self, schema, context=None, profiler=None, codec='json',
+                 partial=False, intern=False):
+        super(JSONFormReader, self).__init__(
+            schema, context=context, profiler=profiler, codec=codec,
+            partial=partial, intern=intern
+        )
 
     def read(self, data):
         self._validate_format(data)
@@ -267,10 +862,23 @@ class JSONFormReader(JSONReader):
             by_name[prop.get_attr('name', field)] = prop
         for field in list(set(data) & set(by_name)):
             prop = by_name[field]
-            if not isinstance(prop, types.String):
-                data[field] = self._loads(data[field])
-        self.validator.validate(data)
-        return self._to_python(data)
+            if isinstance(prop, types.String):
+                continue
+            # The submitted text itself is kept when it's an enum value
+            enum = prop.get_attr('enum')
+            if enum and data[field] in keywords.get_enum_index(enum):
+                continue
+            data[field] = self._loads(data[field])
+        if self.decimal:
+            data = restore_floats(data, self.schema)
+        with self._measure('validate'):
+            self.validator.validate(data)
+        with self._measure('to_python'):
+            data = self._to_python(data)
+        if self.intern:
+            with self._measure('intern'):
+                data = self._intern(data)
+        return data
 
     def _validate_format(self, data):
         if not isinstance(data, dict):
@@ -0,0 +1,27 @@
+"""
+Schemas of the compiler tests
+"""
+import decimal
+
+from .. import types
+
+
+class Address(types.Object):
+    city = types.String(required=True)
+    since = types.Date(name='Since')
+
+
+class Person(types.Object):
+    name = types.String()
+    born = types.DateTime()
+    address = Address()
+    tags = types.Array(items=types.String())
+
+
+class Names(types.Array):
+    _attrs = {'items': types.String()}
+
+
+class Price(types.Object):
+    amount = types.Number(decimal=True, multiple=decimal.Decimal('0.01'))
+    currency = types.Enum(enum=['EUR', 'GBP'])
@@ -1,8 +1,11 @@
+import threading
 import unittest
 
 import mock
 
 from .. import base
+from .. import exceptions
+from .. import schemaio
 from .. import types
 
 
@@ -159,6 +162,22 @@ class TestSchema(unittest.TestCase):
         self.assertEqual(b2._creation_index, 2)
         self.assertEqual(base.Base._creation_index, 3)
 
+    def test_creation_index_threads(self):
+        indexes = []
+
+        def create():
+            indexes.extend(
+                base.Schema()._creation_index for _ in range(1000)
+            )
+
+        threads = [threading.Thread(target=create) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(indexes)), 4000)
+
     def test_declarative(self):
         class MySchema(base.Schema):
             _jsonschema = {
@@ -230,3 +249,292 @@ class TestSchema(unittest.TestCase):
         s = MyObject()
         res = s.to_python({'code': {'num': 12}})
         self.assertEqual(res, {'code': {'num': 12}})
+
+
+class TestLinkRefs(unittest.TestCase):
+
+    def test_definitions(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'a': {'$ref': '#/definitions/a'},
+                'b': {'type': 'array', 'items': [{'$ref': '#/definitions/b'}]},
+                'missing': {'$ref': '#/definitions/missing'},
+                'remote': {'$ref': 'http://example.com/schema'},
+            },
+            'definitions': {
+                'a': {'type': 'integer'},
+                'b': {'$ref': '#/definitions/a'},
+            },
+        }
+
+        linked = base.link_refs(schema)
+        a = linked['definitions']['a']
+        self.assertIs(linked['properties']['a'], a)
+        self.assertIs(linked['properties']['b']['items'][0], a)
+        self.assertEqual(
+            linked['properties']['missing'], {'$ref': '#/definitions/missing'}
+        )
+        self.assertEqual(
+            linked['properties']['remote'],
+            {'$ref': 'http://example.com/schema'}
+        )
+        self.assertEqual(
+            schema['properties']['a'], {'$ref': '#/definitions/a'}
+        )
+
+    def test_nested_definitions_conflict(self):
+        schema = {
+            'properties': {
+                'a': {'$ref': '#/definitions/a'},
+                'sub': {
+                    'properties': {
+                        'a': {'$ref': '#/definitions/a'},
+                        'b': {'$ref': '#/properties/sub/definitions/a'},
+                    },
+                    'definitions': {'a': {'type': 'string'}},
+                },
+            },
+            'definitions': {'a': {'type': 'integer'}},
+        }
+
+        # Resolved against the root, like jsonschema does
+        linked = base.link_refs(schema)
+        sub = linked['properties']['sub']['properties']
+        self.assertEqual(linked['properties']['a'], {'type': 'integer'})
+        self.assertEqual(sub['a'], {'type': 'integer'})
+        self.assertEqual(sub['b'], {'type': 'string'})
+
+    def test_recursion(self):
+        schema = {
+            'properties': {'child': {'$ref': '#'}},
+            'definitions': {'loop': {'$ref': '#/definitions/loop'}},
+            'enum': [{'$ref': '#'}],
+        }
+
+        linked = base.link_refs(schema)
+        self.assertIs(linked['properties']['child'], linked)
+        self.assertEqual(
+            linked['definitions']['loop'], {'$ref': '#/definitions/loop'}
+        )
+        self.assertEqual(linked['enum'], [{'$ref': '#'}])
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_order_independent(self):
+        class A(types.Object):
+            x = types.Integer(required=True)
+            y = types.String(enum=['a', 'b'], required=True)
+
+        class B(types.Object):
+            y = types.String(enum=['b', 'a'], required=True)
+            x = types.Integer(required=True)
+
+        self.assertEqual(A().fingerprint(), B().fingerprint())
+        self.assertEqual(
+            A().fingerprint(), base.get_fingerprint(B().get_jsonschema())
+        )
+        self.assertNotEqual(
+            types.Array(items=[types.String(), types.Integer()]).fingerprint(),
+            types.Array(items=[types.Integer(), types.String()]).fingerprint()
+        )
+
+    def test_same_as_plain_schema(self):
+        class A(types.Object):
+            x = types.Integer()
+            y = types.Array(items=types.Date())
+
+        class B(base.Schema):
+            _jsonschema = A().get_jsonschema()
+
+        self.assertEqual(A().fingerprint(), B().fingerprint())
+
+    def test_context(self):
+        class A(types.Object):
+            x = types.Integer()
+            y = types.String(tags=['private'])
+
+        context = {'exclude_tags': ['private']}
+        self.assertNotEqual(A().fingerprint(), A().fingerprint(context))
+        self.assertEqual(
+            A().fingerprint(context),
+            base.get_fingerprint(A().get_jsonschema(context))
+        )
+
+    def test_context_not_serialisable(self):
+        class A(types.Object):
+            x = types.String()
+            children = types.Array(items=types.Ref(ref='#'))
+
+        context = {1: 'a', 'b': 2}
+        schema = A()
+        self.assertEqual(
+            schema.fingerprint(context), schema.fingerprint({'b': 2})
+        )
+        self.assertEqual(schema._fingerprints.get(base.UNCACHED), None)
+        reader = schemaio.JSONReader(schema, context=context)
+        self.assertEqual(
+            reader.read('{"x": "a", "children": [{"x": "b"}]}'),
+            {'x': 'a', 'children': [{'x': 'b'}]}
+        )
+        reader = schemaio.JSONReader(types.Integer(minimum=1), context=context)
+        self.assertEqual(reader.read('1'), 1)
+
+    def test_children_are_cached(self):
+        class A(types.Object):
+            x = types.Integer()
+
+        class B(types.Object):
+            a = A()
+
+        class C(types.Object):
+            a = B._fields['a']
+            b = types.Integer()
+
+        fingerprint = B().fingerprint()
+        with mock.patch.object(A, 'get_jsonschema') as get_jsonschema:
+            self.assertEqual(B().fingerprint(), fingerprint)
+            C().fingerprint()
+        self.assertFalse(get_jsonschema.called)
+
+    def test_change(self):
+        class A(types.Object):
+            x = types.Integer()
+
+        a = A()
+        fingerprint = a.fingerprint()
+        a.extend({'y': types.String()})
+        self.assertNotEqual(a.fingerprint(), fingerprint)
+        self.assertEqual(
+            a.fingerprint(), base.get_fingerprint(a.get_jsonschema())
+        )
+
+    def test_change_of_a_child(self):
+        class A(types.Object):
+            x = types.Integer()
+
+        class B(types.Object):
+            a = A()
+            c = A()
+
+        b = B()
+        fingerprint = b.fingerprint()
+        child = B._fields['a']
+        child.extend({'y': types.String()})
+        with mock.patch.object(
+                A, 'get_jsonschema', autospec=True,
+                side_effect=A.get_jsonschema
+        ) as get_jsonschema:
+            changed = b.fingerprint()
+        self.assertNotEqual(changed, fingerprint)
+        self.assertEqual(changed, base.get_fingerprint(b.get_jsonschema()))
+        # Only the extended child is emitted again
+        self.assertEqual(get_jsonschema.call_count, 1)
+        self.assertEqual(child.version, 1)
+        self.assertEqual(B._fields['c'].version, 0)
+
+    def test_snapshot(self):
+        class A(types.Object):
+            x = types.Integer()
+
+        class B(types.Object):
+            a = A()
+
+        b = B()
+        snapshot = b.snapshot()
+        B._fields['a'].extend({'y': types.String()})
+
+        self.assertEqual(
+            list(snapshot.get_jsonschema()['properties']['a']['properties']),
+            ['x']
+        )
+        self.assertEqual(
+            list(b.get_jsonschema()['properties']['a']['properties']),
+            ['x', 'y']
+        )
+
+
+class TestMakeValidator(unittest.TestCase):
+
+    def test_shared(self):
+        validator = base._make_validator({'type': 'string', 'maxLength': 3})
+
+        self.assertIs(
+            base._make_validator({'maxLength': 3, 'type': 'string'}),
+            validator
+        )
+        self.assertIsNot(
+            base._make_validator({'type': 'string', 'maxLength': 4}),
+            validator
+        )
+        self.assertIs(
+            base._make_validator({'type': 'string', 'maxLength': 3}).schema,
+            validator.schema
+        )
+
+    def test_check_schema(self):
+        validator_cls = base._get_validator_class()
+        schema = {
+            'type': 'object',
+            'properties': {'a': {'type': 'string', 'minLength': -1}},
+        }
+        with self.assertRaises(base.jsonschema.SchemaError):
+            base.check_schema(validator_cls, schema)
+
+        schema['properties']['a']['minLength'] = 1
+        base.check_schema(validator_cls, schema)
+        with mock.patch.object(validator_cls, 'check_schema') as check:
+            schema['properties']['b'] = {'type': 'integer'}
+            base.check_schema(validator_cls, schema)
+        # The unchanged property isn't checked again
+        self.assertEqual(check.call_count, 2)
+
+    def test_type_hint(self):
+        io = schemaio.JSONSchemaValidator(types.Date())
+
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.validate(12)
+        messages = [e['message'] for e in ctx.exception.errors]
+        self.assertIn(
+            "12 is not of type 'string' (for format 'date' strings, use a "
+            "datetime.date)", messages
+        )
+        self.assertNotIn("12 is not of type 'string'", messages)
+
+    def test_threads(self):
+        jsonschema = base.jsonschema
+        keywords = dict(jsonschema.Draft4Validator.VALIDATORS)
+        meta_schemas = dict(jsonschema.validators._META_SCHEMAS)
+
+        class Item(types.Object):
+            name = types.String(required=True, max_len=5)
+            count = types.Integer(minimum=0)
+            tags = types.Array(items=types.String(), unique_items=True)
+
+        results = []
+
+        def run(index):
+            io = schemaio.JSONSchemaValidator(Item)
+            for i in range(200):
+                valid = {'name': 'n%d' % index, 'count': i, 'tags': ['a']}
+                invalid = {'count': -1, 'tags': ['a', 'a']}
+                try:
+                    io.validate(valid)
+                    io.validate(invalid)
+                except exceptions.ValidationErrors as ex:
+                    results.append(len(ex.errors))
+                else:
+                    results.append(None)
+
+        threads = [
+            threading.Thread(target=run, args=(i, )) for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [3] * 1600)
+        self.assertEqual(jsonschema.Draft4Validator.VALIDATORS, keywords)
+        self.assertEqual(jsonschema.validators._META_SCHEMAS, meta_schemas)
@@ -0,0 +1,140 @@
+import datetime
+import io
+import json
+import unittest
+
+from .. import codec
+from .. import exceptions
+from .. import schemaio
+from .. import types
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class Event(types.Object):
+    at = types.DateTime()
+    took = types.TimeDelta()
+    day = types.Date()
+
+
+class TestGetCodec(unittest.TestCase):
+
+    def test_by_name(self):
+        self.assertIsInstance(codec.get_codec('json'), codec.JSONCodec)
+
+    def test_auto(self):
+        auto = codec.get_codec('auto')
+
+        self.assertIs(codec.get_codec(), auto)
+        self.assertEqual(auto.name, codec.available_codecs()[0])
+
+    def test_instance(self):
+        c = codec.JSONCodec()
+
+        self.assertIs(codec.get_codec(c), c)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            codec.get_codec('unknown')
+
+    def test_json_is_always_available(self):
+        self.assertIn('json', codec.available_codecs())
+
+    def test_reader_default(self):
+        self.assertIsInstance(
+            schemaio.JSONReader(Event).codec, codec.JSONCodec
+        )
+
+
+class CodecTestMixin(object):
+    codec_name = None
+
+    def get_codec(self):
+        return codec.get_codec(self.codec_name)
+
+    def test_roundtrip(self):
+        c = self.get_codec()
+        value = {'a': [1, 2.5, 'x', None, True], 'b': {'c': u'\xe1'}}
+
+        self.assertEqual(c.loads(c.dumps(value)), value)
+        self.assertEqual(c.loads(c.dumps_bytes(value)), value)
+
+    def test_default_is_used(self):
+        c = self.get_codec()
+        moment = datetime.datetime(2015, 8, 12, 19, 44, 15)
+
+        res = c.dumps({'at': moment}, default=lambda obj: 'converted')
+        self.assertEqual(json.loads(res), {'at': 'converted'})
+
+    def test_big_integer(self):
+        c = self.get_codec()
+        value = [2 ** 70]
+
+        self.assertEqual(c.loads(c.dumps(value)), value)
+
+    def test_binary_input(self):
+        c = self.get_codec()
+        data = u'{"a": "\xe1"}'.encode('utf-8')
+
+        self.assertEqual(c.loads(memoryview(data)), {'a': u'\xe1'})
+        self.assertEqual(c.loads(bytearray(data)), {'a': u'\xe1'})
+        self.assertEqual(c.load(io.BytesIO(data)), {'a': u'\xe1'})
+
+    def test_dump(self):
+        c = self.get_codec()
+        value = [{'key': 'x' * 100, 'index': i} for i in range(2000)]
+        fp = io.BytesIO()
+
+        c.dump(value, fp)
+        self.assertEqual(json.loads(fp.getvalue().decode('utf-8')), value)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.get_codec().loads('{invalid')
+
+    def test_writer_keeps_datetime_conversion(self):
+        writer = schemaio.JSONWriter(Event, codec=self.codec_name)
+        moment = datetime.datetime(2015, 8, 12, 19, 44, 15)
+
+        res = writer.write({
+            'at': moment,
+            'took': datetime.timedelta(seconds=2),
+            'day': moment.date(),
+        })
+        self.assertEqual(json.loads(res), {
+            'at': '2015-08-12T19:44:15',
+            'took': 2.0,
+            'day': '2015-08-12',
+        })
+
+    def test_reader(self):
+        reader = schemaio.JSONReader(Event, codec=self.codec_name)
+
+        res = reader.read('{"at": "2015-08-12T19:44:15", "took": 2}')
+        self.assertEqual(res, {
+            'at': datetime.datetime(2015, 8, 12, 19, 44, 15),
+            'took': datetime.timedelta(seconds=2),
+        })
+
+        with self.assertRaises(exceptions.ParseError):
+            reader.read('{invalid')
+
+
+class TestJSONCodec(CodecTestMixin, unittest.TestCase):
+    codec_name = 'json'
+
+
+@unittest.skipIf(orjson is None, 'orjson is not installed')
+class TestOrjsonCodec(CodecTestMixin, unittest.TestCase):
+    codec_name = 'orjson'
+
+    def test_invalid_is_not_parsed_again(self):
+        # Accepted by the standard library
+        data = b'["\\ud800"]'
+        with self.assertRaises(ValueError):
+            self.get_codec().loads(data)
+        with self.assertRaises(exceptions.ParseError):
+            schemaio.JSONReader(types.Array(), codec='orjson').read(data)
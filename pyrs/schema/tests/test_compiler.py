@@ -0,0 +1,152 @@
+import datetime
+import decimal
+import os
+import shutil
+import sys
+import tempfile
+import types as pytypes
+import unittest
+
+import mock
+
+from .. import compiled
+from .. import compiler
+from .. import exceptions
+from .. import schemaio
+from .. import types
+from . import sample_schemas
+
+
+SOURCE = 'pyrs.schema.tests.sample_schemas'
+
+
+def load(source):
+    module = pytypes.ModuleType('compiled_sample_schemas')
+    exec(compile(source, '<compiled>', 'exec'), module.__dict__)
+    return module
+
+
+class TestCompiler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.source = compiler.compile_module(SOURCE)
+        cls.module = load(cls.source)
+
+    def test_classes(self):
+        self.assertEqual(self.module.SOURCE, SOURCE)
+        for name in ('Address', 'Person', 'Names', 'Price'):
+            cls = getattr(self.module, name)
+            self.assertTrue(issubclass(cls, compiled.CompiledSchema))
+            self.assertEqual(
+                cls().get_jsonschema(),
+                getattr(sample_schemas, name)().get_jsonschema()
+            )
+
+    def test_does_not_import_the_source(self):
+        self.assertNotIn('import %s' % SOURCE, self.source)
+        self.assertNotIn('sample_schemas import', self.source)
+
+    def test_to_python(self):
+        raw = {
+            'name': 'A',
+            'born': '2015-08-12T19:44:15',
+            'address': {'city': 'London', 'Since': '2015-08-12'},
+            'tags': ['x'],
+        }
+        self.assertEqual(
+            self.module.Person().to_python(dict(raw)),
+            sample_schemas.Person().to_python(dict(raw)),
+        )
+
+    def test_to_raw(self):
+        value = {
+            'name': 'A',
+            'born': datetime.datetime(2015, 8, 12, 19, 44, 15),
+            'address': {'city': 'London', 'since': datetime.date(2015, 8, 12)},
+        }
+        self.assertEqual(
+            self.module.Person().to_raw(dict(value)),
+            sample_schemas.Person().to_raw(dict(value)),
+        )
+        self.assertIsNone(self.module.Person().to_raw(None))
+
+    def test_decimal_attributes(self):
+        price = self.module.Price()
+
+        self.assertEqual(
+            price.to_python({'amount': 0.1}),
+            {'amount': decimal.Decimal('0.1')}
+        )
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            price.to_raw({'amount': decimal.Decimal('0.12345678901234567891')})
+        self.assertEqual(ctx.exception.errors[0]['path'], 'amount')
+
+    def test_conversion_errors(self):
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            self.module.Person().to_python({'address': {'Since': 'never'}})
+        self.assertEqual(ctx.exception.errors[0]['against'], 'date')
+
+    def test_reader_and_writer(self):
+        reader = schemaio.JSONReader(self.module.Person)
+        writer = schemaio.JSONWriter(self.module.Person)
+
+        value = reader.read(
+            '{"address": {"city": "London", "Since": "2015-08-12"}}'
+        )
+        self.assertEqual(value['address']['since'], datetime.date(2015, 8, 12))
+        self.assertEqual(
+            writer.write(value),
+            '{"address": {"city": "London", "Since": "2015-08-12"}}'
+        )
+        with self.assertRaises(exceptions.ValidationErrors):
+            reader.read('{"address": {}}')
+
+    def test_stale(self):
+        self.assertFalse(compiler.is_stale(SOURCE, self.source))
+
+        fields = sample_schemas.Address._fields
+        with mock.patch.dict(fields, {'zip': types.String()}):
+            self.assertTrue(compiler.is_stale(SOURCE, self.source))
+        self.assertFalse(compiler.is_stale(SOURCE, self.source))
+
+        self.assertTrue(compiler.is_stale(SOURCE, ''))
+
+
+class TestCommandLine(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmpdir, 'compiled.py')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_generate_and_check(self):
+        stderr = sys.stderr
+        sys.stderr = open(os.devnull, 'w')
+        try:
+            self.assertEqual(
+                compiler.main([SOURCE, '-o', self.output, '--check']), 1
+            )
+            self.assertEqual(compiler.main([SOURCE, '-o', self.output]), 0)
+            self.assertEqual(
+                compiler.main([SOURCE, '-o', self.output, '--check']), 0
+            )
+        finally:
+            sys.stderr.close()
+            sys.stderr = stderr
+        with open(self.output) as f:
+            self.assertEqual(f.read(), compiler.compile_module(SOURCE))
+
+    def test_compile_error(self):
+        error = compiler.CompileError('The type Local is not importable')
+        stderr = sys.stderr
+        sys.stderr = open(os.devnull, 'w')
+        try:
+            with mock.patch.object(
+                    compiler, 'compile_module', side_effect=error):
+                self.assertEqual(compiler.main([SOURCE]), 2)
+        finally:
+            sys.stderr.close()
+            sys.stderr = stderr
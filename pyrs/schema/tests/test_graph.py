@@ -0,0 +1,317 @@
+import datetime
+import unittest
+
+import jsonschema
+
+from .. import exceptions
+from .. import graph
+from .. import schemaio
+from .. import types
+
+
+class Comment(types.Object):
+    text = types.String()
+    created = types.Date(name='Created')
+    replies = types.Array(items=types.Ref(ref='#'))
+
+
+class Employee(types.Object):
+    name = types.String(required=True)
+    reports = types.Array(items=types.Ref(ref='employee'))
+
+
+class Company(types.Object):
+    ceo = types.Ref(ref='employee')
+
+    class Definitions:
+        employee = Employee()
+
+
+class Order(types.Object):
+    price = types.Ref(ref='money')
+
+    class Definitions:
+        money = types.Number(minimum=0)
+
+
+def deep_comment(depth, created='2015-08-12'):
+    root = comment = {'Created': created, 'replies': []}
+    for _ in range(depth):
+        reply = {'Created': created, 'replies': []}
+        comment['replies'].append(reply)
+        comment = reply
+    return root, comment
+
+
+class TestGraph(unittest.TestCase):
+
+    def test_compile(self):
+        g = graph.Graph(Comment())
+        self.assertTrue(g.recursive)
+        replies = dict((f, n) for f, _, n in g.root.fields)['replies']
+        self.assertIs(replies.items, g.root)
+
+        self.assertTrue(graph.Graph(Company()).recursive)
+        self.assertFalse(graph.Graph(Order()).recursive)
+
+    def test_contains_ref(self):
+        self.assertTrue(graph.contains_ref(Comment()))
+        self.assertTrue(graph.contains_ref(Company()))
+        self.assertTrue(graph.contains_ref(Order()))
+        self.assertFalse(graph.contains_ref(types.Object()))
+
+    def test_to_python(self):
+        value = Comment().to_python({
+            'text': 'a',
+            'Created': '2015-08-12',
+            'replies': [{'Created': '2015-08-13', 'extra': 1}],
+        })
+
+        self.assertEqual(value, {
+            'text': 'a',
+            'created': datetime.date(2015, 8, 12),
+            'replies': [{'created': datetime.date(2015, 8, 13), 'extra': 1}],
+        })
+
+    def test_to_raw(self):
+        raw = Comment().to_raw({
+            'created': datetime.date(2015, 8, 12),
+            'replies': [{'created': datetime.date(2015, 8, 13)}],
+        })
+
+        self.assertEqual(raw, {
+            'Created': '2015-08-12',
+            'replies': [{'Created': '2015-08-13'}],
+        })
+        self.assertIsNone(Comment().to_raw(None))
+
+    def test_conversion_errors(self):
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            Comment().to_python({
+                'replies': [{'replies': [{'Created': 'never'}]}]
+            })
+        errors = ctx.exception.errors
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]['path'], 'replies.0.replies.0.Created')
+        self.assertEqual(errors[0]['against'], 'date')
+
+    def test_definitions(self):
+        io = schemaio.JSONReader(Company)
+        value = io.read(
+            '{"ceo": {"name": "A", "reports": [{"name": "B", "reports": []}]}}'
+        )
+        self.assertEqual(value['ceo']['reports'][0]['name'], 'B')
+
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.read('{"ceo": {"name": "A", "reports": [{"reports": []}]}}')
+        errors = ctx.exception.errors
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]['path'], 'ceo.reports.0')
+        self.assertEqual(errors[0]['invalid'], 'required')
+
+    def test_cached_per_context(self):
+        schema = Comment()
+        graph.get_graph(schema)
+        compiled = graph.get_graph(schema, {'partial': True})
+
+        self.assertIs(
+            graph.get_graph(schema, {'partial': True, 'profiler': object()}),
+            compiled
+        )
+        self.assertIsNot(graph.get_graph(schema), compiled)
+        io = schemaio.JSONReader(schema, partial=True)
+        for _ in range(3):
+            io.read('{"replies": []}')
+        self.assertEqual(len(schema._graphs), 2)
+
+    def test_not_recursive(self):
+        io = schemaio.JSONSchemaValidator(Order)
+        self.assertNotIsInstance(io.validator, graph.Graph)
+
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.validate({'price': -1})
+
+    def test_validation(self):
+        io = schemaio.JSONSchemaValidator(Comment)
+        self.assertIsInstance(io.validator, graph.Graph)
+
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.validate({'text': 1, 'replies': [{'replies': [{'text': 2}]}]})
+        paths = [e['path'] for e in ctx.exception.errors]
+
+        self.assertEqual(paths, ['text', 'replies.0.replies.0.text'])
+
+    def test_deep_document(self):
+        root, last = deep_comment(5000)
+        last['replies'].append({'Created': 'never'})
+
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            schemaio.JSONSchemaValidator(Comment).validate(root)
+        self.assertEqual(len(ctx.exception.errors), 1)
+        self.assertEqual(
+            ctx.exception.errors[0]['path'],
+            '.'.join(['replies.0'] * 5001) + '.Created'
+        )
+
+        last['replies'].pop()
+        value = Comment().to_python(root)
+        raw = Comment().to_raw(value)
+        depth = 0
+        while raw['replies']:
+            self.assertEqual(value['created'], datetime.date(2015, 8, 12))
+            raw = raw['replies'][0]
+            value = value['replies'][0]
+            depth += 1
+        self.assertEqual(depth, 5000)
+        self.assertEqual(raw, {'Created': '2015-08-12', 'replies': []})
+
+
+class TestEmbedded(unittest.TestCase):
+
+    def test_definition(self):
+        class Reply(types.Object):
+            created = types.Date(name='Created')
+            replies = types.Array(items=types.Ref(ref='reply'))
+
+        class Post(types.Object):
+            title = types.String()
+            replies = types.Array(items=types.Ref(ref='reply'))
+
+            class Definitions:
+                reply = Reply()
+
+        value = Post().to_python({'title': 't', 'replies': [
+            {'Created': '2015-08-12', 'replies': [{'Created': '2015-08-13'}]}
+        ]})
+        self.assertEqual(
+            value['replies'][0]['replies'][0],
+            {'created': datetime.date(2015, 8, 13)}
+        )
+        io = schemaio.JSONSchemaValidator(Post)
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.validate({'replies': [{'replies': [{'Created': 12}]}]})
+
+    def test_root_ref(self):
+        class Post(types.Object):
+            title = types.String()
+            comment = Comment()
+
+        # `#` is the root of the document, i.e. the post
+        published = jsonschema.Draft4Validator(Post().get_jsonschema())
+        io = schemaio.JSONSchemaValidator(Post)
+        valid = {'comment': {'replies': [{'title': 'a'}]}}
+        invalid = {'comment': {'replies': [{'text': 'a'}]}}
+        io.validate(valid)
+        self.assertTrue(published.is_valid(valid))
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.validate(invalid)
+        self.assertFalse(published.is_valid(invalid))
+
+
+class TestNodeRefs(unittest.TestCase):
+
+    def setUp(self):
+        class Child(types.Object):
+            name = types.String()
+
+        class Root(types.Object):
+            child = Child(patterns={
+                '^x_': types.Ref(ref='leaf'),
+                '^y_': types.Ref(ref='#'),
+            })
+            kids = types.Array(items=types.Ref(ref='#'))
+
+            class Definitions:
+                leaf = types.Integer()
+
+        self.reader = schemaio.JSONReader(Root)
+        self.assertIsInstance(self.reader.validator.validator, graph.Graph)
+
+    def test_definition(self):
+        self.assertEqual(
+            self.reader.read('{"child": {"x_1": 1}}'),
+            {'child': {'x_1': 1}}
+        )
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            self.reader.read('{"child": {"x_1": "a"}}')
+        self.assertEqual(
+            [(e['path'], e['invalid']) for e in ctx.exception.errors],
+            [('child.x_1', 'type')]
+        )
+
+    def test_root(self):
+        self.reader.read('{"child": {"y_1": {"kids": [{}]}}}')
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            self.reader.read('{"child": {"y_1": {"kids": [{"kids": 1}]}}}')
+        self.assertEqual(
+            [e['invalid'] for e in ctx.exception.errors], ['type']
+        )
+
+
+class TestChangedErrors(unittest.TestCase):
+
+    def test_recursive(self):
+        compiled = graph.Graph(Comment())
+        root, leaf = deep_comment(100)
+        leaf['Created'] = 12
+        # Not on the changed path, not visited
+        root['replies'].append({'Created': 12, 'replies': []})
+        path = ['replies', 0] * 100 + ['Created']
+        errors = list(compiled.iter_changed_errors(root, [path]))
+        self.assertEqual(
+            [list(error.path) for error in errors], [path] * len(errors)
+        )
+        self.assertTrue(errors)
+
+    def test_path_tree(self):
+        self.assertEqual(
+            graph._get_path_tree([['a', 0, 'b'], ['a', 0], ['c']]),
+            {'a': {'0': None}, 'c': None}
+        )
+        self.assertIsNone(graph._get_path_tree([['a'], []]))
+
+
+class TestIntern(unittest.TestCase):
+
+    def test_intern(self):
+        class Ticket(types.Object):
+            status = types.Enum(enum=['open', 'closed'])
+            title = types.String(name='Title')
+            links = types.Array(items=types.Ref(ref='#'))
+
+        compiled = graph.Graph(Ticket())
+        # The copies of the strings as the parser would give them
+        status = ''.join(['clo', 'sed'])
+        key = ''.join(['Tit', 'le'])
+        value = {key: 'a', 'status': 'open', 'links': [
+            {'status': status, 'links': []}
+        ]}
+        value = compiled.intern(value)
+
+        self.assertEqual(value, {'Title': 'a', 'status': 'open', 'links': [
+            {'status': 'closed', 'links': []}
+        ]})
+        self.assertIs(
+            [k for k in value if k == 'Title'][0],
+            dict((n, n) for _, n, _ in compiled.root.fields)['Title']
+        )
+        self.assertIs(
+            value['links'][0]['status'],
+            dict((f, n) for f, _, n in compiled.root.fields)[
+                'status'].values['closed']
+        )
+
+    def test_not_enum(self):
+        compiled = graph.Graph(Comment())
+        value = {'text': 'a', 'replies': [{'text': 'b', 'replies': []}]}
+        self.assertIs(compiled.intern(value), value)
+
+
+class TestRef(unittest.TestCase):
+
+    def test_root_ref(self):
+        self.assertEqual(types.Ref(ref='#').get_jsonschema(), {'$ref': '#'})
+        self.assertEqual(
+            types.Ref(ref='a').get_jsonschema(), {'$ref': '#/definitions/a'}
+        )
@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+# The limit of the cumulative import time of `pyrs.schema` in microseconds
+IMPORT_TIME_LIMIT = int(os.environ.get('PYRS_IMPORT_TIME_LIMIT', 150000))
+
+# `pkg_resources` is imported by the `pyrs` namespace package
+LAZY_MODULES = ('jsonschema', 'isodate', 'pstats')
+
+ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
+        __file__
+    ))))
+)
+
+
+def run_python(*args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.Popen(
+        (sys.executable,) + args, cwd=ROOT, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    stdout, stderr = process.communicate()
+    if process.returncode:
+        raise AssertionError(stderr)
+    return stdout, stderr
+
+
+def get_import_times(stderr):
+    """Parses the output of `python -X importtime`"""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        try:
+            times[parts[2].strip()] = int(parts[1])
+        except ValueError:
+            continue
+    return times
+
+
+class TestImport(unittest.TestCase):
+
+    def test_heavy_dependencies_are_lazy(self):
+        stdout, _ = run_python('-c', (
+            'import sys\n'
+            'import pyrs.schema\n'
+            'print(",".join(sorted(sys.modules)))\n'
+        ))
+        modules = stdout.strip().split(',')
+        for name in LAZY_MODULES:
+            self.assertNotIn(name, modules)
+
+    def test_dependencies_are_loaded_on_use(self):
+        stdout, _ = run_python('-c', (
+            'import sys\n'
+            'from pyrs import schema\n'
+            'class A(schema.Object):\n'
+            '    at = schema.Date()\n'
+            'print(schema.JSONReader(A).read(\'{"at": "2015-08-12"}\'))\n'
+            'print("jsonschema" in sys.modules, "isodate" in sys.modules)\n'
+        ))
+        self.assertEqual(stdout.splitlines(), [
+            "{'at': datetime.date(2015, 8, 12)}", 'True True'
+        ])
+
+    @unittest.skipIf(sys.version_info < (3, 7), '-X importtime is missing')
+    def test_import_time(self):
+        # The best of a few runs, the first one can compile the sources
+        best = None
+        for _ in range(3):
+            _, stderr = run_python(
+                '-X', 'importtime', '-c', 'import pyrs.schema'
+            )
+            times = get_import_times(stderr)
+            # Without the `pyrs` namespace package (and `pkg_resources`)
+            elapsed = times['pyrs.schema'] - times.get('pyrs', 0)
+            best = elapsed if best is None else min(best, elapsed)
+        self.assertLess(best, IMPORT_TIME_LIMIT)
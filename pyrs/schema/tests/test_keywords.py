@@ -0,0 +1,238 @@
+import decimal
+import unittest
+
+from .. import base
+from .. import exceptions
+from .. import keywords
+from .. import schemaio
+from .. import types
+
+
+class TestPattern(unittest.TestCase):
+
+    def test_pattern(self):
+        io = schemaio.JSONSchemaValidator(types.String(pattern='^[a-f]+$'))
+        io.validate('abc')
+
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.validate('xyz')
+        self.assertEqual(
+            ctx.exception.errors[0]['message'], "'xyz' does not match "
+            "'^[a-f]+$'"
+        )
+
+    def test_compiled_once(self):
+        self.assertIs(
+            keywords.compile_pattern('^a+$'), keywords.compile_pattern('^a+$')
+        )
+
+
+class TestPatternProperties(unittest.TestCase):
+
+    def test_translations(self):
+        class Translation(types.Object):
+            keyword = types.String()
+
+            class Attrs:
+                patterns = {
+                    '^value_[a-z]{2}$': types.String(max_len=5),
+                    '^value_en$': types.String(min_len=2),
+                }
+
+        io = schemaio.JSONSchemaValidator(Translation)
+        io.validate({'keyword': 'k', 'value_hu': 'abc', 'value_en': 'ab'})
+
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.validate({'value_en': 'a', 'value_de': 'abcdef', 'x': 1})
+        errors = sorted(
+            (e['path'], e['invalid']) for e in ctx.exception.errors
+        )
+        self.assertEqual(errors, [
+            ('', 'additionalProperties'),
+            ('value_de', 'maxLength'),
+            ('value_en', 'minLength'),
+        ])
+
+    def test_matcher(self):
+        matcher = keywords.PatternMatcher(['^a', 'b$', 'c'])
+
+        self.assertIsNotNone(matcher.combined)
+        self.assertEqual(matcher.match('ab'), (0, 1))
+        self.assertEqual(matcher.match('xbc'), (2, ))
+        self.assertEqual(matcher.match('x'), ())
+        self.assertEqual(matcher.keys['ab'], (0, 1))
+
+    def test_not_combinable(self):
+        for patterns in [['(a)\\1', 'b'], ['(?P<x>a)', '(?P<x>b)']]:
+            matcher = keywords.PatternMatcher(patterns)
+
+            self.assertIsNone(matcher.combined)
+            self.assertEqual(matcher.match('aa'), (0, ))
+            self.assertEqual(matcher.match('b'), (1, ))
+
+        validator = base._make_validator({
+            'patternProperties': {'^(a)\\1$': {'type': 'integer'}}
+        })
+        self.assertTrue(validator.is_valid({'aa': 1, 'a': 'x'}))
+        self.assertFalse(validator.is_valid({'aa': 'x'}))
+
+
+class TestProperties(unittest.TestCase):
+
+    def test_properties(self):
+        class Item(types.Object):
+            a = types.Integer()
+            b = types.String()
+            c = types.Boolean()
+
+        io = schemaio.JSONSchemaValidator(Item)
+        io.validate({'b': 'x'})
+        io.validate({'a': 1, 'b': 'x', 'c': True})
+        for value in [{'b': 1}, {'a': 'x', 'b': 'x', 'c': True}]:
+            with self.assertRaises(exceptions.ValidationErrors) as ctx:
+                io.validate(value)
+            self.assertEqual(len(ctx.exception.errors), 1)
+            self.assertEqual(ctx.exception.errors[0]['invalid'], 'type')
+
+
+class TestUniqueItems(unittest.TestCase):
+
+    def test_unique(self):
+        io = schemaio.JSONSchemaValidator(types.Array(unique_items=True))
+        io.validate([1, True, '1', [1], {'a': 1}, {'a': True}, None, 0, False])
+
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.validate([{'a': 1, 'b': [1]}, 2, {'b': [1.0], 'a': 1}, 2, 2])
+        error = ctx.exception.errors[0]
+        self.assertEqual(error['invalid'], 'uniqueItems')
+        self.assertEqual(error['duplicates'], [(2, 0), (3, 1), (4, 1)])
+        self.assertIn('item 2 equals to item 0', error['message'])
+
+    def test_not_unique_items(self):
+        validator = base._make_validator({'uniqueItems': False})
+        self.assertTrue(validator.is_valid([1, 1]))
+
+    def test_find_duplicates(self):
+        self.assertEqual(keywords.find_duplicates([]), [])
+        self.assertEqual(keywords.find_duplicates([1, 1.0, True]), [(1, 0)])
+        self.assertEqual(
+            keywords.find_duplicates([True, 1, False, 0, 1.0]), [(4, 1)]
+        )
+        self.assertEqual(
+            keywords.find_duplicates([[1, 2], (1, 2), [2, 1]]), [(1, 0)]
+        )
+
+    def test_unhashable(self):
+        class Item(object):
+            __hash__ = None
+
+            def __eq__(self, other):
+                return isinstance(other, Item)
+
+        self.assertEqual(
+            keywords.find_duplicates([Item(), 1, Item()]), [(2, 0)]
+        )
+
+
+class TestEnum(unittest.TestCase):
+
+    def test_enum(self):
+        codes = ['P%04d' % i for i in range(1000)] + [1, True, [1], {'a': 1}]
+        io = schemaio.JSONSchemaValidator(types.Enum(enum=codes))
+        for value in ['P0000', 'P0999', 1.0, True, [1], {'a': 1}]:
+            io.validate(value)
+        for value in ['P1000', 2, False, 0, [2], {'a': 2}, None]:
+            with self.assertRaises(exceptions.ValidationErrors) as ctx:
+                io.validate(value)
+            self.assertEqual(ctx.exception.errors[0]['invalid'], 'enum')
+
+    def test_index(self):
+        class Item(object):
+            __hash__ = None
+
+            def __eq__(self, other):
+                return isinstance(other, Item)
+
+        values = ['a', 1, Item()]
+        index = keywords.get_enum_index(values)
+
+        self.assertIs(keywords.get_enum_index(values), index)
+        self.assertIsNot(keywords.get_enum_index(list(values)), index)
+        self.assertIn('a', index)
+        self.assertIn(1.0, index)
+        self.assertIn(Item(), index)
+        self.assertNotIn(True, index)
+        self.assertNotIn('b', index)
+
+    def test_decimal(self):
+        index = keywords.get_enum_index([0.5, 1.5, 2])
+
+        self.assertIn(decimal.Decimal('1.5'), index)
+        self.assertIn(decimal.Decimal('2.00'), index)
+        self.assertNotIn(decimal.Decimal('1.25'), index)
+        self.assertEqual(
+            keywords.get_item_key([decimal.Decimal('0.5')]),
+            keywords.get_item_key([0.5])
+        )
+        index = keywords.get_enum_index([0.1, 0.2])
+        self.assertIn(decimal.Decimal('0.1'), index)
+        self.assertNotIn(decimal.Decimal(0.1), index)
+        self.assertNotEqual(
+            keywords.get_item_key(decimal.Decimal(0.1)),
+            keywords.get_item_key(0.1)
+        )
+
+
+class TestBounds(unittest.TestCase):
+
+    def test_decimal(self):
+        io = schemaio.JSONSchemaValidator(
+            types.Number(minimum=0.1, maximum=0.3, exclusive_max=True)
+        )
+        io.validate(decimal.Decimal('0.1'))
+        io.validate(decimal.Decimal('0.29'))
+        io.validate(0.1)
+        for value, invalid in [(decimal.Decimal('0.09'), 'minimum'),
+                               (decimal.Decimal('0.3'), 'maximum'),
+                               (0.3, 'maximum')]:
+            with self.assertRaises(exceptions.ValidationErrors) as ctx:
+                io.validate(value)
+            self.assertEqual(ctx.exception.errors[0]['invalid'], invalid)
+        io = schemaio.JSONSchemaValidator(
+            types.Number(minimum=decimal.Decimal('0.1'))
+        )
+        io.validate(0.1)
+
+
+class TestMultipleOf(unittest.TestCase):
+
+    def test_is_multiple(self):
+        for value, multiple in [(9, 3), (0.3, 0.1), (4.0, 2), (1e308, 0.1),
+                                (decimal.Decimal('19.99'), 0.01),
+                                (decimal.Decimal('19.99'),
+                                 decimal.Decimal('0.01'))]:
+            self.assertTrue(keywords.is_multiple(value, multiple))
+        for value, multiple in [(10, 3), (0.35, 0.1), (1e308, 0.3),
+                                (decimal.Decimal('19.995'), 0.01),
+                                (float('inf'), 1), (float('nan'), 1)]:
+            self.assertFalse(keywords.is_multiple(value, multiple))
+
+    def test_validate(self):
+        io = schemaio.JSONSchemaValidator(types.Number(multiple=0.01))
+        io.validate(19.99)
+        io.validate(decimal.Decimal('19.99'))
+
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.validate(19.999)
+        self.assertEqual(ctx.exception.errors[0]['invalid'], 'multipleOf')
+
+
+class TestCache(unittest.TestCase):
+
+    def test_limit(self):
+        cache = keywords.Cache(size=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        cache['c'] = 3
+
+        self.assertEqual(cache, {'c': 3})
@@ -0,0 +1,190 @@
+import collections
+import datetime
+import pickle
+import sys
+import unittest
+
+from .. import exceptions
+from .. import models
+from .. import schemaio
+from .. import types
+
+
+class Address(types.Object):
+    city = types.String()
+    zip = types.String(name='postcode')
+
+    class Attrs:
+        model = True
+
+
+class Person(types.Object):
+    name = types.String(required=True)
+    born = types.Date()
+    address = Address()
+
+    class Attrs:
+        model = True
+
+
+class TestModel(unittest.TestCase):
+
+    def test_make_model(self):
+        Point = models.make_model('Point', ['x', 'y'])
+        point = Point(x=1)
+
+        self.assertEqual(point.x, 1)
+        self.assertIsNone(point.y)
+        self.assertEqual(point, Point(x=1, y=None))
+        self.assertNotEqual(point, Point(x=2))
+        self.assertEqual(repr(point), 'Point(x=1, y=None)')
+        self.assertEqual(point._asdict(), {'x': 1, 'y': None})
+        self.assertFalse(hasattr(point, '__dict__'))
+        with self.assertRaises(TypeError):
+            Point(z=1)
+
+    def test_pickle(self):
+        Point = models.make_model('Point', ['x', 'y'])
+        point = pickle.loads(pickle.dumps(Point(x=1)))
+
+        self.assertEqual(point._asdict(), {'x': 1, 'y': None})
+        self.assertIs(type(point), type(pickle.loads(pickle.dumps(point))))
+
+    def test_get_model(self):
+        model = models.get_model(Address, ['city', 'zip'])
+
+        self.assertIs(models.get_model(Address, ['city', 'zip']), model)
+        self.assertIsNot(models.get_model(Address, ['city']), model)
+        self.assertEqual(model.__name__, 'Address')
+
+
+class TestObjectModel(unittest.TestCase):
+
+    def test_to_python(self):
+        person = Person().to_python({
+            'name': 'John',
+            'born': '1980-01-02',
+            'address': {'city': 'London', 'postcode': 'N1'},
+        })
+
+        self.assertEqual(person.name, 'John')
+        self.assertEqual(person.born, datetime.date(1980, 1, 2))
+        self.assertEqual(person.address.city, 'London')
+        self.assertEqual(person.address.zip, 'N1')
+        self.assertIsInstance(person, Person()._get_model())
+
+    def test_to_raw(self):
+        schema = Person()
+        raw = {
+            'name': 'John',
+            'address': {'city': 'London', 'postcode': 'N1'},
+        }
+
+        self.assertEqual(schema.to_raw(schema.to_python(raw)), raw)
+        # The dicts are still accepted
+        self.assertEqual(schema.to_raw(raw), raw)
+
+    def test_reader_and_writer(self):
+        data = '{"name": "John", "address": {"city": "London"}}'
+        person = schemaio.JSONReader(Person).read(data)
+
+        self.assertEqual(person.address.city, 'London')
+        self.assertEqual(
+            schemaio.JSONWriter(Person).write(person),
+            '{"name": "John", "address": {"city": "London"}}'
+        )
+        person.name = 12
+        with self.assertRaises(exceptions.ValidationErrors):
+            schemaio.JSONWriter(Person).write(person)
+
+    def test_pickle(self):
+        person = Person().to_python({
+            'name': 'John', 'address': {'city': 'London'}
+        })
+        copied = pickle.loads(pickle.dumps(person))
+
+        self.assertEqual(copied, person)
+        self.assertIs(type(copied), type(person))
+        self.assertIs(type(copied.address), type(person.address))
+
+    def test_user_model(self):
+        Point = collections.namedtuple('Point', ['x', 'y'])
+
+        class PointSchema(types.Object):
+            x = types.Integer()
+            y = types.Integer()
+
+            class Attrs:
+                model = Point
+
+        schema = PointSchema()
+        self.assertEqual(schema.to_python({'x': 1, 'y': 2}), Point(1, 2))
+        self.assertEqual(schema.to_raw(Point(1, 2)), {'x': 1, 'y': 2})
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'dataclasses')
+    def test_dataclass(self):
+        import dataclasses
+
+        Point = dataclasses.make_dataclass('Point', [
+            ('x', int, dataclasses.field(default=0)),
+            ('y', int, dataclasses.field(default=0)),
+        ])
+
+        schema = types.Object(
+            extend={'x': types.Integer(), 'y': types.Integer()},
+            model=Point
+        )
+        self.assertEqual(schema.to_python({'x': 1}), Point(1, 0))
+        self.assertEqual(schema.to_raw(Point(1, 2)), {'x': 1, 'y': 2})
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'dataclasses')
+    def test_required_arguments(self):
+        import dataclasses
+
+        Point = dataclasses.make_dataclass('Point', ['x', 'y'])
+        schema = types.Object(
+            extend={'x': types.Integer(), 'y': types.Integer()},
+            model=Point
+        )
+        self.assertEqual(schema.to_python({'x': 1}), Point(1, None))
+
+    def test_invalid_instance(self):
+        def point(x=None):
+            if x is None:
+                raise ValueError('x is missing')
+            return {'x': x}
+
+        schema = types.Object(extend={'x': types.Integer()}, model=point)
+        self.assertEqual(schema.to_python({'x': 1}), {'x': 1})
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            schema.to_python({})
+        self.assertEqual(ctx.exception.errors[0]['invalid'], 'model')
+        with self.assertRaises(exceptions.ValidationErrors):
+            schemaio.JSONReader(
+                types.Object(extend={'p': schema})
+            ).read('{"p": {}}')
+
+    def test_extend(self):
+        schema = Address()
+        schema.extend({'country': types.String()})
+        address = schema.to_python({'city': 'London', 'country': 'UK'})
+
+        self.assertEqual(address.country, 'UK')
+        self.assertNotIn('country', Address()._get_model()._fields)
+
+    def test_additional(self):
+        with self.assertRaises(TypeError):
+            types.Object(model=True, additional=True)
+        with self.assertRaises(TypeError):
+            types.Object(model=True, patterns={'a': types.String()})
+
+    def test_references(self):
+        class Comment(types.Object):
+            text = types.String()
+            replies = types.Array(items=types.Ref(ref='#'))
+
+            class Attrs:
+                model = True
+
+        with self.assertRaises(TypeError):
+            Comment().to_python({'text': 'a'})
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import ndjson
+from .. import types
+
+
+class Event(types.Object):
+    id = types.Integer(required=True)
+    at = types.Date()
+
+
+LINES = [
+    b'{"id": 1, "at": "2015-08-12"}',
+    b'{"id": "2"}',
+    b'',
+    b'{"id": 3}\r',
+    b'{invalid',
+    b'{"id": 5, "at": "2015-08-13"}',
+    b'{"id": 6}',
+]
+
+
+class TestIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'input.ndjson')
+        self.output = os.path.join(self.tmpdir, 'output.ndjson')
+        with open(self.path, 'wb') as f:
+            f.write(b'\n'.join(LINES))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def assertResult(self, result):
+        self.assertEqual(result.lines, 7)
+        self.assertEqual(result.records, 6)
+        self.assertEqual(result.valid, 4)
+        self.assertEqual(result.invalid, 2)
+        self.assertEqual(len(result.errors), 2)
+
+        error = result.errors[0]
+        self.assertEqual(error['line'], 2)
+        self.assertEqual(error['offset'], len(LINES[0]) + 1)
+        self.assertEqual(error['errors'][0]['path'], 'id')
+        self.assertEqual(error['errors'][0]['invalid'], 'type')
+
+        error = result.errors[1]
+        self.assertEqual(error['line'], 5)
+        self.assertEqual(
+            error['offset'], sum(len(line) + 1 for line in LINES[:4])
+        )
+        self.assertEqual(error['errors'][0]['error'], 'ParseError')
+
+        with open(self.output, 'rb') as f:
+            self.assertEqual(f.read().split(b'\n'), [
+                LINES[0], LINES[3], LINES[5], LINES[6], b''
+            ])
+
+    def test_in_process(self):
+        result = ndjson.ingest(
+            self.path, Event, output=self.output, workers=0
+        )
+        self.assertResult(result)
+
+    def test_in_process_small_chunks(self):
+        result = ndjson.ingest(
+            self.path, Event, output=self.output, workers=0, chunk_size=7
+        )
+        self.assertResult(result)
+
+    def test_workers(self):
+        result = ndjson.ingest(
+            self.path, Event, output=self.output, workers=2, chunk_size=20
+        )
+        self.assertResult(result)
+
+    def test_max_errors(self):
+        result = ndjson.ingest(self.path, Event, workers=0, max_errors=1)
+
+        self.assertEqual(result.invalid, 2)
+        self.assertEqual(len(result.errors), 1)
+
+    def test_big_integer(self):
+        # Parsed by the standard library like by the readers
+        with open(self.path, 'wb') as f:
+            f.write(b'{"id": 12345678901234567890123}\n')
+        result = ndjson.ingest(self.path, Event(), output=self.output,
+                               workers=0)
+
+        self.assertEqual(result.valid, 1)
+        with self.assertRaises(ValueError):
+            ndjson.ingest(self.path, Event(), workers=0, codec='unknown')
+
+    def test_empty_file(self):
+        open(self.path, 'wb').close()
+
+        result = ndjson.ingest(
+            self.path, Event, output=self.output, workers=0
+        )
+        self.assertEqual(result.records, 0)
+        self.assertTrue(os.path.exists(self.output))
+
+
+class TestSplitChunks(unittest.TestCase):
+
+    def test_split_at_newlines(self):
+        data = b'aaa\nbb\ncccc\nd'
+
+        chunks = ndjson.split_chunks(data, 2)
+        self.assertEqual(chunks, [(0, 4), (4, 7), (7, 12), (12, 13)])
+
+    def test_single_chunk(self):
+        data = b'aaa\nbb\n'
+
+        self.assertEqual(ndjson.split_chunks(data, 100), [(0, 7)])
@@ -313,6 +313,24 @@ class TestSchemaExtend(unittest.TestCase):
             }
         )
 
+    def test_extend_does_not_change_the_class(self):
+        class MyObject(types.Object):
+            num = types.Integer()
+
+        t = MyObject(extend={'title': types.String()})
+        t.extend({'code': types.String()})
+
+        self.assertEqual(list(t.fields), ['num', 'title', 'code'])
+        self.assertEqual(list(MyObject._fields), ['num'])
+        self.assertEqual(list(MyObject().fields), ['num'])
+
+    def test_extend_without_fields(self):
+        t = types.Object()
+        t.extend({'title': types.String()})
+
+        self.assertEqual(list(t.fields), ['title'])
+        self.assertIsNone(types.Object._fields)
+
 
 class TestSchemaInclude(unittest.TestCase):
 
@@ -457,3 +475,36 @@ class TestSchemaTagFilter(unittest.TestCase):
                 'additionalProperties': False,
             }
         )
+
+
+class TestSchemaPartial(unittest.TestCase):
+
+    def test_partial(self):
+        class Address(types.Object):
+            city = types.String(required=True)
+
+        class MyObject(types.Object):
+            name = types.String(required=True)
+            address = Address()
+
+            class Attrs:
+                min_properties = 1
+
+        t = MyObject()
+        self.assertEqual(
+            t.get_jsonschema(context={'partial': True}),
+            {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string'},
+                    'address': {
+                        'type': 'object',
+                        'properties': {'city': {'type': 'string'}},
+                        'additionalProperties': False,
+                    },
+                },
+                'additionalProperties': False,
+            }
+        )
+        self.assertEqual(t.get_jsonschema()['required'], ['name'])
+        self.assertEqual(t.get_jsonschema()['minProperties'], 1)
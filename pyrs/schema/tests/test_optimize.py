@@ -0,0 +1,152 @@
+import unittest
+
+from .. import base
+from .. import optimize
+from .. import schemaio
+from .. import types
+
+
+ADDRESS = {
+    'type': 'object',
+    'properties': {
+        'street': {'type': 'string', 'maxLength': 100},
+        'city': {'type': 'string', 'maxLength': 100},
+    },
+    'required': ['city'],
+}
+
+
+def make_schema(count):
+    return {
+        'type': 'object',
+        'properties': dict(('a%d' % i, dict(ADDRESS)) for i in range(count)),
+    }
+
+
+class TestDeduplicate(unittest.TestCase):
+
+    def test_hoist(self):
+        schema = make_schema(3)
+        schema['properties']['list'] = {'type': 'array', 'items': ADDRESS}
+
+        result, report = optimize.deduplicate(schema)
+
+        self.assertEqual(result['definitions'], {'schema1': ADDRESS})
+        for name in ('a0', 'a1', 'a2'):
+            self.assertEqual(
+                result['properties'][name], {'$ref': '#/definitions/schema1'}
+            )
+        self.assertEqual(
+            result['properties']['list']['items'],
+            {'$ref': '#/definitions/schema1'}
+        )
+        self.assertEqual(report.definitions, [
+            ('schema1', 4, len(optimize.canonical(ADDRESS)))
+        ])
+        self.assertEqual(report.size, len(optimize.canonical(result)))
+        self.assertLess(report.size, report.original_size)
+        self.assertEqual(schema['properties']['a0'], ADDRESS)
+        self.assertNotIn('definitions', schema)
+
+    def test_existing_definition(self):
+        schema = make_schema(2)
+        schema['definitions'] = {'address': dict(ADDRESS, title='x')}
+        schema['properties']['a1']['title'] = 'x'
+        schema['properties']['a0']['title'] = 'x'
+
+        result, _ = optimize.deduplicate(schema)
+
+        self.assertEqual(list(result['definitions']), ['address'])
+        self.assertEqual(
+            result['properties']['a0'], {'$ref': '#/definitions/address'}
+        )
+
+    def test_small_subschemas_are_kept(self):
+        schema = {
+            'properties': {
+                'a': {'type': 'string'}, 'b': {'type': 'string'},
+            }
+        }
+
+        result, report = optimize.deduplicate(schema)
+
+        self.assertEqual(result, schema)
+        self.assertEqual(report.saved, 0)
+
+    def test_references_are_not_moved(self):
+        sub = dict(ADDRESS, properties={'x': {'$ref': '#/definitions/x'}})
+        schema = {
+            'properties': {'a': sub, 'b': dict(sub)},
+            'definitions': {'x': {'type': 'integer'}},
+        }
+
+        result, _ = optimize.deduplicate(schema)
+
+        self.assertEqual(result['properties']['a'], sub)
+
+    def test_validation_is_the_same(self):
+        result, _ = optimize.deduplicate(make_schema(5))
+        validator = base._make_validator(result)
+
+        self.assertTrue(validator.is_valid({'a1': {'city': 'London'}}))
+        self.assertFalse(validator.is_valid({'a1': {'street': 'x'}}))
+
+
+class TestShareSubschemas(unittest.TestCase):
+
+    def test_share(self):
+        schema = make_schema(3)
+
+        result = optimize.share_subschemas(schema)
+
+        self.assertEqual(result, schema)
+        self.assertIs(result['properties']['a0'], result['properties']['a2'])
+        self.assertIsNot(
+            schema['properties']['a0'], result['properties']['a0']
+        )
+
+
+class TestSplitSubschemas(unittest.TestCase):
+
+    def test_split(self):
+        schema = {
+            'type': 'array',
+            'items': [ADDRESS, {'type': 'integer'}],
+            'additionalItems': {'type': 'string'},
+        }
+        node, subschemas = optimize.split_subschemas(schema)
+        self.assertEqual(node, {
+            'type': 'array', 'items': [{}, {}], 'additionalItems': {},
+        })
+        self.assertEqual(
+            subschemas, [ADDRESS, {'type': 'integer'}, {'type': 'string'}]
+        )
+        self.assertEqual(schema['items'][0], ADDRESS)
+
+    def test_properties(self):
+        node, subschemas = optimize.split_subschemas(ADDRESS)
+        self.assertEqual(node['properties'], {'street': {}, 'city': {}})
+        self.assertEqual(node['required'], ['city'])
+        self.assertEqual(len(subschemas), 2)
+
+
+class TestJSONSchemaWriter(unittest.TestCase):
+
+    def test_deduplicate(self):
+        class Address(types.Object):
+            street = types.String(max_len=100)
+            city = types.String(max_len=100)
+
+        class Customer(types.Object):
+            home = Address()
+            work = Address()
+            other = Address()
+
+        io = schemaio.JSONSchemaWriter(deduplicate=True)
+        schema = io.extract(Customer)
+
+        self.assertEqual(
+            schema['properties']['home'], {'$ref': '#/definitions/schema1'}
+        )
+        self.assertEqual(io.report.definitions[0][:2], ('schema1', 3))
+        self.assertIsNone(schemaio.JSONSchemaWriter().report)
@@ -0,0 +1,79 @@
+import unittest
+
+from .. import profiler
+from .. import schemaio
+from .. import types
+
+
+class Address(types.Object):
+    city = types.String()
+    since = types.Date()
+
+
+class Person(types.Object):
+    name = types.String()
+    address = Address()
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_reader_records_per_path(self):
+        p = profiler.Profiler()
+        reader = schemaio.JSONReader(Person, profiler=p)
+
+        reader.read('{"name": "A", "address": {"since": "2015-01-01"}}')
+        reader.read('{"name": "B", "address": {"city": "London"}}')
+
+        stats = dict(
+            ((phase, path), calls)
+            for phase, path, calls, _ in p.get_stats()
+        )
+        self.assertEqual(stats[('loads', '')], 2)
+        self.assertEqual(stats[('validate', '')], 2)
+        self.assertEqual(stats[('validate', 'address')], 2)
+        self.assertEqual(stats[('validate', 'address.since')], 1)
+        self.assertEqual(stats[('to_python', '')], 2)
+        self.assertEqual(stats[('to_python', 'address')], 2)
+        self.assertEqual(stats[('to_python', 'address.city')], 1)
+
+    def test_writer_records_per_path(self):
+        p = profiler.Profiler()
+        writer = schemaio.JSONWriter(Person, profiler=p)
+
+        writer.write({'name': 'A', 'address': {'city': 'London'}})
+
+        paths = set((phase, path) for phase, path, _, _ in p.get_stats())
+        self.assertIn(('to_raw', 'address.city'), paths)
+        self.assertIn(('validate', 'address.city'), paths)
+        self.assertIn(('dumps', ''), paths)
+
+    def test_report_and_reset(self):
+        p = profiler.Profiler()
+        reader = schemaio.JSONReader(Person, profiler=p)
+        reader.read('{"name": "A"}')
+
+        report = p.report(limit=2)
+        self.assertEqual(len(report.splitlines()), 3)
+
+        p.reset()
+        self.assertEqual(p.get_stats(), [])
+
+    def test_pstats(self):
+        ticks = iter(range(100))
+        p = profiler.Profiler(timer=lambda: next(ticks))
+        with p.measure('to_python'):
+            with p.measure('to_python', 'address'):
+                pass
+
+        stats = p.get_pstats()
+        root = ('to_python', 0, '<root>')
+        child = ('to_python', 0, 'address')
+        self.assertEqual(stats.stats[root][:4], (1, 1, 2, 3))
+        self.assertEqual(stats.stats[child][:4], (1, 1, 1, 1))
+        self.assertIn(root, stats.stats[child][4])
+
+    def test_disabled_by_default(self):
+        reader = schemaio.JSONReader(Person)
+
+        self.assertIsNone(reader.profiler)
+        self.assertIsNone(reader.context)
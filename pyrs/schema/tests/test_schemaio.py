@@ -1,3 +1,8 @@
+import datetime
+import decimal
+import io as io_
+import itertools
+import json
 import unittest
 
 from .. import base
@@ -71,6 +76,19 @@ class TestJSONSchemaWriter(unittest.TestCase):
         s = io.write(t1)
         self.assertEqual(s, '{"type": "string"}')
 
+    def test_etag(self):
+        class MyObject(types.Object):
+            s1 = types.String()
+
+        io = schemaio.JSONSchemaWriter()
+        etag = io.etag(MyObject)
+
+        self.assertEqual(etag, '"%s"' % MyObject().fingerprint())
+        self.assertEqual(io.fingerprint(MyObject), MyObject().fingerprint())
+        self.assertNotEqual(
+            schemaio.JSONSchemaWriter(deduplicate=True).etag(MyObject), etag
+        )
+
 
 class TestJSONSchemaValidator(unittest.TestCase):
 
@@ -139,6 +157,131 @@ class TestJSONSchemaValidator(unittest.TestCase):
         self.assertEqual(errors[2]['invalid'], 'type')
         self.assertEqual(errors[2]['against'], 'string')
 
+    def test_definitions(self):
+        class MySubObject(types.Object):
+            integer = types.Ref(ref='integer')
+
+        class MyObject(types.Object):
+            sub = types.Ref(ref='sub')
+            parent = types.Ref(ref='sub')
+
+            class Definitions:
+                sub = MySubObject(null=True)
+                integer = types.Integer()
+
+        io = schemaio.JSONSchemaValidator(MyObject)
+        io.validate({'sub': {'integer': 1}, 'parent': None})
+
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.validate({'sub': {'integer': 'x'}, 'parent': {'integer': 2}})
+        ex = ctx.exception
+
+        self.assertEqual(len(ex.errors), 1)
+        self.assertEqual(ex.errors[0]['path'], 'sub.integer')
+        self.assertEqual(ex.errors[0]['against'], 'integer')
+
+    def test_nested_definitions_conflict(self):
+        import jsonschema
+
+        class MySubObject(types.Object):
+            code = types.Ref(ref='code')
+
+            class Definitions:
+                code = types.Integer()
+
+        class MyObject(types.Object):
+            sub = MySubObject()
+
+            class Definitions:
+                code = types.String()
+
+        # The same as the published schema, the root definitions are used
+        published = jsonschema.Draft4Validator(MyObject().get_jsonschema())
+        io = schemaio.JSONSchemaValidator(MyObject)
+        io.validate({'sub': {'code': 'x'}})
+        self.assertTrue(published.is_valid({'sub': {'code': 'x'}}))
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.validate({'sub': {'code': 1}})
+        self.assertFalse(published.is_valid({'sub': {'code': 1}}))
+
+
+class TestRevalidate(unittest.TestCase):
+
+    def setUp(self):
+        class Line(types.Object):
+            sku = types.String(required=True)
+            qty = types.Integer(minimum=1)
+
+        class Order(types.Object):
+            name = types.String(required=True)
+            lines = types.Array(items=Line(), max_items=3)
+
+        self.io = schemaio.JSONSchemaValidator(Order)
+        self.data = {
+            'name': 'order',
+            'lines': [{'sku': 'a', 'qty': 1}, {'sku': 'b', 'qty': 2}],
+        }
+        self.io.validate(self.data)
+
+    def get_errors(self, *args, **kwargs):
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            self.io.revalidate(self.data, *args, **kwargs)
+        return [(e['path'], e['invalid']) for e in ctx.exception.errors]
+
+    def test_changed_subtree(self):
+        self.data['lines'][0]['qty'] = 0
+        self.data['lines'][1]['qty'] = 0
+        # Only the changed subtree is visited
+        self.assertEqual(
+            self.get_errors(['/lines/1/qty']), [('lines.1.qty', 'minimum')]
+        )
+        self.assertEqual(
+            self.get_errors([['lines', 1]]), [('lines.1.qty', 'minimum')]
+        )
+        self.assertEqual(self.get_errors(['/lines']), [
+            ('lines.0.qty', 'minimum'), ('lines.1.qty', 'minimum')
+        ])
+        self.assertEqual(self.get_errors(['']), [
+            ('lines.0.qty', 'minimum'), ('lines.1.qty', 'minimum')
+        ])
+        self.io.revalidate(self.data, ['/name'])
+
+    def test_ancestors(self):
+        del self.data['lines'][1]['sku']
+        self.data['lines'].extend([{'sku': 'c'}, {'sku': 'd'}])
+        self.assertEqual(self.get_errors(['/lines/1/sku']), [
+            ('lines', 'maxItems'), ('lines.1', 'required')
+        ])
+
+    def test_patch(self):
+        del self.data['name']
+        self.data['lines'].append({'qty': 1})
+        patch = [
+            {'op': 'remove', 'path': '/name'},
+            {'op': 'add', 'path': '/lines/-', 'value': {'qty': 1}},
+            {'op': 'test', 'path': '/lines/0/sku', 'value': 'a'},
+        ]
+        self.assertEqual(self.get_errors(patch=patch), [
+            ('', 'required'), ('lines.2', 'required')
+        ])
+
+    def test_dict_validator(self):
+        io = schemaio.JSONSchemaDictValidator({
+            's1': types.String(),
+            's2': types.String()
+        })
+        io.revalidate({'s1': 12, 's2': 'b'}, ['/s2'])
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.revalidate({'s1': 12, 's2': 'b'}, [['s1']])
+
+    def test_parse_pointer(self):
+        self.assertEqual(schemaio.parse_pointer(''), [])
+        self.assertEqual(
+            schemaio.parse_pointer('/a~1b/0/c~0'), ['a/b', '0', 'c~']
+        )
+        with self.assertRaises(ValueError):
+            schemaio.parse_pointer('a')
+
 
 class TestJSONSchemaDictValidator(unittest.TestCase):
 
@@ -228,6 +371,136 @@ class TestJSONWriter(unittest.TestCase):
         res = io.write({'code': {'num': 12}})
         self.assertEqual(res, '{"code": {"num": 12}}')
 
+    def test_write_to(self):
+        class MyObject(types.Object):
+            num = types.Integer()
+            names = types.Array()
+        io = schemaio.JSONWriter(MyObject())
+        fp = io_.BytesIO()
+
+        io.write_to({'num': 12, 'names': [u'\xe1'] * 3}, fp)
+        self.assertEqual(
+            fp.getvalue(),
+            io.write({'num': 12, 'names': [u'\xe1'] * 3}).encode('utf-8')
+        )
+
+    def test_write_to_validates(self):
+        io = schemaio.JSONWriter(types.Integer())
+
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.write_to('text', io_.BytesIO())
+
+    def test_iter_write(self):
+        class Item(types.Object):
+            id = types.Integer(required=True)
+            created = types.Date()
+
+        items = [
+            {'id': i, 'created': datetime.date(2015, 8, 12)}
+            for i in range(100)
+        ]
+        for codec in ('json', 'auto'):
+            io = schemaio.JSONWriter(
+                types.Array(items=Item(), unique_items=True), codec=codec
+            )
+            io.chunk_size = 100
+            chunks = list(io.iter_write(items))
+            self.assertGreater(len(chunks), 1)
+            self.assertTrue(all(isinstance(c, bytes) for c in chunks))
+            output = b''.join(chunks).decode('utf-8')
+            # The key order of the converted objects isn't fixed
+            self.assertEqual(json.loads(output), json.loads(io.write(items)))
+            self.assertIn('}%s{' % io.codec.item_separator.decode(), output)
+        self.assertEqual(list(io.iter_write([])), [b'[]'])
+
+    def test_iter_write_not_array(self):
+        io = schemaio.JSONWriter(types.Integer())
+        self.assertEqual(list(io.iter_write(12)), [b'12'])
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.iter_write('text')
+
+    def test_iter_write_errors(self):
+        class Item(types.Object):
+            id = types.Integer(required=True)
+
+        io = schemaio.JSONWriter(types.Array(
+            items=Item(), min_items=1, max_items=2, unique_items=True
+        ))
+        for data, invalid, path in [
+                ([{'id': 1}, {'id': 'x'}], 'type', '1.id'),
+                ([{'id': 1}, {'id': 1}], 'uniqueItems', ''),
+                ([{'id': 1}, {'id': 2}, {'id': 3}], 'maxItems', ''),
+                ([], 'minItems', '')]:
+            chunks = io.iter_write(data)
+            with self.assertRaises(exceptions.ValidationErrors) as ctx:
+                list(chunks)
+            error = ctx.exception.errors[0]
+            self.assertEqual(error['invalid'], invalid)
+            self.assertEqual(error['path'], path)
+        self.assertEqual(error['against'], 1)
+
+    def test_write_iterable(self):
+        class Item(types.Object):
+            id = types.Integer(required=True)
+
+        io = schemaio.JSONWriter(types.Array(items=Item(), max_items=3))
+        rows = [{'id': 1}, {'id': 2}]
+        self.assertEqual(io.write(iter(rows)), io.write(rows))
+        self.assertEqual(
+            b''.join(io.iter_write(r for r in rows)),
+            io.write(rows).encode('utf-8')
+        )
+        fp = io_.BytesIO()
+        io.write_to((r for r in rows), fp)
+        self.assertEqual(fp.getvalue(), io.write(rows).encode('utf-8'))
+
+    def test_write_iterable_errors(self):
+        io = schemaio.JSONWriter(
+            types.Array(items=types.Integer(), max_items=3)
+        )
+        # Stops at the first item above the limit
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.write(itertools.count())
+        self.assertEqual(ctx.exception.errors[0]['invalid'], 'maxItems')
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.write(iter([1, 'a']))
+        self.assertEqual(ctx.exception.errors[0]['path'], '1')
+
+    def test_can_stream(self):
+        self.assertTrue(schemaio.can_stream(types.Array()))
+        self.assertTrue(
+            schemaio.can_stream(types.Array(items=types.Integer()))
+        )
+        self.assertFalse(schemaio.can_stream(
+            types.Array(items=[types.Integer(), types.String()])
+        ))
+        self.assertFalse(schemaio.can_stream(
+            types.Array(items=types.Ref(ref='#'))
+        ))
+        self.assertFalse(schemaio.can_stream(types.Integer()))
+
+    def test_write_decimal(self):
+        class Price(types.Object):
+            amount = types.Number(decimal=True, multiple=0.01)
+            count = types.Integer()
+        io = schemaio.JSONWriter(Price)
+
+        self.assertEqual(
+            json.loads(
+                io.write({'amount': decimal.Decimal('19.99'), 'count': 3}),
+                parse_float=decimal.Decimal
+            ),
+            {'amount': decimal.Decimal('19.99'), 'count': 3}
+        )
+        self.assertEqual(
+            io.write({'amount': decimal.Decimal('1E+2')}), '{"amount": 100}'
+        )
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.write({'amount': decimal.Decimal('0.12345678901234567891')})
+        self.assertEqual(ctx.exception.errors[0]['path'], 'amount')
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.write({'amount': decimal.Decimal('19.995')})
+
 
 class TestJSONReader(unittest.TestCase):
 
@@ -251,6 +524,193 @@ class TestJSONReader(unittest.TestCase):
         with self.assertRaises(exceptions.ParseError):
             io.read('text')
 
+    def test_read_binary(self):
+        t1 = types.String()
+        io = schemaio.JSONReader(t1)
+        data = u'"\xe1rv\xedzt\u0171r\u0151"'.encode('utf-8')
+
+        self.assertEqual(io.read(data), u'\xe1rv\xedzt\u0171r\u0151')
+        self.assertEqual(
+            io.read(bytearray(data)), u'\xe1rv\xedzt\u0171r\u0151'
+        )
+        self.assertEqual(
+            io.read(memoryview(data)), u'\xe1rv\xedzt\u0171r\u0151'
+        )
+
+    def test_read_file(self):
+        class MyObject(types.Object):
+            num = types.Integer()
+        io = schemaio.JSONReader(MyObject)
+
+        self.assertEqual(io.read(io_.BytesIO(b'{"num": 1}')), {'num': 1})
+
+    def test_raise_parse_error_when_invalid_binary(self):
+        t1 = types.String()
+        io = schemaio.JSONReader(t1)
+
+        with self.assertRaises(exceptions.ParseError):
+            io.read(memoryview(b'"\xff"'))
+        for data in (b'"a\xff"', memoryview(b'"a\xff"')):
+            with self.assertRaises(exceptions.ParseError) as ctx:
+                io.read(data)
+            self.assertIn('Invalid UTF-8 at byte 2', str(ctx.exception))
+
+    def test_partial(self):
+        class Person(types.Object):
+            name = types.String(required=True)
+            age = types.Integer(required=True)
+
+        io = schemaio.JSONReader(Person, partial=True)
+        self.assertEqual(io.read('{"age": 42}'), {'age': 42})
+        self.assertEqual(io.read('{}'), {})
+        with self.assertRaises(exceptions.ValidationErrors) as ctx:
+            io.read('{"age": "42"}')
+        self.assertEqual(ctx.exception.errors[0]['path'], 'age')
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.read('{"email": "a@b.c"}')
+        with self.assertRaises(exceptions.ValidationErrors):
+            schemaio.JSONReader(Person).read('{"age": 42}')
+
+    def test_intern(self):
+        class Record(types.Object):
+            name = types.String()
+            status = types.Enum(enum=['active', 'closed'])
+
+        io = schemaio.JSONReader(types.Array(items=Record()), intern=True)
+        data = '[{"name": "a", "status": "active"}]'
+        first, second = io.read(data)[0], io.read(data)[0]
+
+        self.assertEqual(first, {'name': 'a', 'status': 'active'})
+        self.assertIs(first['status'], second['status'])
+        for key in first:
+            self.assertIs(key, [k for k in second if k == key][0])
+        # Without it every document has its own copies
+        io = schemaio.JSONReader(types.Array(items=Record()))
+        self.assertIsNot(io.read(data)[0]['status'], first['status'])
+
+    def test_intern_dict_schema(self):
+        io = schemaio.JSONReader({'name': types.String()}, intern=True)
+
+        self.assertEqual(io.read('{"name": "a"}'), {'name': 'a'})
+        form = schemaio.JSONFormReader({'name': types.String()}, intern=True)
+        self.assertEqual(form.read({'name': 'a'}), {'name': 'a'})
+
+    def test_extend(self):
+        class Address(types.Object):
+            city = types.String()
+
+        class Person(types.Object):
+            address = Address()
+
+        person = Person()
+        io = schemaio.JSONReader(person)
+        pinned = schemaio.JSONReader(person.snapshot())
+        data = '{"address": {"city": "London", "zip": "N1"}}'
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.read(data)
+
+        Person._fields['address'].extend({'zip': types.String()})
+        self.assertEqual(
+            io.read(data), {'address': {'city': 'London', 'zip': 'N1'}}
+        )
+        with self.assertRaises(exceptions.ValidationErrors):
+            pinned.read(data)
+
+    def test_read_decimal(self):
+        class Price(types.Object):
+            amount = types.Number(decimal=True, multiple=0.01)
+            rate = types.Number()
+        io = schemaio.JSONReader(Price)
+
+        self.assertTrue(io.decimal)
+        value = io.read(b'{"amount": 0.30, "rate": 0.5}')
+        self.assertEqual(value['amount'], decimal.Decimal('0.30'))
+        self.assertEqual(str(value['amount']), '0.30')
+        self.assertIsInstance(value['rate'], float)
+        self.assertEqual(
+            io.read(io_.BytesIO(b'{"amount": 2}')),
+            {'amount': decimal.Decimal(2)}
+        )
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.read('{"amount": 0.305}')
+
+        self.assertFalse(schemaio.JSONReader(types.Number).decimal)
+
+    def test_read_decimal_and_floats(self):
+        class Price(types.Object):
+            amount = types.Number(decimal=True)
+            ratio = types.Enum(enum=[0.5, 1.5])
+            history = types.Array()
+
+            class Attrs:
+                additional = True
+
+        io = schemaio.JSONReader(Price)
+        value = io.read(
+            '{"amount": 1.10, "ratio": 1.5, "history": [0.5, [2.5]], '
+            '"extra": {"rate": 0.25}}'
+        )
+
+        self.assertEqual(str(value['amount']), '1.10')
+        self.assertEqual(value['ratio'], 1.5)
+        self.assertEqual(value['history'], [0.5, [2.5]])
+        self.assertEqual(value['extra'], {'rate': 0.25})
+        for number in (value['ratio'], value['history'][0],
+                       value['history'][1][0], value['extra']['rate']):
+            self.assertIs(type(number), float)
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.read('{"amount": 1.10, "ratio": 2.5}')
+
+    def test_read_decimal_references(self):
+        class Line(types.Object):
+            amount = types.Ref(ref='money')
+            lines = types.Array(items=types.Ref(ref='#'))
+            rate = types.Number()
+
+            class Definitions:
+                money = types.Number(decimal=True)
+
+        value = schemaio.JSONReader(Line).read(
+            '{"amount": 0.10, "rate": 0.5, '
+            '"lines": [{"amount": 0.20, "rate": 0.5}]}'
+        )
+        self.assertEqual(str(value['lines'][0]['amount']), '0.20')
+        self.assertIs(type(value['lines'][0]['rate']), float)
+
+    def test_read_decimal_extended(self):
+        class Price(types.Object):
+            rate = types.Number()
+
+        price = Price()
+        io = schemaio.JSONReader(price)
+        self.assertFalse(io.decimal)
+
+        price.extend({'amount': types.Number(decimal=True)})
+        self.assertTrue(io.decimal)
+        value = io.read('{"amount": 0.10, "rate": 0.5}')
+        self.assertEqual(str(value['amount']), '0.10')
+        self.assertIs(type(value['rate']), float)
+
+    def test_read_decimal_bounds(self):
+        class Price(types.Object):
+            amount = types.Number(
+                decimal=True, minimum=decimal.Decimal('0.1'), maximum=0.3
+            )
+            rate = types.Number(decimal=True, enum=[0.1, 0.2])
+        io = schemaio.JSONReader(Price)
+
+        self.assertEqual(
+            io.read('{"amount": 0.1, "rate": 0.1}'),
+            {'amount': decimal.Decimal('0.1'), 'rate': decimal.Decimal('0.1')}
+        )
+        io.read('{"amount": 0.3, "rate": 0.2}')
+        for doc, invalid in [('{"amount": 0.09}', 'minimum'),
+                             ('{"amount": 0.30000000000000001}', 'maximum'),
+                             ('{"rate": 0.3}', 'enum')]:
+            with self.assertRaises(exceptions.ValidationErrors) as ctx:
+                io.read(doc)
+            self.assertEqual(ctx.exception.errors[0]['invalid'], invalid)
+
 
 class TestJSONFormReader(unittest.TestCase):
 
@@ -281,3 +741,16 @@ class TestJSONFormReader(unittest.TestCase):
             'arr': [1, 2, 'hi'],
             'unknown': '{"any": "value"}'
         })
+
+    def test_enum(self):
+        class MyObject(types.Object):
+            code = types.Enum(enum=['A1', 'B2', 3])
+            level = types.Integer(enum=[1, 2])
+
+        io = schemaio.JSONFormReader(MyObject)
+        self.assertEqual(
+            io.read({'code': 'A1', 'level': '2'}), {'code': 'A1', 'level': 2}
+        )
+        self.assertEqual(io.read({'code': '3'}), {'code': 3})
+        with self.assertRaises(exceptions.ValidationErrors):
+            io.read({'code': '"C3"'})
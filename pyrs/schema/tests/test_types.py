@@ -1,7 +1,10 @@
 import datetime
+import decimal
 import unittest
 
 from .. import exceptions
+from .. import formats
+from .. import schemaio
 from .. import types
 
 
@@ -78,6 +81,37 @@ class TestNumber(unittest.TestCase):
             }
         )
 
+    def test_decimal_attrs(self):
+        t = types.Number(
+            multiple=decimal.Decimal('0.01'), minimum=decimal.Decimal('0'),
+            maximum=0.5
+        )
+        self.assertEqual(
+            t.get_jsonschema(),
+            {'type': 'number', 'multipleOf': 0.01, 'minimum': 0,
+             'maximum': 0.5}
+        )
+
+    def test_decimal(self):
+        t = types.Number(decimal=True)
+
+        self.assertEqual(t.to_python(0.1), decimal.Decimal('0.1'))
+        self.assertIsInstance(t.to_python(2), decimal.Decimal)
+        self.assertEqual(
+            t.to_python(decimal.Decimal('1.10')), decimal.Decimal('1.10')
+        )
+        self.assertEqual(t.to_python('x'), 'x')
+        self.assertEqual(
+            t.to_raw(decimal.Decimal('1.10')), decimal.Decimal('1.10')
+        )
+
+    def test_not_decimal(self):
+        t = types.Number()
+
+        self.assertEqual(t.to_python(decimal.Decimal('1.5')), 1.5)
+        self.assertIsInstance(t.to_python(decimal.Decimal('1.5')), float)
+        self.assertEqual(t.to_python(2), 2)
+
 
 class TestInteger(unittest.TestCase):
 
@@ -364,6 +398,40 @@ class TestTimeDelta(unittest.TestCase):
             self.schema.to_raw(datetime.date(2012, 3, 11))
 
 
+class TestFormatChecker(unittest.TestCase):
+
+    def tearDown(self):
+        formats.format_checkers.pop('x-even', None)
+        formats._format_checker = None
+
+    def test_raises(self):
+        @formats.format_checker('x-even')
+        def even(instance):
+            if int(instance) % 2:
+                raise ValueError(instance)
+            return True
+
+        validator = schemaio.JSONSchemaValidator(
+            types.String(format='x-even')
+        )
+        validator.validate('2')
+        # Only the given exceptions mean invalid instance
+        with self.assertRaises(ValueError):
+            validator.validate('3')
+
+        formats.format_checker('x-even', (ValueError, ))(even)
+        validator = schemaio.JSONSchemaValidator(
+            types.String(format='x-even')
+        )
+        with self.assertRaises(exceptions.ValidationErrors):
+            validator.validate('3')
+
+    def test_temporal(self):
+        validator = schemaio.JSONSchemaValidator(types.String(format='date'))
+        with self.assertRaises(exceptions.ValidationErrors):
+            validator.validate('2015-13-45')
+
+
 class TestObject(unittest.TestCase):
 
     def test_serialize(self):
@@ -3,14 +3,20 @@ This module introduce the basic schema types.
 """
 import collections
 import datetime
+import decimal
 
-import isodate
 import six
 
 from . import base
 from . import exceptions
 from . import formats
+from . import keywords
 from . import lib
+from . import models
+from . import profiler
+
+
+isodate = lib.LazyModule('isodate')
 
 
 class String(base.Base):
@@ -81,24 +87,64 @@ class Number(base.Base):
             The value MUST be an number. This number MUST be strictly
             greater than 0. A numeric instance is valid against `multiple`
             if the result of the division of the instance by this keyword's
-            value is an integer.
+            value is an integer. The check is exact, `0.3` is a multiple of
+            `0.1`.
+        decimal (bool):
+            The values are converted into `decimal.Decimal`, the readers
+            parse the numbers of these fields as `Decimal` so the amounts
+            are exact. The writers encode the `Decimal` values as numbers,
+            the ones which cannot be encoded exactly (e.g. more than 17
+            significant digits) are invalid.
     """
     _type = 'number'
 
     def get_jsonschema(self, context=None):
         schema = super(Number, self).get_jsonschema(context=context)
-        if self.has_attr('multiple', int):
-            schema['multipleOf'] = self.get_attr('multiple')
-        if self.has_attr('maximum', int):
-            schema['maximum'] = self.get_attr('maximum')
-        if self.has_attr('minimum', int):
-            schema['minimum'] = self.get_attr('minimum')
+        if self.has_attr('multiple', NUMBER_TYPES):
+            schema['multipleOf'] = _number(self.get_attr('multiple'))
+        if self.has_attr('maximum', NUMBER_TYPES):
+            schema['maximum'] = _number(self.get_attr('maximum'))
+        if self.has_attr('minimum', NUMBER_TYPES):
+            schema['minimum'] = _number(self.get_attr('minimum'))
         if self.has_attr('exclusive_max', bool) and 'maximum' in schema:
             schema['exclusiveMaximum'] = self.get_attr('exclusive_max')
         if self.has_attr('exclusive_min', bool) and 'minimum' in schema:
             schema['exclusiveMinimum'] = self.get_attr('exclusive_min')
         return schema
 
+    def to_python(self, value, context=None):
+        if self.get_attr('decimal'):
+            if isinstance(value, (float, ) + six.integer_types) and \
+                    not isinstance(value, bool):
+                return keywords.to_decimal(value)
+        elif isinstance(value, decimal.Decimal):
+            return float(value)
+        return value
+
+    def to_raw(self, value, context=None):
+        if isinstance(value, decimal.Decimal) and self.get_attr('decimal') \
+                and keywords.to_json_number(value) is None:
+            # The JSON codecs write the numbers as int or float
+            raise exceptions.ValidationError(
+                "The decimal value '%s' cannot be encoded exactly" % value,
+                value=value,
+                invalid='decimal',
+                against='number'
+            )
+        return value
+
+
+NUMBER_TYPES = six.integer_types + (float, decimal.Decimal)
+
+
+def _number(value):
+    # The JSON schema can't have Decimal, the float is emitted instead
+    if isinstance(value, decimal.Decimal):
+        if value == value.to_integral_value():
+            return int(value)
+        return float(value)
+    return value
+
 
 class Integer(Number):
     """
@@ -131,6 +177,9 @@ class Integer(Number):
     """
     _type = "integer"
 
+    # The integers are never parsed as Decimal, nothing to convert
+    to_python = base.Schema.to_python
+
 
 class Boolean(base.Base):
     _type = 'boolean'
@@ -170,7 +219,7 @@ class Array(base.Base):
         if self.has_attr('additional'):
             if isinstance(self.get_attr('additional'), base.Schema):
                 schema['additionalItems'] = \
-                    self.get_attr('additional').get_jsonschema(context=context)
+                    self._subschema(self.get_attr('additional'), context)
             elif isinstance(self.get_attr('additional'), bool):
                 schema['additionalItems'] = self.get_attr('additional')
             else:
@@ -184,12 +233,12 @@ class Array(base.Base):
         if self.get_attr('items'):
             if isinstance(self.get_attr('items'), (list, tuple)):
                 schema['items'] = [
-                    s.get_jsonschema(context=context)
+                    self._subschema(s, context)
                     for s in self.get_attr('items')
                 ]
             else:
                 schema['items'] = \
-                    self.get_attr('items').get_jsonschema(context=context)
+                    self._subschema(self.get_attr('items'), context)
         return schema
 
 
@@ -213,6 +262,14 @@ class Object(base.Base):
             if the extra properties (which are not listed as property) valid
             against the schema while name is match on the pattern.
 
+        model:
+            `True` or a class (e.g. a dataclass or a namedtuple), `to_python`
+            gives back an instance of the class instead of a dict, `True`
+            stands for a generated slotted class (see
+            :mod:`pyrs.schema.models`). The properties have to be declared
+            (`additional` is false, no `patterns`), the references are not
+            supported.
+
         Be careful, the pattern sould be explicit as possible, if the pattern
         match on any normal property the validation should be successful
         against them as well.
@@ -230,14 +287,31 @@ class Object(base.Base):
                     patterns = {
                         'value_[a-z]{2}': types.String()
                     }
+
+    With the `partial` context (e.g. `JSONReader(schema, partial=True)`)
+    the object and its nested objects are emitted without `required` and
+    `min_properties`, so the partial documents (e.g. of PATCH requests) are
+    valid, the given properties are validated as usual.
     """
     _type = "object"
     _attrs = {'additional': False}
 
+    _contains_ref = None
+    _graphs = None
+    _graph_state = None
+    _model = None
+
     def __init__(self, extend=None, **attrs):
         super(Object, self).__init__(**attrs)
         if extend:
-            self._fields.update(extend)
+            self._extend_fields(extend)
+        if self.get_attr('model') and (
+                self.get_attr('additional') is not False or
+                self.get_attr('patterns')):
+            raise TypeError(
+                'The objects with model should not allow additional '
+                'properties'
+            )
 
     def get_jsonschema(self, context=None):
         schema = super(Object, self).get_jsonschema(context=context)
@@ -246,18 +320,19 @@ class Object(base.Base):
                 schema['additionalProperties'] = self.get_attr('additional')
             else:
                 schema['additionalProperties'] = \
-                    self.get_attr('additional').get_jsonschema(context=context)
-        if self.get_attr('min_properties') is not None:
+                    self._subschema(self.get_attr('additional'), context)
+        if context is None:
+            context = {}
+        partial = context.get('partial')
+        if self.get_attr('min_properties') is not None and not partial:
             schema['minProperties'] = self.get_attr('min_properties')
         if self.get_attr('max_properties') is not None:
             schema['maxProperties'] = self.get_attr('max_properties')
         if self.get_attr('patterns'):
             patterns = collections.OrderedDict()
             for reg, pattern in self.get_attr('patterns').items():
-                patterns[reg] = pattern.get_jsonschema(context=context)
+                patterns[reg] = self._subschema(pattern, context)
             schema['patternProperties'] = patterns
-        if context is None:
-            context = {}
         attr_exclude_tags = lib.ensure_set(self.get_attr('exclude_tags'))
         ctx_exclude_tags = lib.ensure_set(context.get('exclude_tags'))
         exclude_tags = attr_exclude_tags | ctx_exclude_tags
@@ -275,8 +350,8 @@ class Object(base.Base):
             if exclude_tags and prop.has_tags(exclude_tags):
                 continue
             name = prop.get_attr("name", key)
-            properties[name] = prop.get_jsonschema(context=context)
-            if prop.get_attr('required'):
+            properties[name] = self._subschema(prop, context)
+            if prop.get_attr('required') and not partial:
                 required.append(name)
         schema["properties"] = properties
         if required:
@@ -292,16 +367,79 @@ class Object(base.Base):
         If you want to extending with an other schema, you should
         use the other schame `properties`
         """
-        self._fields.update(properties)
+        self._extend_fields(properties)
+
+    def _extend_fields(self, properties):
+        # Copy on write: the fields of the class (and of the other instances)
+        # are not modified, the readers using them are not affected
+        fields = collections.OrderedDict(self._fields or ())
+        fields.update(properties)
+        self._fields = fields
+        self._changed()
+
+    def _get_graph(self, context):
+        """
+        Gives back the compiled graph (see :mod:`pyrs.schema.graph`) when
+        the object has references, the conversion follows them by the graph.
+        """
+        from . import graph
+        self._check_graph(graph)
+        if self._contains_ref is None:
+            self._contains_ref = graph.contains_ref(self)
+        if self._contains_ref:
+            return graph.get_graph(self, context=context)
+        return None
+
+    def _check_graph(self, graph):
+        # The graph follows the changes of the subschemas (e.g. extend)
+        generation = base.Schema._generation
+        state = self._graph_state
+        if state is not None and state[0] == generation:
+            return
+        versions = graph.get_versions(self)
+        if state is not None and state[1] != versions:
+            self._contains_ref = self._graphs = None
+        self._graph_state = (generation, versions)
+
+    def _get_model(self):
+        """Gives back the model class of the object or `None`"""
+        model = self.get_attr('model')
+        if not model:
+            return None
+        cached = self._model
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        from . import graph
+        if graph.contains_ref(self):
+            raise TypeError(
+                'The objects with references cannot have model'
+            )
+        fields = tuple(self._fields or ())
+        if model is True:
+            model = models.get_model(type(self), fields)
+            required = ()
+        else:
+            required = models.get_required_fields(model, fields)
+        self._model = (self._version, model, required)
+        return model
 
     def to_python(self, value, context=None):
         """Convert the value to a real python object"""
+        model = self._get_model()
+        converter = None
+        if model is None:
+            converter = self._get_graph(context)
+        if converter is not None:
+            return converter.to_python(value, context=context)
         value = value.copy()
         res = {}
         errors = []
+        prof = profiler.get_profiler(context)
         for field, schema in self._fields.items():
             name = schema.get_attr('name', field)
             if name in value:
+                if prof is not None:
+                    started = prof.enter(name)
                 try:
                     res[field] = schema.to_python(
                         value.pop(name),
@@ -309,34 +447,89 @@ class Object(base.Base):
                     )
                 except exceptions.ValidationErrors as ex:
                     self._update_errors_by_exception(errors, ex, name)
+                finally:
+                    if prof is not None:
+                        prof.leave('to_python', started)
         self._raise_exception_when_errors(errors, value)
+        if model is not None:
+            # The undeclared properties are not valid with a model
+            return self._make_instance(model, res)
         res.update(value)
         return res
 
+    def _make_instance(self, model, values):
+        for field in self._model[2]:
+            values.setdefault(field, None)
+        try:
+            return model(**values)
+        except (TypeError, ValueError) as ex:
+            raise exceptions.ValidationError(
+                'Invalid %s: %s' % (model.__name__, ex),
+                value=values,
+                invalid='model',
+                against=model.__name__
+            )
+
     def to_raw(self, value, context=None):
         """Convert the value to a JSON compatible value"""
         if value is None:
             return None
+        if not isinstance(value, dict) and self._get_model() is not None:
+            return self._model_to_raw(value, context)
+        converter = self._get_graph(context)
+        if converter is not None:
+            return converter.to_raw(value, context=context)
         res = {}
         value = value.copy()
         errors = []
+        prof = profiler.get_profiler(context)
         for field in list(set(value) & set(self._fields)):
             schema = self._fields.get(field)
             name = schema.get_attr('name', field)
+            if prof is not None:
+                started = prof.enter(name)
             try:
                 res[name] = \
                     schema.to_raw(value.pop(field), context=context)
             except exceptions.ValidationErrors as ex:
                 self._update_errors_by_exception(errors, ex, name)
+            finally:
+                if prof is not None:
+                    prof.leave('to_raw', started)
 
         self._raise_exception_when_errors(errors, value)
         res.update(value)
         return res
 
+    def _model_to_raw(self, value, context):
+        # The attributes are read straight, the `None` of the not nullable
+        # fields stands for a missing property
+        res = {}
+        errors = []
+        prof = profiler.get_profiler(context)
+        for field, schema in self._fields.items():
+            item = getattr(value, field, None)
+            if item is None and not schema.get_attr('null'):
+                continue
+            name = schema.get_attr('name', field)
+            if prof is not None:
+                started = prof.enter(name)
+            try:
+                res[name] = schema.to_raw(item, context=context)
+            except exceptions.ValidationErrors as ex:
+                self._update_errors_by_exception(errors, ex, name)
+            finally:
+                if prof is not None:
+                    prof.leave('to_raw', started)
+        self._raise_exception_when_errors(errors, value)
+        return res
+
     def _update_errors_by_exception(self, errors, ex, name):
         for error in ex.errors:
             if error['path']:
                 error['path'] = name+'.'+error['path']
+            else:
+                error['path'] = name
             errors.append(error)
 
     def _raise_exception_when_errors(self, errors, value):
@@ -527,4 +720,7 @@ class Ref(base.Base):
         schema = super(Ref, self).get_jsonschema(context=context)
         schema.pop('type')
         assert not schema
-        return {'$ref': '#/definitions/'+self.get_attr('ref')}
+        ref = self.get_attr('ref')
+        if not ref.startswith('#'):
+            ref = '#/definitions/' + ref
+        return {'$ref': ref}
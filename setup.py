@@ -16,7 +16,9 @@ if __name__ == '__main__':
         name='pyrs-schema',
         author='Csaba Palankai',
         author_email='csaba.palankai@gmail.com',
-        packages=find_packages(exclude=['*.tests', 'tests', '*.tests.*']),
+        packages=find_packages(exclude=[
+            '*.tests', 'tests', '*.tests.*', 'benchmarks', 'benchmarks.*'
+        ]),
         include_package_data=True,
         version=VERSION,
         license='MIT',